@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Index of the products of each deployment, read from its inventory page
+so product pages can be opened by name without scanning the inventory"""
+
+import threading
+import time
+from decimal import Decimal
+from typing import Dict, Iterable, NamedTuple
+from urllib.parse import urlparse
+
+from swag_labs.store import load_json, update_json
+
+__all__ = (
+    "IndexedProduct",
+    "CatalogIndex",
+)
+
+
+class IndexedProduct(NamedTuple):
+    """a product of the index"""
+
+    id: int
+    price: Decimal
+    description: str
+
+
+class CatalogIndex:
+    """A class that maps the product names of each deployment (base url) to
+    their id, price and description.
+
+    A deployment is indexed from a read of its inventory (see
+    `InventoryPage.catalog()`), and its index is dropped once it's older
+    than `max_age` seconds or when a page shows it's stale (e.g. a product
+    page rendering another name than the indexed one).
+
+    Attributes
+    ----------
+        entries (dict): the index of each base url, with the time it was
+        built.
+
+    Methods
+    -------
+        base_url (url: str): Returns the base url of a url.
+        products (url: str): Returns the index of a url's deployment.
+        product_id (url: str, name_or_id): Returns the id of a product.
+        record (url: str, items): index the items read from an inventory.
+        invalidate (url: str): drop the index of a url's deployment.
+        load (path: str): Returns an index with the entries of a store.
+        save (path: str): merge the entries changed since loading into a
+        store.
+    """
+
+    def __init__(self, max_age: float = 24 * 3600):
+        self.max_age: float = max_age
+        self.entries: Dict[str, dict] = {}
+        # base url -> entry (None if invalidated) changed since loading
+        self._changed: Dict[str, dict | None] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def base_url(url: str) -> str:
+        """scheme and host of a url"""
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}"
+
+    def products(self, url: str) -> Dict[str, IndexedProduct]:
+        """products of the deployment serving url by name, empty if it
+        isn't indexed or its index expired"""
+        with self._lock:
+            entry = self.entries.get(self.base_url(url))
+        if entry is None or time.time() - entry["built"] > self.max_age:
+            return {}
+        return {
+            name: IndexedProduct(
+                item["id"], Decimal(item["price"]), item["description"]
+            )
+            for name, item in entry["products"].items()
+        }
+
+    def product_id(self, url: str, name_or_id: str | int) -> int | None:
+        """id of a product by its name (case insensitive) or id, None if
+        the name isn't indexed"""
+        if isinstance(name_or_id, int):
+            return name_or_id
+        name = name_or_id.strip().lower()
+        for indexed, product in self.products(url).items():
+            if indexed.lower() == name:
+                return product.id
+        return None
+
+    def record(self, url: str, items: Iterable):
+        """index the items (with name, id, price and description) read
+        from the inventory of the deployment serving url, items without an
+        id aren't indexed"""
+        products = {
+            item.name: {
+                "id": item.id,
+                "price": str(item.price),
+                "description": item.description,
+            }
+            for item in items
+            if item.id is not None
+        }
+        key = self.base_url(url)
+        with self._lock:
+            entry = self.entries.get(key)
+            fresh = (
+                entry is not None
+                and entry["products"] == products
+                and time.time() - entry["built"] <= self.max_age
+            )
+            if fresh or not products:
+                return
+            entry = {"built": time.time(), "products": products}
+            self.entries[key] = entry
+            self._changed[key] = entry
+
+    def invalidate(self, url: str):
+        """drop the index of the deployment serving url"""
+        key = self.base_url(url)
+        with self._lock:
+            if self.entries.pop(key, None) is not None:
+                self._changed[key] = None
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "CatalogIndex":
+        """create an index with the entries of a JSON store, an empty one if
+        the store doesn't exist yet"""
+        index = cls(**kwargs)
+        index.entries = load_json(path) or {}
+        return index
+
+    def save(self, path: str):
+        """write the entries changed since loading to a JSON store, merged
+        with the ones other processes saved in the meantime"""
+        with self._lock:
+            changed, self._changed = self._changed, {}
+        if not changed:
+            return
+
+        def merge(entries: dict) -> dict:
+            for key, entry in changed.items():
+                if entry is None:
+                    entries.pop(key, None)
+                else:
+                    entries[key] = entry
+            return entries
+
+        update_json(path, merge)
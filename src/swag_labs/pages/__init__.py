@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""swag-labs page objects, the classes are imported from their modules on
+first access (e.g. `from swag_labs.pages import CartPage`)"""
+
+import importlib
+
+# module of each exported class
+_EXPORTS = {
+    "By": "by",
+    "Page": "page",
+    "LoginPage": "login",
+    "InventoryPage": "inventory_page",
+    "InventoryItem": "inventory_page",
+    "CatalogItem": "inventory_page",
+    "ProductPage": "product_page",
+    "CartPage": "cart_page",
+    "CartItem": "cart_page",
+    "CheckoutInfoPage": "checkout_info",
+    "CheckoutOverviewPage": "checkout_overview",
+    "CheckoutCompletePage": "checkout_complete",
+}
+
+__all__ = tuple(_EXPORTS)
+
+
+def __getattr__(name: str):
+    """import an exported class from its module"""
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module = importlib.import_module(f"{__name__}.{_EXPORTS[name]}")
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Locator strategies of the page objects.
+
+Same values as selenium's `By`, which can't be imported without
+`selenium.webdriver` importing the drivers of every browser. The page
+modules only need the strategy names to define their locators.
+"""
+
+__all__ = ("By",)
+
+
+class By:
+    """locator strategies, interchangeable with
+    `selenium.webdriver.common.by.By`"""
+
+    ID = "id"
+    XPATH = "xpath"
+    LINK_TEXT = "link text"
+    PARTIAL_LINK_TEXT = "partial link text"
+    NAME = "name"
+    TAG_NAME = "tag name"
+    CLASS_NAME = "class name"
+    CSS_SELECTOR = "css selector"
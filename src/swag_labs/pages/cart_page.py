@@ -3,17 +3,20 @@
 
 """Cart page object model for swag-labs"""
 
+from __future__ import annotations
+
 import re
+from typing import TYPE_CHECKING
 
 from selenium.common.exceptions import NoSuchElementException
-from selenium.webdriver.common.by import By
-from selenium.webdriver.remote.webdriver import WebDriver
-from selenium.webdriver.remote.webelement import WebElement
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
 
+from swag_labs.pages.by import By
 from swag_labs.pages.page import Page
 
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+    from selenium.webdriver.remote.webelement import WebElement
+
 __all__ = (
     # "CartPage",
     "CartItem",
@@ -23,6 +26,10 @@ __all__ = (
 class CartItem:
     """A class that represents an item in the cart.
 
+    The item's details and button are rendered with the item's container,
+    which the cart page already waited for, so they are looked up
+    immediately, without the timing policy's wait.
+
     Attributes
     ----------
         NAME (tuple): the locator for the item name.
@@ -123,18 +130,11 @@ class CartPage(Page):
     CART_ITEM_CONTAINER = (By.CLASS_NAME, "cart_item")
     BACK_BUTTON = (By.CLASS_NAME, "back")
     CHECKOUT_BUTTON = (By.CLASS_NAME, "checkout_button")
+    READY_LOCATOR = CART_ITEM_CONTAINER
 
     def __init__(self, driver: WebDriver):
         super().__init__(name=self.page_name, url=self.url, driver=driver)
 
-    def open(self):
-        super().open()
-        WebDriverWait(
-            self.driver,
-            10,
-            poll_frequency=0.5,
-        ).until(EC.presence_of_all_elements_located(self.CART_ITEM_CONTAINER))
-
     def _items_container(self):
         return self.find_elements(*self.CART_ITEM_CONTAINER)
 
@@ -3,14 +3,17 @@
 
 """Checkout complete page object model for swag-labs"""
 
-from selenium.webdriver.common.by import By
-from selenium.webdriver.remote.webdriver import WebDriver
-from selenium.webdriver.remote.webelement import WebElement
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
+from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
+from swag_labs.pages.by import By
 from swag_labs.pages.page import Page
 
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+    from selenium.webdriver.remote.webelement import WebElement
+
 __all__ = ("CheckoutCompletePage",)
 
 
@@ -30,18 +33,11 @@ class CheckoutCompletePage(Page):
     page_name = "checkout_complete"
     url = "https://www.saucedemo.com/checkout-complete.html"
     CONTINUE_BUTTON = (By.ID, "back-to-products")
+    READY_LOCATOR = CONTINUE_BUTTON
 
     def __init__(self, driver: WebDriver):
         super().__init__(name=self.page_name, url=self.url, driver=driver)
 
-    def open(self):
-        super().open()
-        WebDriverWait(
-            self.driver,
-            10,
-            poll_frequency=0.5,
-        ).until(EC.presence_of_element_located(self.CONTINUE_BUTTON))
-
     def _back_button(self) -> WebElement:
         return self.find_element(*self.CONTINUE_BUTTON)
 
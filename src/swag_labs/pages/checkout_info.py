@@ -3,14 +3,18 @@
 
 """Checkout info (checkout step 1) page object model for swag-labs"""
 
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from selenium.common.exceptions import NoSuchElementException
-from selenium.webdriver.common.by import By
-from selenium.webdriver.remote.webelement import WebElement
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
 
+from swag_labs.pages.by import By
 from swag_labs.pages.page import Page
 
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webelement import WebElement
+
 __all__ = ("CheckoutInfoPage",)
 
 
@@ -49,18 +53,11 @@ class CheckoutInfoPage(Page):
     CONTINUE_BUTTON = (By.ID, "continue")
     CANCEL_BUTTON = (By.ID, "cancel")
     ERROR_MESSAGE = (By.CLASS_NAME, "error-message-container")
+    READY_LOCATOR = CONTINUE_BUTTON
 
     def __init__(self, driver):
         super().__init__(name=self.page_name, url=self.url, driver=driver)
 
-    def open(self):
-        super().open()
-        WebDriverWait(
-            self.driver,
-            10,
-            poll_frequency=0.5,
-        ).until(EC.presence_of_element_located(self.CONTINUE_BUTTON))
-
     def _first_name(self) -> WebElement:
         return self.find_element(*self.FIRST_NAME_INPUT)
 
@@ -77,7 +74,8 @@ class CheckoutInfoPage(Page):
         return self.find_element(*self.CANCEL_BUTTON)
 
     def _error_message(self) -> WebElement:
-        return self.find_element(*self.ERROR_MESSAGE)
+        # absent until the form is rejected, no need to wait
+        return self.find_element(*self.ERROR_MESSAGE, wait=0)
 
     def enter_first_name(self, first_name: str):
         """enter user's first name"""
@@ -3,14 +3,17 @@
 
 """Checkout overview (checkout step 2) page object model for swag-labs"""
 
-from selenium.webdriver.common.by import By
-from selenium.webdriver.remote.webelement import WebElement
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
+from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
+from swag_labs.pages.by import By
 from swag_labs.pages.cart_page import CartItem
 from swag_labs.pages.page import Page
 
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webelement import WebElement
+
 __all__ = ("CheckoutOverviewPage",)
 
 
@@ -56,18 +59,11 @@ class CheckoutOverviewPage(Page):
     SUBTOTAL = (By.CLASS_NAME, "summary_subtotal_label")
     TAX = (By.CLASS_NAME, "summary_tax_label")
     TOTAL = (By.CLASS_NAME, "summary_total_label")
+    READY_LOCATOR = FINISH_BUTTON
 
     def __init__(self, driver):
         super().__init__(name=self.page_name, url=self.url, driver=driver)
 
-    def open(self):
-        super().open()
-        WebDriverWait(
-            self.driver,
-            10,
-            poll_frequency=0.5,
-        ).until(EC.presence_of_element_located(self.FINISH_BUTTON))
-
     def _finish_button(self) -> WebElement:
         return self.find_element(*self.FINISH_BUTTON)
 
@@ -3,24 +3,64 @@
 
 """Inventory page object model for swag-labs"""
 
+from __future__ import annotations
+
 import re
+from decimal import Decimal
+from operator import attrgetter, ge, le
+from typing import TYPE_CHECKING, List, NamedTuple
 
 from selenium.common.exceptions import NoSuchElementException
-from selenium.webdriver.common.by import By
-from selenium.webdriver.remote.webelement import WebElement
 
+from swag_labs.pages.by import By
 from swag_labs.pages.page import Page
 
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webelement import WebElement
+
 __all__ = (
     "InventoryPage",
     "InventoryItem",
+    "CatalogItem",
 )
 
+# reads every item of the inventory in one call, the selectors are passed
+# as arguments so the page object's locators stay the only source
+_CATALOG_SCRIPT = """
+const [container, name, description, price, button, link] = arguments;
+const text = (item, selector) => {
+    const element = item.querySelector(selector);
+    return element ? element.textContent.trim() : "";
+};
+return Array.from(document.querySelectorAll(container), (item) => ({
+    name: text(item, name),
+    description: text(item, description),
+    price: text(item, price),
+    button: text(item, button),
+    link: item.querySelector(link)?.id ?? "",
+}));
+"""
+
+
+class CatalogItem(NamedTuple):
+    """an item of the inventory, read by InventoryPage.catalog()"""
+
+    name: str
+    description: str
+    price: Decimal
+    in_cart: bool
+    # from the item's link, None if the link has no id
+    id: int | None = None
+
 
 class InventoryItem:
     """A class that represents an InventoryItem in the inventory page of the
     swag-labs website.
 
+    The item's name, price, link and button are rendered with the item's
+    container, which the inventory page already waited for, so they are
+    looked up immediately, without the timing policy's wait.
+
     Attributes
     ----------
         ITEM_NAME (tuple): the locator for the item name.
@@ -31,6 +71,9 @@ class InventoryItem:
         ITEM_LINK (tuple): the locator for the item link.
         PRICE_REGEX (re.Pattern): a regular expression to parse the item
         price.
+        LINK_ID_REGEX (re.Pattern): a regular expression to parse the item
+        id from the id of its link.
+        LINK_ID (str): the id of an item's link, formatted with its id.
         ADD_BUTTON_TEXT (str): the text of the add to cart button.
         REMOVE_BUTTON_TEXT (str): the text of the remove from cart button.
 
@@ -57,6 +100,8 @@ class InventoryItem:
     ADD_BUTTON = (By.CSS_SELECTOR, "button.btn_inventory")
     ITEM_LINK = (By.CSS_SELECTOR, "div.inventory_item_label > a")
     PRICE_REGEX = re.compile(r"\d+\.\d\d")
+    LINK_ID_REGEX = re.compile(r"item_(\d+)_title_link")
+    LINK_ID = "item_{}_title_link"
     ADD_BUTTON_TEXT = "Add to cart"
     REMOVE_BUTTON_TEXT = "Remove"
 
@@ -121,6 +166,9 @@ class InventoryPage(Page):
         ITEM_CONTAINER (tuple): the locator for the item container
         CART_BUTTON (tuple): the locator for the cart button
         CART_COUNT (tuple): the locator for the cart count
+        SORT_SELECT (tuple): the locator for the product sort dropdown
+        SORT_ORDERS (dict): the key and comparison each sort option's value
+        orders the items by
 
     Methods
     -------
@@ -128,6 +176,10 @@ class InventoryPage(Page):
         check_cart (): Clicks the cart button.
         cart_count (): Returns the number of items in the cart.
         get_item_by_name (): Returns an InventoryItem object by name.
+        catalog (): Returns every item's details, read in one call.
+        sort_by (mode: str): Sorts the items with the dropdown option.
+        sorted_catalog (mode: str): Returns the catalog, checked to be in
+        the mode's order.
 
     """
 
@@ -139,6 +191,16 @@ class InventoryPage(Page):
     CART_COUNT = (By.CLASS_NAME, "shopping_cart_badge")
     BURGER_BUTTON = (By.ID, "react-burger-menu-btn")
     LOGOUT_LINK = (By.ID, "logout_sidebar_link")
+    SORT_SELECT = (By.CSS_SELECTOR, "select.product_sort_container")
+    # price sorts are checked without strictness, items of equal price can
+    # come in any order
+    SORT_ORDERS = {
+        "az": (attrgetter("name"), le),
+        "za": (attrgetter("name"), ge),
+        "lohi": (attrgetter("price"), le),
+        "hilo": (attrgetter("price"), ge),
+    }
+    READY_LOCATOR = ITEM_CONTAINER
 
     def __init__(self, driver):
         super().__init__(name=self.page_name, url=self.url, driver=driver)
@@ -147,7 +209,8 @@ class InventoryPage(Page):
         return self.find_element(*self.CART_BUTTON)
 
     def _cart_count(self):
-        return self.find_element(*self.CART_COUNT)
+        # the badge is absent while the cart is empty, no need to wait
+        return self.find_element(*self.CART_COUNT, wait=0)
 
     def _side_bar_button(self):
         return self.find_element(*self.BURGER_BUTTON)
@@ -162,14 +225,78 @@ class InventoryPage(Page):
             return []
         return (InventoryItem(item) for item in items)
 
+    def catalog(self) -> List[CatalogItem]:
+        """returns the name, description, exact price and cart state of
+        every item, read in a single browser round trip"""
+        self.wait_until_ready()
+        return self._read_catalog()
+
+    def _read_catalog(self) -> List[CatalogItem]:
+        rows = self.driver.execute_script(
+            _CATALOG_SCRIPT,
+            f".{self.ITEM_CONTAINER[1]}",
+            InventoryItem.ITEM_NAME[1],
+            InventoryItem.ITEM_DESCRIPTION[1],
+            InventoryItem.ITEM_PRICE[1],
+            InventoryItem.ADD_BUTTON[1],
+            InventoryItem.ITEM_LINK[1],
+        )
+        catalog = []
+        for row in rows:
+            match = InventoryItem.PRICE_REGEX.search(row["price"])
+            if match is None:
+                raise NoSuchElementException(
+                    "Couldn't parse item's price: " + row["price"]
+                )
+            link = InventoryItem.LINK_ID_REGEX.fullmatch(row["link"])
+            catalog.append(
+                CatalogItem(
+                    name=row["name"],
+                    description=row["description"],
+                    price=Decimal(match.group()),
+                    in_cart=row["button"] == InventoryItem.REMOVE_BUTTON_TEXT,
+                    id=int(link.group(1)) if link is not None else None,
+                )
+            )
+        Page.catalog_index.record(self.url, catalog)
+        return catalog
+
+    def sort_by(self, mode: str) -> InventoryPage:
+        """sort the items by clicking the dropdown option of mode (az, za,
+        lohi or hilo)"""
+        if mode not in self.SORT_ORDERS:
+            raise ValueError(f"Unknown sort mode: {mode}")
+        # clicking the option selects it and fires the change the app sorts
+        # on, without selenium's Select reading the dropdown first
+        self.find_element(
+            By.CSS_SELECTOR, f'{self.SORT_SELECT[1]} > option[value="{mode}"]'
+        ).click()
+        return self
+
+    def sorted_catalog(self, mode: str) -> List[CatalogItem]:
+        """returns the catalog in page order, read in one call, raises
+        ValueError if it isn't in the order of the sort mode"""
+        if mode not in self.SORT_ORDERS:
+            raise ValueError(f"Unknown sort mode: {mode}")
+        key, in_order = self.SORT_ORDERS[mode]
+        catalog = self._read_catalog()
+        keys = [key(item) for item in catalog]
+        misplaced = [
+            catalog[index + 1].name
+            for index, pair in enumerate(zip(keys, keys[1:]))
+            if not in_order(*pair)
+        ]
+        if misplaced:
+            raise ValueError(
+                f"Items out of {mode} order: {', '.join(misplaced)}"
+            )
+        return catalog
+
     def check_cart(self) -> Page:
         """start checkout"""
         self._cart_button().click()
-        return Page(
-            name="cart",
-            url="https://www.saucedemo.com/cart.html",
-            driver=self.driver,
-        )
+        page_class = Page.get_page_class(self.driver.current_url)
+        return page_class(self.driver)
 
     def cart_count(self) -> int:
         """returns the number of items in the cart"""
@@ -186,7 +313,27 @@ class InventoryPage(Page):
         return None
 
     def item_details_page(self, name: str) -> Page:
-        """open item's details page by its name"""
+        """open item's details page by its name, an indexed item's link is
+        clicked without scanning the items"""
+        item_id = Page.catalog_index.product_id(self.url, name)
+        if item_id is not None:
+            # the links are rendered with the items, once they are there a
+            # missing link means the index is stale, no need to wait for it
+            self.wait_until_ready()
+            try:
+                link = self.find_element(
+                    By.ID, InventoryItem.LINK_ID.format(item_id), wait=0
+                )
+            except NoSuchElementException:
+                link = None
+            if link is not None and link.text.strip().lower() == (
+                name.strip().lower()
+            ):
+                link.click()
+                page_class = Page.get_page_class(self.driver.current_url)
+                return page_class(self.driver)
+            # the deployment changed its products since indexing
+            Page.catalog_index.invalidate(self.url)
         item = self.get_item_by_name(name)
         if item is not None:
             item.link().click()
@@ -3,17 +3,19 @@
 
 """Login page object model for swag-labs"""
 
-from typing import Self
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Self
 
 from selenium.common.exceptions import NoSuchElementException
-from selenium.webdriver.common.by import By
-from selenium.webdriver.remote.webdriver import WebDriver
-from selenium.webdriver.remote.webelement import WebElement
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
 
+from swag_labs.pages.by import By
 from swag_labs.pages.page import Page
 
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+    from selenium.webdriver.remote.webelement import WebElement
+
 __all__ = ("LoginPage",)
 
 
@@ -47,18 +49,11 @@ class LoginPage(Page):
     PASSWORD_INPUT = (By.ID, "password")
     LOGIN_BUTTON = (By.ID, "login-button")
     ERROR_MESSAGE = (By.CLASS_NAME, "error-message-container")
+    READY_LOCATOR = LOGIN_BUTTON
 
     def __init__(self, driver: WebDriver) -> None:
         super().__init__(name=self.page_name, url=self.url, driver=driver)
 
-    def open(self):
-        super().open()
-        WebDriverWait(
-            self.driver,
-            10,
-            poll_frequency=0.5,
-        ).until(EC.presence_of_element_located(self.LOGIN_BUTTON))
-
     def _username_input(self) -> WebElement:
         return self.find_element(*self.USERNAME_INPUT)
 
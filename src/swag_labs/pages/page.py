@@ -3,18 +3,76 @@
 
 """Base POM (Page Object Model) class for swag-labs pages"""
 
-from typing import List
+from __future__ import annotations
+
+import importlib
+import time
+from typing import TYPE_CHECKING, Callable, List, Tuple
 from urllib.parse import urlparse, urlunparse
 
-from selenium.common.exceptions import NoSuchElementException
-from selenium.webdriver.common.by import By
-from selenium.webdriver.remote.webdriver import WebDriver
-from selenium.webdriver.remote.webelement import WebElement
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    TimeoutException,
+    WebDriverException,
+)
+
+from swag_labs.catalog import CatalogIndex
+from swag_labs.pages.by import By
+from swag_labs.timing import TimingPolicy
+
+# selenium.webdriver (and its support package) is imported where it's used,
+# importing it loads the drivers of every browser
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+    from selenium.webdriver.remote.webelement import WebElement
 
 __all__ = ("Page",)
 
+# collects the performance timeline of the current document in one call,
+# long tasks are only reported by an observer, which is installed on the
+# first call and delivers the buffered entries asynchronously
+_METRICS_SCRIPT = """
+const round = (value) => Math.round(value * 1000) / 1000;
+const navigation = performance.getEntriesByType("navigation")[0];
+const observed = PerformanceObserver.supportedEntryTypes || [];
+if (!window.__swagLongTasks && observed.includes("longtask")) {
+    window.__swagLongTasks = [];
+    new PerformanceObserver((list) => {
+        for (const entry of list.getEntries()) {
+            window.__swagLongTasks.push({
+                name: entry.name,
+                startTime: round(entry.startTime),
+                duration: round(entry.duration),
+            });
+        }
+    }).observe({type: "longtask", buffered: true});
+}
+return {
+    url: location.href,
+    now: round(performance.now()),
+    navigation: navigation ? navigation.toJSON() : null,
+    paint: performance.getEntriesByType("paint").map((entry) => ({
+        name: entry.name,
+        startTime: round(entry.startTime),
+    })),
+    longTasks: (window.__swagLongTasks || []).slice(),
+};
+"""
+
+
+# routes the already booted app to another path of the same origin, by
+# pushing a history entry and notifying the router like the back button does
+_SOFT_NAVIGATION_SCRIPT = """
+const [target, appRoot] = arguments;
+const url = new URL(target, location.href);
+if (url.origin !== location.origin || !document.querySelector(appRoot)) {
+    return false;
+}
+history.pushState(null, "", url.pathname + url.search + url.hash);
+window.dispatchEvent(new PopStateEvent("popstate", {state: null}));
+return true;
+"""
+
 
 class Page:
     """Base page class, provides common page methods and variables.
@@ -27,17 +85,62 @@ class Page:
 
     Methods
     --------
-        - open(): open the page
+        - open(): open the page and wait until it's ready, optionally
+          routing the already loaded app client-side
+        - wait_until_ready(): wait until the page is rendered
         - is_open(): check if the page is open
         - find_element(): find an element on the page
         - find_elements(): find multiple elements on the page
+        - metrics(): get browser-side performance metrics of the page
+        - set_base_url(): point all registered pages to another deployment
+        - add_listener(): get notified of every page transition
+        - add_lookup_listener(): get notified of every element lookup
+        - add_route_listener(): get notified of every page class lookup
+        - set_timing_policy(): set the policy deriving the waits' timeouts
+        - set_catalog_index(): set the index of the deployments' products
+        - set_soft_navigation(): make open() route client-side by default
     """
 
     # a dictionary to register POM classes
-    # so that they can be retrieved by URL
+    # so that they can be retrieved by URL (route path)
     _pages: dict = {}
+    # modules of the page classes by route, a route's module is imported
+    # (and registers its class) the first time the route is looked up
+    _page_modules: dict = {
+        "/": "swag_labs.pages.login",
+        "/inventory.html": "swag_labs.pages.inventory_page",
+        "/inventory-item.html": "swag_labs.pages.product_page",
+        "/cart.html": "swag_labs.pages.cart_page",
+        "/checkout-step-one.html": "swag_labs.pages.checkout_info",
+        "/checkout-step-two.html": "swag_labs.pages.checkout_overview",
+        "/checkout-complete.html": "swag_labs.pages.checkout_complete",
+    }
+    # deployment the registered pages point to, None keeps their own url
+    _base_url: str | None = None
+    # callables notified with (page, event) when a page object is created
+    # ("init") or opened ("open"), see add_listener()
+    _listeners: List[Callable] = []
+    # callables notified with (page, by, value) of every element lookup,
+    # see add_lookup_listener()
+    _lookup_listeners: List[Callable] = []
+    # callables notified with (url, page_class) of every registry lookup,
+    # see add_route_listener()
+    _route_listeners: List[Callable] = []
+    # timeouts and poll intervals of the waits of every page
+    timing: TimingPolicy = TimingPolicy()
+    # products of each deployment, to open product pages by name
+    catalog_index: CatalogIndex = CatalogIndex()
+
+    # route open() client-side when the app is loaded, see open()
+    soft_navigation: bool = False
+    # selector of the element the app renders into, once it has content
+    # the app is booted and can route client-side
+    APP_ROOT = "#root > *"
 
     TITLE = (By.CLASS_NAME, "title")
+    # locator of an element that is present once the page is rendered,
+    # None if the page has nothing to wait for
+    READY_LOCATOR: Tuple[str, str] | None = None
 
     def __init__(
         self, name: str, url: str, driver: WebDriver, auto_open: bool = False
@@ -45,6 +148,7 @@ class Page:
         self.page_name: str = name
         self.url: str = url
         self.driver: WebDriver = driver
+        self._notify("init")
         if auto_open and not self.is_open():
             self.open()
 
@@ -63,60 +167,278 @@ class Page:
             )
         )
 
+    @staticmethod
+    def route(url):
+        """get the route (path) of a url, used as the page registry key"""
+        return urlparse(url).path or "/"
+
+    @staticmethod
+    def rebase_url(url, base_url):
+        """replace the scheme and host of url with the ones of base_url"""
+        parsed = urlparse(url)
+        base = urlparse(base_url)
+        return urlunparse(
+            parsed._replace(scheme=base.scheme, netloc=base.netloc)
+        )
+
     @classmethod
     def register_page_class(cls, url):
         """decorator to register a page class"""
 
         def wrapper(page_class):
-            key = cls.discard_url_params(url)
+            key = cls.route(url)
             cls._pages[key] = page_class
+            if cls._base_url is not None:
+                page_class.url = cls.rebase_url(page_class.url, cls._base_url)
             return page_class
 
         return wrapper
 
     @classmethod
     def get_page_class(cls, url):
-        """get the page class for a given url"""
-        key = cls.discard_url_params(url)
-        return cls._pages[key]
+        """get the page class for a given url, importing its module if
+        needed"""
+        key = cls.route(url)
+        if key not in cls._pages and key in cls._page_modules:
+            importlib.import_module(cls._page_modules[key])
+        page_class = cls._pages[key]
+        for listener in list(Page._route_listeners):
+            listener(url, page_class)
+        return page_class
+
+    @classmethod
+    def page_classes(cls) -> dict:
+        """get the page classes by route, importing the modules of the
+        ones that aren't registered yet"""
+        for key, module in cls._page_modules.items():
+            if key not in cls._pages:
+                importlib.import_module(module)
+        return dict(cls._pages)
+
+    @classmethod
+    def set_base_url(cls, base_url):
+        """point the url of every registered page class to the deployment
+        at base_url (e.g. http://localhost:3000), including the classes
+        registered later"""
+        cls._base_url = base_url
+        for page_class in cls._pages.values():
+            page_class.url = cls.rebase_url(page_class.url, base_url)
+
+    @classmethod
+    def add_listener(cls, listener: Callable):
+        """call listener(page, event) on every page transition"""
+        Page._listeners.append(listener)
+
+    @classmethod
+    def remove_listener(cls, listener: Callable):
+        """stop notifying a listener added by add_listener()"""
+        if listener in Page._listeners:
+            Page._listeners.remove(listener)
+
+    @classmethod
+    def add_lookup_listener(cls, listener: Callable):
+        """call listener(page, by, value) on every element lookup"""
+        Page._lookup_listeners.append(listener)
+
+    @classmethod
+    def remove_lookup_listener(cls, listener: Callable):
+        """stop notifying a listener added by add_lookup_listener()"""
+        if listener in Page._lookup_listeners:
+            Page._lookup_listeners.remove(listener)
+
+    @classmethod
+    def add_route_listener(cls, listener: Callable):
+        """call listener(url, page_class) on every get_page_class()"""
+        Page._route_listeners.append(listener)
+
+    @classmethod
+    def remove_route_listener(cls, listener: Callable):
+        """stop notifying a listener added by add_route_listener()"""
+        if listener in Page._route_listeners:
+            Page._route_listeners.remove(listener)
+
+    @classmethod
+    def set_timing_policy(cls, policy: TimingPolicy):
+        """use policy for the waits of every page"""
+        Page.timing = policy
+
+    @classmethod
+    def set_catalog_index(cls, index: CatalogIndex):
+        """use index to look up the products of every page"""
+        Page.catalog_index = index
+
+    def _notify(self, event: str):
+        for listener in list(Page._listeners):
+            listener(self, event)
 
     def title(self) -> str:
         """get the title of the page"""
+        # looked up immediately, the title is rendered with the page's ready
+        # locator and pages without one fall back to the document's title
         try:
             title = self.driver.find_element(*self.TITLE).text.strip()
         except NoSuchElementException:
             title = self.driver.title
         return title
 
-    def open(self):
-        """open the page's url in the browser"""
-        self.driver.get(self.url)
+    def open(self, soft: bool | None = None):
+        """open the page's url in the browser.
+
+        A soft open routes the app client-side (history.pushState and a
+        popstate event) when it's already loaded on the page's origin, and
+        only waits for the page to render. It falls back to loading the url
+        when the app isn't loaded, the page is already open, or the app
+        doesn't render the page (e.g. redirects to the login). `soft`
+        defaults to `Page.soft_navigation`.
+        """
+        if soft is None:
+            soft = Page.soft_navigation
+        if not (soft and self._soft_open()):
+            self.driver.get(self.url)
+            self.wait_until_ready()
+        self._notify("open")
+
+    def _soft_open(self) -> bool:
+        if self.route(self.driver.current_url) == self.route(self.url):
+            return False
+        previous: List[WebElement] = []
+        if self.READY_LOCATOR is not None:
+            previous = self.driver.find_elements(*self.READY_LOCATOR)
+        routed = self.driver.execute_script(
+            _SOFT_NAVIGATION_SCRIPT, self.url, self.APP_ROOT
+        )
+        if not routed:
+            return False
+        from selenium.webdriver.support import expected_conditions as EC
+
+        try:
+            if previous:
+                # the previous page may use the same ready locator
+                self._wait(
+                    TimingPolicy.route_key(self.url) + ":unmount",
+                    EC.staleness_of(previous[0]),
+                    None,
+                    None,
+                )
+            self.wait_until_ready()
+        except TimeoutException:
+            return False
+        return self.route(self.driver.current_url) == self.route(self.url)
+
+    @classmethod
+    def set_soft_navigation(cls, soft: bool):
+        """make open() route client-side by default"""
+        Page.soft_navigation = soft
+
+    def _wait(self, key: str, condition, timeout, poll_frequency):
+        """wait for condition, with the timing policy's timeout and poll
+        interval for key unless given, and record how long it took"""
+        if timeout is None:
+            timeout = Page.timing.timeout(key)
+        if poll_frequency is None:
+            poll_frequency = Page.timing.poll_frequency(key)
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        start = time.perf_counter()
+        result = WebDriverWait(
+            self.driver, timeout, poll_frequency=poll_frequency
+        ).until(condition)
+        Page.timing.record(key, time.perf_counter() - start)
+        return result
+
+    def wait_until_ready(
+        self, timeout: float | None = None, poll_frequency: float | None = None
+    ):
+        """wait until the page's ready locator is present, the timing
+        policy gives the route's timeout and poll interval if not given"""
+        if self.READY_LOCATOR is not None:
+            from selenium.webdriver.support import expected_conditions as EC
+
+            self._wait(
+                TimingPolicy.route_key(self.url),
+                EC.presence_of_element_located(self.READY_LOCATOR),
+                timeout,
+                poll_frequency,
+            )
+        return self
+
+    def metrics(self) -> dict:
+        """get the navigation, paint and long task timings of the current
+        document (in ms since navigation start), and the CDP performance
+        metrics of the browser when it's chromium based"""
+        metrics = self.driver.execute_script(_METRICS_SCRIPT)
+        metrics["cdp"] = None
+        if hasattr(self.driver, "execute_cdp_cmd"):
+            try:
+                self.driver.execute_cdp_cmd("Performance.enable", {})
+                result = self.driver.execute_cdp_cmd(
+                    "Performance.getMetrics", {}
+                )
+            except WebDriverException:
+                pass
+            else:
+                metrics["cdp"] = {
+                    metric["name"]: metric["value"]
+                    for metric in result.get("metrics", [])
+                }
+        return metrics
 
     def is_open(self) -> bool:
         """check if the page is currently open in the browser"""
         return self.driver.current_url == self.url
 
     def find_element(
-        self, by: str, value: str, wait: int = 0, poll_frequency: float = 0.5
+        self,
+        by: str,
+        value: str,
+        wait: float | None = None,
+        poll_frequency: float | None = None,
     ) -> WebElement:
-        """find a single element on the page"""
-        if wait > 0:
-            return WebDriverWait(
-                self.driver, wait, poll_frequency=poll_frequency
-            ).until(EC.presence_of_element_located((by, value)))
-        else:
+        """find a single element on the page, waiting up to `wait` seconds
+        (the timing policy's timeout of the locator if None)"""
+        for listener in list(Page._lookup_listeners):
+            listener(self, by, value)
+        if wait == 0:
             return self.driver.find_element(by, value)
+        from selenium.webdriver.support import expected_conditions as EC
+
+        try:
+            return self._wait(
+                TimingPolicy.locator_key(by, value),
+                EC.presence_of_element_located((by, value)),
+                wait,
+                poll_frequency,
+            )
+        except TimeoutException as error:
+            raise NoSuchElementException(
+                f"Couldn't find element {by}={value}: {error.msg}"
+            ) from error
 
     def find_elements(
-        self, by: str, value: str, wait: int = 0, poll_frequency: float = 0.5
+        self,
+        by: str,
+        value: str,
+        wait: float | None = None,
+        poll_frequency: float | None = None,
     ) -> List[WebElement]:
-        """find multiple elements on the page"""
-        if wait > 0:
-            return WebDriverWait(
-                self.driver, wait, poll_frequency=poll_frequency
-            ).until(EC.presence_of_all_elements_located((by, value)))
-        else:
+        """find multiple elements on the page, waiting up to `wait` seconds
+        (the timing policy's timeout of the locator if None) for at least
+        one of them, returns an empty list if there is none"""
+        for listener in list(Page._lookup_listeners):
+            listener(self, by, value)
+        if wait == 0:
             return self.driver.find_elements(by, value)
+        from selenium.webdriver.support import expected_conditions as EC
+
+        try:
+            return self._wait(
+                TimingPolicy.locator_key(by, value),
+                EC.presence_of_all_elements_located((by, value)),
+                wait,
+                poll_frequency,
+            )
+        except TimeoutException:
+            return []
 
     def __str__(self):
         return f"{self.page_name}: {self.title()}"
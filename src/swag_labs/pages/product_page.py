@@ -3,15 +3,19 @@
 
 """product details page object model for swag-labs"""
 
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from selenium.common.exceptions import NoSuchElementException
-from selenium.webdriver.common.by import By
-from selenium.webdriver.remote.webdriver import WebDriver
-from selenium.webdriver.remote.webelement import WebElement
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
 
+from swag_labs.pages.by import By
 from swag_labs.pages.page import Page
 
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+    from selenium.webdriver.remote.webelement import WebElement
+
 __all__ = ("ProductPage",)
 
 
@@ -36,6 +40,7 @@ class ProductPage(Page):
 
     Methods
     -------
+        open_product (name_or_id): Opens a product's page by its name or id.
         item_name (): Returns the product's name as a string.
         description (): Returns the product's description as a string.
         link (): Returns the product's link as a clickable WebElement.
@@ -67,17 +72,42 @@ class ProductPage(Page):
     BACK_BUTTON_TEXT = "Back to products"
     CART_BUTTON = (By.CLASS_NAME, "shopping_cart_link")
     CART_COUNT = (By.CLASS_NAME, "shopping_cart_badge")
+    READY_LOCATOR = NAME
 
     def __init__(self, driver: WebDriver):
         super().__init__(name=self.page_name, url=self.url, driver=driver)
 
-    def open(self):
-        super().open()
-        WebDriverWait(
-            self.driver,
-            10,
-            poll_frequency=0.5,
-        ).until(EC.presence_of_element_located(self.NAME))
+    def open_product(self, name_or_id: str | int) -> ProductPage:
+        """open the page of a product by its id, or by its name looked up in
+        the catalog index (indexing the inventory first if the name isn't
+        indexed or the index is stale), without going through the
+        inventory's links"""
+        index = Page.catalog_index
+        product_id = index.product_id(self.url, name_or_id)
+        indexed = product_id is not None
+        while True:
+            if product_id is None:
+                inventory = Page.get_page_class("/inventory.html")(self.driver)
+                inventory.open()
+                inventory.catalog()
+                product_id = index.product_id(self.url, name_or_id)
+                if product_id is None:
+                    raise NoSuchElementException(
+                        f"No product named {name_or_id} in the inventory"
+                    )
+            self.url = f"{self.discard_url_params(self.url)}?id={product_id}"
+            self.open()
+            if isinstance(name_or_id, int) or (
+                self.item_name().lower() == name_or_id.strip().lower()
+            ):
+                return self
+            if not indexed:
+                raise NoSuchElementException(
+                    f"Product {product_id} isn't named {name_or_id}"
+                )
+            # the deployment changed its products since indexing
+            index.invalidate(self.url)
+            product_id, indexed = None, False
 
     def _name(self) -> WebElement:
         return self.find_element(*self.NAME)
@@ -101,7 +131,8 @@ class ProductPage(Page):
         return self.find_element(*self.CART_BUTTON)
 
     def _cart_count(self) -> WebElement:
-        return self.find_element(*self.CART_COUNT)
+        # the badge is absent while the cart is empty, no need to wait
+        return self.find_element(*self.CART_COUNT, wait=0)
 
     def item_name(self) -> str:
         """get item's name"""
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""JSON stores shared by parallel runs, updated one process at a time under
+a lock file"""
+
+import json
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+__all__ = (
+    "load_json",
+    "update_json",
+)
+
+
+def load_json(path: str) -> Any:
+    """get the data of a JSON store, None if it doesn't exist yet or is
+    unreadable"""
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+@contextmanager
+def _locked(path: str):
+    with open(path, "a+b") as file:
+        if sys.platform == "win32":
+            # locks the first byte, retrying for 10 seconds
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if sys.platform == "win32":
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+def update_json(path: str, merge: Callable[[dict], dict], **dump_kwargs):
+    """merge changes into a JSON store: `merge` gets the store's current
+    data (empty if it doesn't exist yet) and returns the data to write.
+
+    Updates hold an exclusive lock on `<path>.lock`, so the changes of
+    parallel runs are merged one after the other instead of overwriting
+    each other, and the store is replaced atomically so readers never see
+    a partial write.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with _locked(f"{path}.lock"):
+        data = merge(load_json(path) or {})
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp, "w", encoding="utf-8") as file:
+            json.dump(data, file, **dump_kwargs)
+        os.replace(temp, path)
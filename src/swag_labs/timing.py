@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Timing policy of page waits, derived from the observed latencies"""
+
+import math
+import threading
+from typing import Dict, List
+from urllib.parse import urlparse
+
+from swag_labs.store import load_json, update_json
+
+__all__ = ("TimingPolicy",)
+
+
+class TimingPolicy:
+    """A class that records how long locators and routes take to be ready,
+    and derives the timeout and poll interval of their waits from it.
+
+    A key with at least `min_samples` observations times out after its
+    `quantile` latency times `safety_factor`, clamped to
+    `min_timeout`..`max_timeout`, and is polled at a fraction of its median
+    latency. Keys without enough history use `default_timeout` and
+    `default_poll`. Waits that time out aren't recorded, so a broken page
+    can't stretch the timeouts of later runs.
+
+    Attributes
+    ----------
+        samples (dict): observed latencies (in seconds) of each key, the
+        most recent `history` ones are kept.
+
+    Methods
+    -------
+        locator_key (by: str, value: str): Returns the key of a locator.
+        route_key (url: str): Returns the key of a url's route.
+        record (key: str, seconds: float): record an observed latency.
+        timeout (key: str): Returns the timeout of a key's waits.
+        poll_frequency (key: str): Returns the poll interval of a key's waits.
+        load (path: str): Returns a policy with the latencies of a store.
+        save (path: str): merge the latencies recorded since loading into
+        a store.
+    """
+
+    def __init__(
+        self,
+        default_timeout: float = 10,
+        default_poll: float = 0.5,
+        min_timeout: float = 1,
+        max_timeout: float = 30,
+        safety_factor: float = 3,
+        quantile: float = 99.9,
+        min_samples: int = 20,
+        history: int = 1000,
+    ):
+        self.default_timeout: float = default_timeout
+        self.default_poll: float = default_poll
+        self.min_timeout: float = min_timeout
+        self.max_timeout: float = max_timeout
+        self.safety_factor: float = safety_factor
+        self.quantile: float = quantile
+        self.min_samples: int = min_samples
+        self.history: int = history
+        self.samples: Dict[str, List[float]] = {}
+        self._recorded: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def locator_key(by: str, value: str) -> str:
+        """key of a (by, value) locator"""
+        return f"{by}={value}"
+
+    @staticmethod
+    def route_key(url: str) -> str:
+        """key of the route (path) of a url"""
+        return "route:" + (urlparse(url).path or "/")
+
+    def record(self, key: str, seconds: float):
+        """record the latency of a wait that succeeded"""
+        with self._lock:
+            samples = self.samples.setdefault(key, [])
+            samples.append(seconds)
+            del samples[: -self.history]
+            self._recorded.setdefault(key, []).append(seconds)
+
+    def _percentile(self, key: str, p: float) -> float | None:
+        with self._lock:
+            samples = sorted(self.samples.get(key, ()))
+        if len(samples) < self.min_samples:
+            return None
+        rank = math.ceil(p / 100 * len(samples))
+        return samples[min(len(samples), max(rank, 1)) - 1]
+
+    def timeout(self, key: str) -> float:
+        """timeout of the waits for a key"""
+        latency = self._percentile(key, self.quantile)
+        if latency is None:
+            return self.default_timeout
+        return min(
+            self.max_timeout,
+            max(self.min_timeout, latency * self.safety_factor),
+        )
+
+    def poll_frequency(self, key: str) -> float:
+        """poll interval of the waits for a key"""
+        median = self._percentile(key, 50)
+        if median is None:
+            return self.default_poll
+        return min(self.default_poll, max(0.02, median / 5))
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "TimingPolicy":
+        """create a policy with the latencies of a JSON store, an empty one
+        if the store doesn't exist yet"""
+        policy = cls(**kwargs)
+        for key, values in (load_json(path) or {}).items():
+            policy.samples[key] = values[-policy.history :]
+        return policy
+
+    def save(self, path: str):
+        """add the latencies recorded since loading to a JSON store, merged
+        with the ones other processes saved in the meantime"""
+        with self._lock:
+            recorded, self._recorded = self._recorded, {}
+        if not recorded:
+            return
+
+        def merge(samples: dict) -> dict:
+            for key, values in recorded.items():
+                samples[key] = (samples.get(key, []) + values)[-self.history :]
+            return samples
+
+        update_json(path, merge)
@@ -3,15 +3,37 @@
 
 """pytest fixtures for swag-labs website tests"""
 
+from __future__ import annotations
+
 import json
+import os
+import time
+from typing import TYPE_CHECKING, Dict, List
 from urllib.request import Request, urlopen
 
 import pytest
 from environs import env
-from selenium.webdriver.remote.webdriver import WebDriver
 
-from swag_labs.pages.login import LoginPage
-from tests.utils.driver import get_chrome_driver, get_firefox_driver
+from swag_labs.catalog import CatalogIndex
+from swag_labs.pages.page import Page
+from swag_labs.timing import TimingPolicy
+from tests.utils.artifacts import ArtifactWriter, FailureArtifacts
+from tests.utils.impact import ImpactAnalysis
+from tests.utils.matrix import (
+    SUPPORTED_BROWSERS,
+    MatrixReport,
+    max_concurrent_browsers,
+)
+from tests.utils.monitor import MB, ResourceMonitor, ResourceThresholds
+from tests.utils.page_metrics import PageMetricsRecorder
+from tests.utils.proxy import CachingProxy, ContentStore
+
+# the browser stack (drivers, transport, BiDi) is imported by the fixtures
+# that start a browser, so collecting and running browserless tests is fast
+if TYPE_CHECKING:
+    from tests.utils.events import EventStream
+    from tests.utils.session import BrowserSession
+    from tests.utils.transport import TransportConfig
 
 env.read_env(".env.test")
 
@@ -20,40 +42,359 @@ DATA_END_POINT = env.str(
     default="https://my-json-server.typicode.com/ece-mohammad/fake_json_server_store/users/1",
 )
 
+# deployment of the website under test, defaults to the pages' own urls
+BASE_URL = env.str("BASE_URL", default="")
 
-@pytest.fixture(scope="session")
-def setup():
-    """fixture to setup a new driver instance for test session"""
+# a comma separated list of browsers runs the suite against each of them
+BROWSERS = env.list("BROWSER", default=["chrome"])
 
-    browser = env.str("BROWSER", default="chrome")
+# "record" or "replay" sends the browser traffic through a caching proxy
+PROXY_MODE = env.str("PROXY_MODE", default="")
 
-    # chrome
-    if browser == "chrome":
-        browser = get_chrome_driver(headless=True)
+# "record" or "replay" the journey tests from their compiled plans
+JOURNEY_MODE = env.str("JOURNEY_MODE", default="")
 
-    # firefox
-    elif browser == "firefox":
-        browser = get_firefox_driver(headless=True)
+resource_monitors_key = pytest.StashKey[List[ResourceMonitor]]()
+timing_store_key = pytest.StashKey[str]()
+# whether a test used a browser, browserless runs have nothing to save
+driver_used_key = pytest.StashKey[bool]()
+catalog_index_key = pytest.StashKey[str]()
+proxies_key = pytest.StashKey[List[CachingProxy]]()
 
-    else:
-        raise ValueError(f"Browser {browser} is not supported")
 
-    browser.maximize_window()
-    browser.implicitly_wait(10)
-    yield browser
-    browser.close()
+def pytest_addoption(parser: pytest.Parser):
+    parser.addoption(
+        "--perf",
+        action="store_true",
+        default=False,
+        help="run the latency tests (marked with perf)",
+    )
+    parser.addoption(
+        "--page-metrics",
+        action="store",
+        default=None,
+        metavar="PATH",
+        help="record browser-side metrics of every page transition to PATH",
+    )
+    parser.addoption(
+        "--impact",
+        action="store",
+        default=None,
+        metavar="REV",
+        help="only run the tests affected by the changes since git REV",
+    )
+
+
+def cache_path(config: pytest.Config, name: str, filename: str) -> str:
+    """path of a store in pytest's cache, the stores keep the same path
+    when the cache plugin is disabled (`-p no:cacheprovider`)"""
+    cache = getattr(config, "cache", None)
+    if cache is not None:
+        return str(cache.mkdir(name) / filename)
+    return str(config.rootpath / ".pytest_cache" / "d" / name / filename)
+
+
+def pytest_configure(config: pytest.Config):
+    for browser in BROWSERS:
+        if browser not in SUPPORTED_BROWSERS:
+            raise pytest.UsageError(f"Browser {browser} is not supported")
+    if PROXY_MODE and PROXY_MODE not in CachingProxy.MODES:
+        raise pytest.UsageError(f"Proxy mode {PROXY_MODE} is not supported")
+    if JOURNEY_MODE:
+        from tests.utils.journey import JourneyReplay
+
+        if JOURNEY_MODE not in JourneyReplay.MODES:
+            raise pytest.UsageError(
+                f"Journey mode {JOURNEY_MODE} is not supported"
+            )
+        if config.getoption("--page-metrics"):
+            # the metrics would be recorded, and replays have no page objects
+            raise pytest.UsageError(
+                "--page-metrics can't be used with JOURNEY_MODE"
+            )
+    # registered by pytest-xdist when installed, matrix runs don't need it
+    config.addinivalue_line(
+        "markers", "xdist_group(name): run tests of a group on one worker"
+    )
+    config.addinivalue_line(
+        "markers", "perf: latency test, only runs with --perf"
+    )
+    config.addinivalue_line(
+        "markers", "journey: test that can be replayed from its recording"
+    )
+    if len(BROWSERS) > 1 and not config.pluginmanager.hasplugin("xdist"):
+        config.issue_config_time_warning(
+            pytest.PytestConfigWarning(
+                "pytest-xdist isn't installed, the browsers of the matrix run"
+                " one after the other (install the 'parallel' extra)"
+            ),
+            stacklevel=2,
+        )
+    config.pluginmanager.register(MatrixReport(), "browser-matrix")
+    if config.getoption("--page-metrics"):
+        config.pluginmanager.register(
+            PageMetricsRecorder(config.getoption("--page-metrics")),
+            "page-metrics",
+        )
+    if BASE_URL:
+        Page.set_base_url(BASE_URL)
+    Page.set_soft_navigation(env.bool("SOFT_NAVIGATION", default=False))
+    config.stash[resource_monitors_key] = []
+    artifacts_dir = env.str("ARTIFACTS_DIR", default="")
+    if artifacts_dir:
+        # xdist workers inherit the run name of the controller
+        run = os.environ.setdefault(
+            "ARTIFACTS_RUN", time.strftime("run-%Y%m%d-%H%M%S")
+        )
+        writer = ArtifactWriter(
+            artifacts_dir,
+            run,
+            max_bytes=env.int("ARTIFACTS_MAX_MB", default=200) * MB,
+            keep_runs=env.int("ARTIFACTS_KEEP_RUNS", default=5),
+        )
+        if not hasattr(config, "workerinput"):
+            writer.prune()
+        config.pluginmanager.register(
+            FailureArtifacts(writer), "failure-artifacts"
+        )
+    config.stash[proxies_key] = []
+    # map of the page objects and locators each test exercised, kept up to
+    # date by the runs that select tests with it or store it elsewhere
+    impact_map = env.str("IMPACT_MAP", default="")
+    if impact_map or config.getoption("--impact"):
+        config.pluginmanager.register(
+            ImpactAnalysis(
+                impact_map or cache_path(config, "impact", "map.json"),
+                rev=config.getoption("--impact"),
+            ),
+            "test-impact",
+        )
+    if JOURNEY_MODE:
+        config.pluginmanager.register(
+            JourneyReplay(
+                env.str("JOURNEY_STORE", default="")
+                or cache_path(config, "journeys", "plans.json"),
+                JOURNEY_MODE,
+            ),
+            "journey-replay",
+        )
+    # page waits time out based on the latencies observed in earlier runs
+    store = env.str("TIMING_STORE", default="") or cache_path(
+        config, "timing-policy", "timings.json"
+    )
+    config.stash[timing_store_key] = store
+    Page.set_timing_policy(
+        TimingPolicy.load(
+            store,
+            safety_factor=env.float("TIMING_SAFETY_FACTOR", default=3),
+            max_timeout=env.float("TIMING_MAX_TIMEOUT", default=30),
+        )
+    )
+    # products of each deployment, product pages open by name without
+    # scanning the inventory
+    index = env.str("CATALOG_INDEX", default="") or cache_path(
+        config, "catalog-index", "index.json"
+    )
+    config.stash[catalog_index_key] = index
+    Page.set_catalog_index(
+        CatalogIndex.load(
+            index,
+            max_age=env.float("CATALOG_INDEX_MAX_AGE", default=24) * 3600,
+        )
+    )
+
+
+def pytest_sessionfinish(session: pytest.Session):
+    if not session.config.stash.get(driver_used_key, False):
+        return
+    Page.timing.save(session.config.stash[timing_store_key])
+    Page.catalog_index.save(session.config.stash[catalog_index_key])
+
+
+def pytest_generate_tests(metafunc: pytest.Metafunc):
+    if "browser" in metafunc.fixturenames and len(BROWSERS) > 1:
+        metafunc.parametrize(
+            "browser", BROWSERS, indirect=True, scope="session"
+        )
+
+
+def pytest_collection_modifyitems(
+    config: pytest.Config, items: List[pytest.Item]
+):
+    """skip the latency tests unless running with --perf, tag browser tests
+    with their browser, and split each browser's tests into xdist groups
+    so `--dist loadgroup` spreads them over the workers"""
+    if not config.getoption("--perf"):
+        skip_perf = pytest.mark.skip(reason="latency test, use --perf")
+        for item in items:
+            if "perf" in item.keywords:
+                item.add_marker(skip_perf)
+
+    workers = int(os.environ.get("PYTEST_XDIST_WORKER_COUNT", 1))
+    shards = max(1, workers // len(BROWSERS))
+    counts: Dict[str, int] = {}
+    for item in items:
+        if "browser" not in getattr(item, "fixturenames", ()):
+            continue
+        callspec = getattr(item, "callspec", None)
+        params = callspec.params if callspec else {}
+        browser = params.get("browser", BROWSERS[0])
+        item.user_properties.append(("browser", browser))
+        shard = counts.get(browser, 0)
+        counts[browser] = shard + 1
+        item.add_marker(pytest.mark.xdist_group(f"{browser}-{shard % shards}"))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_auto_num_workers(config: pytest.Config) -> int:
+    """size `-n auto` to the number of browsers the machine can run"""
+    return max_concurrent_browsers(
+        cpus_per_browser=env.float("BROWSER_CPUS", default=1),
+        memory_per_browser_mb=env.int("BROWSER_MEMORY_MB", default=1024),
+    )
+
+
+def transport_config() -> TransportConfig | None:
+    """get the driver HTTP transport settings, None if not configured"""
+    pool_size = env.int("DRIVER_POOL_SIZE", default=0)
+    if pool_size <= 0:
+        return None
+    from tests.utils.transport import TransportConfig, parse_command_timeouts
+
+    return TransportConfig(
+        pool_size=pool_size,
+        keep_alive=env.bool("DRIVER_KEEP_ALIVE", default=True),
+        timeout=env.float("DRIVER_TIMEOUT", default=120),
+        command_timeouts=parse_command_timeouts(
+            env.str("DRIVER_COMMAND_TIMEOUTS", default="")
+        ),
+        unix_socket=env.str("DRIVER_SOCKET", default=None),
+    )
+
+
+def browser_events_stream() -> EventStream | None:
+    """get a stream of the browser's BiDi events, None if disabled"""
+    if not env.bool("BROWSER_EVENTS", default=False):
+        return None
+    from tests.utils.events import EventStream
+
+    stream = EventStream(
+        capacity=env.int("BROWSER_EVENTS_BUFFER", default=1000),
+        network=env.bool("BROWSER_NETWORK_EVENTS", default=True),
+        error_status=env.int("BROWSER_ERROR_STATUS", default=0),
+    )
+    Page.add_listener(stream.track)
+    return stream
+
+
+@pytest.fixture(scope="session")
+def browser(request: pytest.FixtureRequest) -> str:
+    """name of the browser used by the test"""
+    return getattr(request, "param", BROWSERS[0])
+
+
+@pytest.fixture(scope="session")
+def proxy(pytestconfig: pytest.Config):
+    """fixture to run the recording / replaying proxy, None if disabled"""
+    if not PROXY_MODE:
+        yield None
+        return
+    caching_proxy = CachingProxy(
+        ContentStore(env.str("PROXY_STORE", default=".http_cache")),
+        mode=PROXY_MODE,
+        latency=env.float("PROXY_LATENCY_MS", default=0) / 1000,
+        upgrade_hosts=env.list("PROXY_UPGRADE_HOSTS", default=[]),
+    )
+    caching_proxy.start()
+    pytestconfig.stash[proxies_key].append(caching_proxy)
+    yield caching_proxy
+    caching_proxy.stop()
 
 
 # pylint: disable=redefined-outer-name
+@pytest.fixture(scope="session")
+def setup(browser: str, proxy: CachingProxy | None):
+    """fixture to setup a browser session for the test session"""
+    from tests.utils.session import BrowserSession
+
+    session = BrowserSession(
+        browser,
+        headless=True,
+        standby=env.int("STANDBY_BROWSERS", default=0),
+        remote_nodes=env.list("REMOTE_NODES", default=[]),
+        transport=transport_config(),
+        proxy=proxy.address if proxy is not None else None,
+        events=browser_events_stream(),
+        user_contexts=env.bool("USER_CONTEXTS", default=False),
+        freeze_motion=env.bool("FREEZE_MOTION", default=False),
+        fast_timers_ms=env.int("FAST_TIMERS_MS", default=0),
+    )
+    yield session
+    session.close()
+
+
+@pytest.fixture(scope="session")
+def resource_monitor(pytestconfig: pytest.Config, setup: BrowserSession):
+    """fixture to monitor the resources used by the session's browser"""
+    monitor = ResourceMonitor(
+        setup,
+        ResourceThresholds(
+            rss_mb=env.int("MAX_BROWSER_RSS_MB", default=2048),
+            js_heap_mb=env.int("MAX_JS_HEAP_MB", default=512),
+            handles=env.int("MAX_BROWSER_HANDLES", default=0),
+        ),
+    )
+    pytestconfig.stash[resource_monitors_key].append(monitor)
+    return monitor
+
+
 @pytest.fixture(scope="function")
-def driver(setup: WebDriver):
-    """Fixture to clean browser state before each test function."""
+def driver(
+    request: pytest.FixtureRequest,
+    setup: BrowserSession,
+    resource_monitor: ResourceMonitor,
+):
+    """Fixture to isolate the browser state of each test function, in its
+    own user context, or by cleaning the browser if it has none."""
+    request.config.stash[driver_used_key] = True
+    # recycle the browser first if it has grown past the thresholds
+    resource_monitor.begin(request.node.nodeid)
+    browser = setup.driver
+    isolated = setup.isolate()
+    if not isolated:
+        browser.get("about:blank")
+    if setup.events is not None:
+        setup.events.begin(request.node.nodeid)
+        start = setup.events.mark()
+    yield browser
+    delta = resource_monitor.end(request.node.nodeid)
+    request.node.user_properties.append(("resources", delta._asdict()))
+    if setup.events is not None:
+        errors = setup.events.errors(since=start)
+        request.node.user_properties.append(
+            ("browser_errors", [e._asdict() for e in errors])
+        )
+        setup.events.end()
+    if isolated:
+        # drops the context's cookies and storage with it
+        setup.release()
+        return
     # Clear cookies and storage to ensure clean state
-    setup.get("about:blank")
-    yield setup
-    setup.delete_all_cookies()
-    setup.execute_script("window.sessionStorage.clear();")
-    setup.execute_script("window.localStorage.clear();")
+    browser.delete_all_cookies()
+    browser.execute_script("window.sessionStorage.clear();")
+    browser.execute_script("window.localStorage.clear();")
+
+
+@pytest.fixture(scope="function")
+def browser_events(driver, setup: BrowserSession) -> EventStream:
+    """fixture to get the browser events of the test, e.g.
+
+    with browser_events.no_js_errors("checkout"):
+        page = page.finish_checkout()
+    """
+    if setup.events is None:
+        pytest.skip("browser events are disabled (BROWSER_EVENTS)")
+    return setup.events
 
 
 @pytest.fixture(scope="session")
@@ -72,3 +413,37 @@ def password() -> str:
 def user_info():
     request = Request(DATA_END_POINT)
     return json.loads(urlopen(request).read().decode("utf-8"))
+
+
+def pytest_terminal_summary(terminalreporter, config: pytest.Config):
+    """report browser recycles and the tests that grew the browser most"""
+    for caching_proxy in config.stash[proxies_key]:
+        terminalreporter.section("http proxy")
+        for line in caching_proxy.lines():
+            terminalreporter.write_line(line)
+    for monitor in config.stash[resource_monitors_key]:
+        if monitor.session.transport_metrics is not None:
+            terminalreporter.section(
+                f"driver transport ({monitor.session.browser})"
+            )
+            for line in monitor.session.transport_metrics.lines():
+                terminalreporter.write_line(line)
+        if not monitor.deltas:
+            continue
+        terminalreporter.section(
+            f"browser resources ({monitor.session.browser})"
+        )
+        terminalreporter.write_line(
+            f"browser recycled {monitor.session.recycles} time(s)"
+        )
+        for delta in monitor.leaks():
+            heap = (
+                "n/a"
+                if delta.js_heap is None
+                else f"{delta.js_heap / MB:+.1f}"
+            )
+            terminalreporter.write_line(
+                f"{delta.test}: rss {(delta.rss or 0) / MB:+.1f} MB, "
+                f"js heap {heap} MB, cpu {delta.cpu:+.2f} s, "
+                f"handles {delta.handles:+d}"
+            )
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Checkout pricing of a covering set of carts: every pair of products in
+and out of the cart, the cheapest and most expensive items alone and the
+whole catalog. The carts are checked out in the order that changes the cart
+the least, cancelling each checkout keeps the cart for the next one.
+"""
+
+from decimal import Decimal
+
+from swag_labs.pages.cart_page import CartPage
+from swag_labs.pages.checkout_overview import CheckoutOverviewPage
+from swag_labs.pages.inventory_page import InventoryPage
+from swag_labs.pages.login import LoginPage
+from tests.utils.cart_plan import plan_carts
+
+CHECKOUT_INFO = ("Cart", "Coverage", "12345")
+
+
+def goto_overview(page: InventoryPage) -> CheckoutOverviewPage:
+    cart = page.check_cart()
+    assert isinstance(cart, CartPage)
+    info = cart.goto_checkout()
+    info.enter_user_info(*CHECKOUT_INFO)
+    return info.continue_checkout()
+
+
+def test_cart_pricing_coverage(driver, username, password):
+    login_page = LoginPage(driver)
+    login_page.open()
+    inventory: InventoryPage = login_page.login(username, password)
+    assert isinstance(inventory, InventoryPage)
+
+    catalog = inventory.catalog()
+    assert catalog
+    in_cart = frozenset(item.name for item in catalog if item.in_cart)
+
+    for cart in plan_carts(catalog, start=in_cart):
+        for name in cart.items ^ in_cart:
+            item = inventory.get_item_by_name(name)
+            assert item is not None
+            if name in cart.items:
+                item.add_to_cart()
+            else:
+                item.remove_from_cart()
+        in_cart = cart.items
+        assert inventory.cart_count() == len(cart.items)
+
+        overview = goto_overview(inventory)
+        assert isinstance(overview, CheckoutOverviewPage)
+        items = sorted(cart.items)
+        assert sorted(item.name() for item in overview.items()) == items
+        assert Decimal(str(overview.price_before_tax())) == cart.subtotal
+        assert Decimal(str(overview.tax())) == cart.tax, items
+        assert Decimal(str(overview.price_after_tax())) == cart.total, items
+
+        inventory = overview.cancel_checkout()
+        assert isinstance(inventory, InventoryPage)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Data-driven validation of the checkout information form. The
+identities of `CHECKOUT_DATASET` are split in `CHECKOUT_DATASET_CHUNKS`
+chunks, each test streams its chunk through one checkout form, so the
+dataset is never loaded into memory.
+"""
+
+import itertools
+import os
+
+import pytest
+from environs import env
+
+from swag_labs.pages.checkout_info import CheckoutInfoPage
+from swag_labs.pages.login import LoginPage
+from tests.utils.datasets import identities
+
+DATASET = env.str("CHECKOUT_DATASET", default="")
+CHUNKS = env.int("CHECKOUT_DATASET_CHUNKS", default=4)
+SAMPLE = os.path.join(
+    os.path.dirname(__file__), "data", "checkout_identities.jsonl"
+)
+# failures reported in full, the others are only counted
+MAX_REPORTED = 20
+
+ITEM = "Sauce Labs Onesie"
+
+
+def test_chunks_split_dataset():
+    rows = list(identities(SAMPLE))
+    assert len(rows) == 8
+    for chunks in (1, 3, 8, 20):
+        assert [
+            row
+            for chunk in range(chunks)
+            for row in identities(SAMPLE, chunk, chunks)
+        ] == rows
+    generated = "generate:50:1"
+    assert sorted(identities(generated)) == sorted(
+        itertools.chain(*(identities(generated, c, 3) for c in range(3)))
+    )
+
+
+@pytest.mark.skipif(not DATASET, reason="set CHECKOUT_DATASET to run")
+@pytest.mark.parametrize("chunk", range(CHUNKS))
+def test_checkout_identities(driver, username, password, chunk):
+    login_page = LoginPage(driver)
+    login_page.open()
+    inventory = login_page.login(username, password)
+    inventory.add_item_to_cart(ITEM)
+    info: CheckoutInfoPage = inventory.check_cart().goto_checkout()
+
+    checked, failures, failed = 0, [], 0
+    for identity in identities(DATASET, chunk, CHUNKS):
+        # a fresh form, the cart is kept
+        info.open()
+        info.enter_user_info(*identity[:3])
+        page = info.continue_checkout()
+        # the form stays open with an error message when it's rejected
+        outcome = info.error_message() if page is info else ""
+        checked += 1
+        if outcome != identity.error:
+            failed += 1
+            if len(failures) < MAX_REPORTED:
+                failures.append(f"{identity}: got {outcome!r}")
+
+    assert not failed, f"{failed} of {checked} identities failed:\n" + (
+        "\n".join(failures)
+    )
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests of the test impact analysis of git diffs"""
+
+import os
+
+from tests.utils.impact import ImpactMap, changed_lines, classify
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULE = "swag_labs.pages.checkout_info"
+PATH = "src/swag_labs/pages/checkout_info.py"
+
+
+def diff(path: str, hunk: str) -> str:
+    return (
+        f"diff --git a/{path} b/{path}\n"
+        f"--- a/{path}\n+++ b/{path}\n"
+        f"{hunk}\n-removed\n+added\n"
+    )
+
+
+def line_of(text: str) -> int:
+    with open(os.path.join(ROOT, PATH), encoding="utf-8") as file:
+        for number, line in enumerate(file, 1):
+            if text in line:
+                return number
+    raise AssertionError(text)
+
+
+def test_changed_lines():
+    assert changed_lines(diff("a.py", "@@ -3,2 +3,4 @@")) == {"a.py": [(3, 6)]}
+    assert changed_lines(diff("a.py", "@@ -3 +2,0 @@")) == {"a.py": [(2, 3)]}
+
+
+def test_classify():
+    locator = line_of('FIRST_NAME_INPUT = (By.ID, "first-name")')
+    changes = classify(ROOT, diff(PATH, f"@@ -{locator} +{locator} @@"))
+    assert not changes.everything
+    assert changes.locators == {f"{MODULE}.CheckoutInfoPage.FIRST_NAME_INPUT"}
+    assert not changes.modules
+
+    method = line_of('"""enter user\'s first name"""')
+    changes = classify(ROOT, diff(PATH, f"@@ -{method} +{method} @@"))
+    assert changes.modules == {MODULE}
+
+    assert classify(ROOT, diff("README.md", "@@ -1 +1 @@")) == (
+        False,
+        set(),
+        set(),
+        set(),
+    )
+    assert classify(ROOT, diff("tests/conftest.py", "@@ -1 +1 @@")).everything
+
+
+def test_affected():
+    impact = ImpactMap()
+    impact.record("checkout", [MODULE], [], [f"{MODULE}.Page.A"])
+    impact.record("login", ["swag_labs.pages.login"], [], [])
+    changes = classify(ROOT, diff(PATH, "@@ -1 +1 @@"))
+    assert impact.affected(changes) == {"checkout"}
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests of the compilation of recorded journeys into replay plans"""
+
+import pytest
+
+from tests.utils.journey import compile_journey
+
+LOGIN = "https://www.saucedemo.com/"
+INVENTORY = "https://www.saucedemo.com/inventory.html"
+
+
+def find(using, value, ref=None, parent=None, multiple=False):
+    params = {"using": using, "value": value}
+    if parent is not None:
+        params["id"] = {"ref": parent}
+    command = "findChildElement" if parent is not None else "findElement"
+    if multiple:
+        command += "s"
+    entry = {"command": command, "params": params}
+    if ref is None:
+        entry["error"] = True
+    elif multiple:
+        entry["value"] = [{"ref": r} for r in ref]
+    else:
+        entry["value"] = {"ref": ref}
+    return entry
+
+
+def command(name, value=None, **params):
+    return {"command": name, "params": params, "value": value}
+
+
+def test_compile_journey():
+    steps = compile_journey(
+        [
+            command("get", url=LOGIN),
+            # polled until the login form is rendered
+            find("css selector", '[id="user-name"]'),
+            find("css selector", '[id="user-name"]', 0),
+            command("clearElement", id={"ref": 0}),
+            command("sendKeysToElement", id={"ref": 0}, text="standard_user"),
+            find("css selector", '[id="login-button"]', 1),
+            command("clickElement", id={"ref": 1}),
+            command("getCurrentUrl", LOGIN),
+            command("getCurrentUrl", INVENTORY),
+            find("css selector", ".inventory_item", [2, 3], multiple=True),
+            find("css selector", ".inventory_item_name", 4, parent=3),
+            command("getElementText", " Sauce Labs\n Onesie ", id={"ref": 4}),
+            find("css selector", ".shopping_cart_badge", [], multiple=True),
+        ]
+    )
+    assert [step.get("command", "batch") for step in steps] == [
+        "get",
+        "batch",
+        "clearElement",
+        "sendKeysToElement",
+        "batch",
+        "clickElement",
+        "batch",
+    ]
+    (login,) = steps[1]["batch"]["queries"]
+    assert (login["count"], login["exact"], login["refs"]) == (
+        1,
+        False,
+        [[0, 0]],
+    )
+
+    inventory = steps[-1]["batch"]
+    assert [q["value"] for q in inventory["queries"]] == [
+        ".inventory_item",
+        ".inventory_item_name",
+        ".shopping_cart_badge",
+    ]
+    assert inventory["queries"][2]["count"] == 0
+    assert inventory["queries"][2]["exact"]
+    assert [(r["kind"], r["expected"]) for r in inventory["reads"]] == [
+        ("getCurrentUrl", INVENTORY),
+        ("getElementText", "Sauce Labs Onesie"),
+    ]
+    assert inventory["defined"] == [2, 3, 4]
+    assert inventory["outer"] == []
+
+
+def test_unknown_element():
+    with pytest.raises(ValueError):
+        compile_journey([command("clickElement", id={"ref": 7})])
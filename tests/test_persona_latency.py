@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Latency budgets of the user journey for each swag-labs persona.
+Every page transition of the journey is timed until the new page's ready
+locator is present, and compared to the persona's budget from the latency
+budgets file (`LATENCY_BUDGETS`). Run with `pytest --perf`.
+"""
+
+import os
+
+import pytest
+from environs import env
+
+from swag_labs.pages.cart_page import CartPage
+from swag_labs.pages.checkout_complete import CheckoutCompletePage
+from swag_labs.pages.checkout_info import CheckoutInfoPage
+from swag_labs.pages.checkout_overview import CheckoutOverviewPage
+from swag_labs.pages.inventory_page import InventoryPage
+from swag_labs.pages.login import LoginPage
+from swag_labs.pages.product_page import ProductPage
+from tests.utils.latency import LatencyBudgets, TransitionTimer
+
+BUDGETS = LatencyBudgets.load(
+    env.str(
+        "LATENCY_BUDGETS",
+        default=os.path.join(
+            os.path.dirname(__file__), "data", "latency_budgets.json"
+        ),
+    )
+)
+
+ITEM = "Sauce Labs Onesie"
+CHECKOUT_INFO = ("Perf", "Tester", "12345")
+
+pytestmark = pytest.mark.perf
+
+
+def add_and_check_cart(page: ProductPage):
+    page.add_to_cart()
+    return page.check_cart()
+
+
+def fill_and_continue(page: CheckoutInfoPage):
+    page.enter_user_info(*CHECKOUT_INFO)
+    return page.continue_checkout()
+
+
+# step name, action from the previous page, expected page class
+JOURNEY = (
+    ("product_details", lambda p: p.item_details_page(ITEM), ProductPage),
+    ("open_cart", add_and_check_cart, CartPage),
+    ("checkout_info", lambda p: p.goto_checkout(), CheckoutInfoPage),
+    ("checkout_overview", fill_and_continue, CheckoutOverviewPage),
+    ("checkout_complete", lambda p: p.finish_checkout(), CheckoutCompletePage),
+)
+
+
+@pytest.mark.parametrize("username", BUDGETS.personas())
+def test_persona_latency(request, driver, username, password):
+    timer = TransitionTimer()
+
+    login_page = timer.open("open_login", LoginPage(driver))
+    assert login_page is not None
+
+    page = timer.transition(
+        "login", lambda: login_page.login(username, password), InventoryPage
+    )
+    # steps after a transition that didn't reach its page (e.g. a persona
+    # with a broken checkout form) can't be timed, they are violations
+    # unless the persona's budgets expect them to be unreachable
+    for step, action, expected in JOURNEY:
+        if page is None:
+            break
+        page = timer.transition(step, lambda: action(page), expected)
+
+    request.node.user_properties.append(
+        ("latency", [t._asdict() for t in timer.transitions])
+    )
+    violations = BUDGETS.violations(username, timer.timings())
+    assert not violations, "\n".join(violations)
@@ -7,16 +7,24 @@ adding products to the cart, verifying the contents, and completing a
 purchase using data from an external API.
 """
 
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 from urllib.parse import urlparse
 
-from swag_labs.pages import item_page
-from swag_labs.pages.cart_page import CartItem, CartPage
+import pytest
+
 from swag_labs.pages.checkout_complete import CheckoutCompletePage
-from swag_labs.pages.checkout_info import CheckoutInfoPage
 from swag_labs.pages.checkout_overview import CheckoutOverviewPage
-from swag_labs.pages.inventory_page import InventoryItem, InventoryPage
+from swag_labs.pages.inventory_page import InventoryPage
 from swag_labs.pages.login import LoginPage
-from swag_labs.pages.product_page import ProductPage
+
+# the other pages are imported by the registry when the journey gets there
+if TYPE_CHECKING:
+    from swag_labs.pages.cart_page import CartItem, CartPage
+    from swag_labs.pages.checkout_info import CheckoutInfoPage
+    from swag_labs.pages.inventory_page import InventoryItem
+    from swag_labs.pages.product_page import ProductPage
 
 ITEM1 = "Sauce Labs Fleece Jacket"
 ITEM2 = "Sauce Labs Onesie"
@@ -78,6 +86,7 @@ class TestUerJourney:
 
         return cart_page
 
+    @pytest.mark.journey
     def test_user_journey(self, driver, username, password, user_info):
         # login and goto products page
         products_page = self.user_login(driver, username, password)
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""pytest fixtures for the page object unit tests, run against the fake
+driver instead of a browser"""
+
+from typing import Iterator
+
+import pytest
+
+from swag_labs.catalog import CatalogIndex
+from swag_labs.pages.page import Page
+from swag_labs.timing import TimingPolicy
+from tests.unit.fake_driver import FakeDriver
+from tests.unit.swag_labs_app import SwagLabsApp
+
+
+@pytest.fixture(autouse=True)
+def no_waits():
+    """the fake's DOM is ready as soon as it's rendered, so waits check
+    once and never sleep"""
+    policy = Page.timing
+    Page.set_timing_policy(
+        TimingPolicy(default_timeout=0, default_poll=0, min_timeout=0)
+    )
+    yield
+    Page.set_timing_policy(policy)
+
+
+@pytest.fixture(autouse=True)
+def catalog_index() -> Iterator[CatalogIndex]:
+    """an empty catalog index, so tests don't see each other's products"""
+    index = Page.catalog_index
+    Page.set_catalog_index(CatalogIndex())
+    yield Page.catalog_index
+    Page.set_catalog_index(index)
+
+
+@pytest.fixture
+def app() -> SwagLabsApp:
+    """a fresh swag-labs application, logged out with an empty cart"""
+    return SwagLabsApp()
+
+
+# pylint: disable=redefined-outer-name
+@pytest.fixture
+def fake_driver(app: SwagLabsApp) -> FakeDriver:
+    """a fake driver serving app"""
+    return FakeDriver(app)
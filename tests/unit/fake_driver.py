@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""In-process fake of the WebDriver API used by the page objects, backed by
+an HTML document and scripted click handlers instead of a browser"""
+
+import re
+from html import escape
+from html.parser import HTMLParser
+from typing import Callable, Dict, Iterator, List, Tuple
+from urllib.parse import urljoin
+
+from selenium.common.exceptions import (
+    ElementNotInteractableException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+)
+
+from swag_labs.pages.by import By
+
+__all__ = (
+    "Node",
+    "parse_html",
+    "Selector",
+    "FakeElement",
+    "FakeDriver",
+)
+
+_VOID_TAGS = {
+    "area",
+    "base",
+    "br",
+    "col",
+    "embed",
+    "hr",
+    "img",
+    "input",
+    "link",
+    "meta",
+    "source",
+    "wbr",
+}
+
+
+class Node:
+    """an element of a parsed HTML document, text is kept in `children`
+    as strings"""
+
+    def __init__(self, tag: str, attrs: Dict[str, str] | None = None):
+        self.tag: str = tag
+        self.attrs: Dict[str, str] = attrs or {}
+        self.children: List["Node | str"] = []
+        self.parent: Node | None = None
+
+    @property
+    def classes(self) -> List[str]:
+        return self.attrs.get("class", "").split()
+
+    def append(self, child: "Node | str"):
+        if isinstance(child, Node):
+            child.parent = self
+        self.children.append(child)
+
+    def remove(self):
+        """detach the node from its parent"""
+        if self.parent is not None:
+            self.parent.children.remove(self)
+            self.parent = None
+
+    def elements(self) -> Iterator["Node"]:
+        """child elements, without the text"""
+        return (child for child in self.children if isinstance(child, Node))
+
+    def descendants(self) -> Iterator["Node"]:
+        """descendant elements in document order"""
+        for child in self.elements():
+            yield child
+            yield from child.descendants()
+
+    def ancestors(self) -> Iterator["Node"]:
+        node = self.parent
+        while node is not None:
+            yield node
+            node = node.parent
+
+    def root(self) -> "Node":
+        node = self
+        while node.parent is not None:
+            node = node.parent
+        return node
+
+    def is_hidden(self) -> bool:
+        """check if the node or one of its ancestors is hidden"""
+        return any(
+            "hidden" in node.attrs for node in (self, *self.ancestors())
+        )
+
+    def text(self) -> str:
+        """text content with the whitespace collapsed, like rendered text"""
+        parts = []
+
+        def collect(node: Node):
+            for child in node.children:
+                if isinstance(child, Node):
+                    collect(child)
+                else:
+                    parts.append(child)
+
+        collect(self)
+        return " ".join("".join(parts).split())
+
+    def html(self) -> str:
+        """serialize the node and its descendants"""
+        inner = "".join(
+            child.html() if isinstance(child, Node) else escape(child, False)
+            for child in self.children
+        )
+        if self.tag == "#document":
+            return inner
+        attrs = "".join(
+            f' {name}="{escape(value)}"' for name, value in self.attrs.items()
+        )
+        if self.tag in _VOID_TAGS:
+            return f"<{self.tag}{attrs}>"
+        return f"<{self.tag}{attrs}>{inner}</{self.tag}>"
+
+
+class _TreeBuilder(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.document = Node("#document")
+        self._open = [self.document]
+
+    def handle_starttag(self, tag, attrs):
+        node = Node(tag, {name: value or "" for name, value in attrs})
+        self._open[-1].append(node)
+        if tag not in _VOID_TAGS:
+            self._open.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        self._open[-1].append(Node(tag, {n: v or "" for n, v in attrs}))
+
+    def handle_endtag(self, tag):
+        for index in range(len(self._open) - 1, 0, -1):
+            if self._open[index].tag == tag:
+                del self._open[index:]
+                return
+
+    def handle_data(self, data):
+        self._open[-1].append(data)
+
+
+def parse_html(html: str) -> Node:
+    """parse an HTML document or fragment, returns the document node"""
+    builder = _TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.document
+
+
+_TOKEN = re.compile(
+    r"""\s*(?P<combinator>>)\s*
+    |(?P<space>\s+)
+    |(?P<tag>\*|[a-zA-Z][\w-]*)
+    |\#(?P<id>[\w-]+)
+    |\.(?P<cls>[\w-]+)
+    |\[\s*(?P<attr>[\w-]+)\s*
+        (?:=\s*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[\w-]+))\s*)?\]
+    """,
+    re.VERBOSE,
+)
+
+
+class Selector:
+    """A CSS selector of the subset the page objects use: tags, `*`, ids,
+    classes and `[attr]` / `[attr=value]` tests, combined with descendant
+    and child (`>`) combinators, and `,` separated lists.
+
+    Methods
+    -------
+        matches (node: Node): check if a node matches the selector.
+        select (root: Node): Returns the matching descendants of root.
+    """
+
+    def __init__(self, selector: str):
+        self.selector: str = selector
+        self.alternatives: List[List[Tuple[str, list]]] = [
+            self._parse(part) for part in selector.split(",")
+        ]
+
+    @staticmethod
+    def _parse(selector: str) -> List[Tuple[str, list]]:
+        """compound selectors, each with the combinator before it"""
+        compounds: List[Tuple[str, list]] = []
+        combinator = " "
+        tests: list = []
+        position = 0
+        selector = selector.strip()
+        while position < len(selector):
+            match = _TOKEN.match(selector, position)
+            if match is None or match.end() == position:
+                raise ValueError(f"Unsupported selector: {selector}")
+            position = match.end()
+            if match.group("combinator") or match.group("space"):
+                if tests:
+                    compounds.append((combinator, tests))
+                    tests = []
+                combinator = ">" if match.group("combinator") else " "
+            elif match.group("tag"):
+                tests.append(("tag", match.group("tag").lower()))
+            elif match.group("id"):
+                tests.append(("attr", ("id", match.group("id"))))
+            elif match.group("cls"):
+                tests.append(("class", match.group("cls")))
+            else:
+                value = next(
+                    (
+                        match.group(group)
+                        for group in ("dq", "sq", "bare")
+                        if match.group(group) is not None
+                    ),
+                    None,
+                )
+                tests.append(("attr", (match.group("attr"), value)))
+        if tests:
+            compounds.append((combinator, tests))
+        return compounds
+
+    @staticmethod
+    def _test(node: Node, tests: list) -> bool:
+        for kind, value in tests:
+            if kind == "tag" and value not in ("*", node.tag):
+                return False
+            if kind == "class" and value not in node.classes:
+                return False
+            if kind == "attr":
+                name, expected = value
+                if name not in node.attrs:
+                    return False
+                if expected is not None and node.attrs[name] != expected:
+                    return False
+        return True
+
+    def _matches(self, node: Node, compounds, scope: Node | None) -> bool:
+        combinator, tests = compounds[-1]
+        if not self._test(node, tests):
+            return False
+        if len(compounds) == 1:
+            return True
+        ancestor = node.parent
+        while ancestor is not None and ancestor is not scope:
+            if self._matches(ancestor, compounds[:-1], scope):
+                return True
+            if combinator == ">":
+                return False
+            ancestor = ancestor.parent
+        return False
+
+    def matches(self, node: Node, scope: Node | None = None) -> bool:
+        """check if node matches, with ancestors limited to scope's
+        descendants (like querySelectorAll on an element)"""
+        return any(
+            self._matches(node, compounds, scope)
+            for compounds in self.alternatives
+        )
+
+    def select(self, root: Node) -> List[Node]:
+        """descendants of root matching the selector, in document order"""
+        scope = None if root.tag == "#document" else root
+        return [
+            node for node in root.descendants() if self.matches(node, scope)
+        ]
+
+
+def to_css(by: str, value: str) -> str:
+    """the CSS selector the driver resolves a locator with"""
+    if by == By.ID:
+        return f'[id="{value}"]'
+    if by == By.NAME:
+        return f'[name="{value}"]'
+    if by == By.CLASS_NAME:
+        return f".{value}"
+    if by in (By.CSS_SELECTOR, By.TAG_NAME):
+        return value
+    raise ValueError(f"Locator strategy {by} isn't supported by the fake")
+
+
+class FakeElement:
+    """A class implementing the subset of `WebElement` used by the page
+    objects over a `Node` of the fake driver's document."""
+
+    def __init__(self, driver: "FakeDriver", node: Node):
+        self._driver: FakeDriver = driver
+        self._node: Node = node
+
+    @property
+    def node(self) -> Node:
+        """the element's node, raises if it's no longer in the document"""
+        if self._node.root() is not self._driver.document:
+            raise StaleElementReferenceException(
+                f"<{self._node.tag}> is no longer attached to the document"
+            )
+        return self._node
+
+    @property
+    def tag_name(self) -> str:
+        return self.node.tag
+
+    @property
+    def text(self) -> str:
+        return self.node.text()
+
+    def get_attribute(self, name: str) -> str | None:
+        return self.node.attrs.get(name)
+
+    get_dom_attribute = get_attribute
+
+    def is_displayed(self) -> bool:
+        return not self.node.is_hidden()
+
+    def is_enabled(self) -> bool:
+        return "disabled" not in self.node.attrs
+
+    def click(self):
+        node = self.node
+        if node.is_hidden():
+            raise ElementNotInteractableException(
+                f"<{node.tag}> is not displayed"
+            )
+        self._driver.click(node)
+
+    def clear(self):
+        self.node.attrs["value"] = ""
+
+    def send_keys(self, *values: str):
+        node = self.node
+        node.attrs["value"] = node.attrs.get("value", "") + "".join(values)
+
+    def find_element(self, by: str = By.ID, value: str | None = None):
+        return self._driver._first(self.node, by, value)
+
+    def find_elements(self, by: str = By.ID, value: str | None = None):
+        return self._driver._all(self.node, by, value)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, FakeElement) and other._node is self._node
+
+    def __hash__(self) -> int:
+        return id(self._node)
+
+
+class FakeDriver:
+    """A class implementing the subset of `WebDriver` used by the page
+    objects, over an application that renders documents for urls.
+
+    The application is any object with:
+
+        - render(url) -> (str, str): url the document is served at (to
+          redirect) and HTML of the document at url.
+        - on_click(driver, node) -> None: react to a click on node.
+        - scripts: dict mapping scripts (by their source) to handlers called
+          with (driver, *args) by execute_script, other scripts return None.
+
+    Attributes
+    ----------
+        current_url (str): url of the current document.
+        document (Node): the current document.
+        loads (int): number of documents loaded (full page loads).
+
+    Methods
+    -------
+        get (url: str): load a document.
+        navigate (url: str): switch the document without a page load, as a
+        client-side route change does.
+        click (node: Node): click on a node of the document.
+    """
+
+    def __init__(self, app, url: str = "about:blank"):
+        self.app = app
+        self.current_url: str = url
+        self.document: Node = parse_html("")
+        self.loads: int = 0
+        self.session_id: str = "fake"
+
+    @property
+    def title(self) -> str:
+        titles = Selector("title").select(self.document)
+        return titles[0].text() if titles else ""
+
+    @property
+    def page_source(self) -> str:
+        return "<!DOCTYPE html>" + self.document.html()
+
+    def _render(self, url: str):
+        self.current_url, html = self.app.render(
+            urljoin(self.current_url, url)
+        )
+        self.document = parse_html(html)
+
+    def get(self, url: str):
+        self.loads += 1
+        self._render(url)
+
+    def navigate(self, url: str):
+        self._render(url)
+
+    def click(self, node: Node):
+        self.app.on_click(self, node)
+
+    def _all(
+        self, root: Node, by: str, value: str | None
+    ) -> List[FakeElement]:
+        if value is None:
+            raise ValueError(f"Locator {by} has no value")
+        selector = Selector(to_css(by, value))
+        return [FakeElement(self, node) for node in selector.select(root)]
+
+    def _first(self, root: Node, by: str, value: str | None) -> FakeElement:
+        elements = self._all(root, by, value)
+        if not elements:
+            raise NoSuchElementException(f"Unable to locate {by}={value}")
+        return elements[0]
+
+    def find_element(self, by: str = By.ID, value: str | None = None):
+        return self._first(self.document, by, value)
+
+    def find_elements(self, by: str = By.ID, value: str | None = None):
+        return self._all(self.document, by, value)
+
+    def execute_script(self, script: str, *args):
+        handler: Callable | None = self.app.scripts.get(script)
+        return handler(self, *args) if handler is not None else None
+
+    def implicitly_wait(self, seconds: float):
+        pass
+
+    def delete_all_cookies(self):
+        pass
+
+    def quit(self):
+        pass
@@ -0,0 +1,606 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Scripted swag-labs application served to the fake driver, each route is
+rendered from the HTML fixtures and clicks update the state and the DOM
+the way the website does"""
+
+import json
+import os
+import re
+from decimal import ROUND_HALF_UP, Decimal
+from html import escape
+from operator import attrgetter
+from string import Template
+from typing import Callable, Dict, List, NamedTuple, Tuple
+from urllib.parse import parse_qs, urlsplit, urlunsplit
+
+from swag_labs.pages.inventory_page import _CATALOG_SCRIPT
+from swag_labs.pages.page import _METRICS_SCRIPT, _SOFT_NAVIGATION_SCRIPT
+from tests.unit.fake_driver import FakeDriver, Node, Selector, parse_html
+from tests.utils.crawler import _CLEAR_STORAGE_SCRIPT, _STATE_SCRIPT
+
+__all__ = (
+    "Product",
+    "SwagLabsApp",
+)
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+PASSWORD = "secret_sauce"
+USERS = (
+    "standard_user",
+    "locked_out_user",
+    "problem_user",
+    "performance_glitch_user",
+    "error_user",
+    "visual_user",
+)
+LOCKED_OUT_USERS = ("locked_out_user",)
+TAX_RATE = Decimal("0.08")
+
+_TEMPLATES: Dict[str, Template] = {}
+
+
+def _template(name: str) -> Template:
+    if name not in _TEMPLATES:
+        with open(os.path.join(FIXTURES, name), encoding="utf-8") as file:
+            _TEMPLATES[name] = Template(file.read())
+    return _TEMPLATES[name]
+
+
+def render(fixture: str, /, **values) -> str:
+    """render an HTML fixture, values are escaped unless given as _html"""
+    values = {
+        key: value if key.endswith("_html") else escape(str(value))
+        for key, value in values.items()
+    }
+    return _template(fixture).substitute(
+        {key.removesuffix("_html"): value for key, value in values.items()}
+    )
+
+
+class Product(NamedTuple):
+    """an item of the fixture catalog"""
+
+    id: int
+    name: str
+    description: str
+    price: Decimal
+    image: str
+
+    @property
+    def slug(self) -> str:
+        """the suffix of the item's button ids"""
+        return self.name.lower().replace(" ", "-")
+
+
+def load_catalog() -> List[Product]:
+    """the fixture catalog, in the inventory's default order"""
+    with open(os.path.join(FIXTURES, "catalog.json"), encoding="utf-8") as f:
+        return [
+            Product(
+                item["id"],
+                item["name"],
+                item["description"],
+                Decimal(item["price"]),
+                item["image"],
+            )
+            for item in json.load(f)
+        ]
+
+
+class SwagLabsApp:
+    """A class that serves the swag-labs routes to a `FakeDriver`.
+
+    Like the website, the login and the cart outlive page loads, clicks
+    that stay on a route update its DOM in place (so the other elements
+    stay valid) and clicks that change the route render a new document.
+
+    Attributes
+    ----------
+        catalog (list): the products of the inventory.
+        user (str): the logged in user, None if logged out.
+        cart (list): ids of the products in the cart, in the order added.
+        info (dict): the checkout information entered.
+
+    Methods
+    -------
+        render (url: str): Returns the url and HTML of a route.
+        on_click (driver: FakeDriver, node: Node): react to a click.
+    """
+
+    PROTECTED_ROUTES = (
+        "/inventory.html",
+        "/inventory-item.html",
+        "/cart.html",
+        "/checkout-step-one.html",
+        "/checkout-step-two.html",
+        "/checkout-complete.html",
+    )
+
+    # label, key and direction of the sort dropdown's options, the price
+    # sorts keep the name order of equal prices like the app's stable sort
+    SORTS = {
+        "az": ("Name (A to Z)", attrgetter("name"), False),
+        "za": ("Name (Z to A)", attrgetter("name"), True),
+        "lohi": ("Price (low to high)", attrgetter("price"), False),
+        "hilo": ("Price (high to low)", attrgetter("price"), True),
+    }
+
+    def __init__(self):
+        self.catalog: List[Product] = load_catalog()
+        self.user: str | None = None
+        self.cart: List[int] = []
+        self.info: Dict[str, str] = {}
+        self.scripts: Dict[str, Callable] = {
+            _CATALOG_SCRIPT: self._catalog_script,
+            _SOFT_NAVIGATION_SCRIPT: self._soft_navigation_script,
+            _METRICS_SCRIPT: self._metrics_script,
+            _STATE_SCRIPT: self._state_script,
+            _CLEAR_STORAGE_SCRIPT: self._clear_storage_script,
+            # the load runner's virtual users clear each storage apart
+            "window.sessionStorage.clear();": self._clear_storage_script,
+            "window.localStorage.clear();": self._clear_storage_script,
+        }
+
+    def product(self, product_id: int) -> Product | None:
+        """the product with an id"""
+        for product in self.catalog:
+            if product.id == product_id:
+                return product
+        return None
+
+    def cart_products(self) -> List[Product]:
+        """the products in the cart, in the order they were added"""
+        products = (self.product(product_id) for product_id in self.cart)
+        return [product for product in products if product is not None]
+
+    def _by_slug(self, slug: str) -> Product | None:
+        for product in self.catalog:
+            if product.slug == slug:
+                return product
+        return None
+
+    # rendering
+
+    def render(self, url: str) -> Tuple[str, str]:
+        """url and HTML of a route, protected routes redirect to the login
+        page when logged out"""
+        parts = urlsplit(url)
+        route = parts.path or "/"
+        if route in self.PROTECTED_ROUTES and self.user is None:
+            home = urlunsplit(parts._replace(path="/", query="", fragment=""))
+            message = (
+                f"Epic sadface: You can only access '{route}' "
+                "when you are logged in."
+            )
+            return home, self._layout(self._login(message))
+        query = parse_qs(parts.query)
+        pages: Dict[str, Callable[[], str]] = {
+            "/": self._login,
+            "/inventory.html": self._inventory,
+            "/inventory-item.html": lambda: self._product(query),
+            "/cart.html": self._cart,
+            "/checkout-step-one.html": self._checkout_info,
+            "/checkout-step-two.html": self._checkout_overview,
+            "/checkout-complete.html": self._checkout_complete,
+        }
+        page = pages.get(route)
+        if page is None:
+            return url, "<html><body><h1>Not Found</h1></body></html>"
+        return url, self._layout(page())
+
+    @staticmethod
+    def _layout(content_html: str) -> str:
+        return render("layout.html", content_html=content_html)
+
+    def _badge(self) -> str:
+        if not self.cart:
+            return ""
+        return render("badge.html", count=len(self.cart))
+
+    def _header(self, secondary_html: str, content_html: str) -> str:
+        return render(
+            "header.html",
+            badge_html=self._badge(),
+            secondary_html=secondary_html,
+            content_html=content_html,
+        )
+
+    @staticmethod
+    def _title(title: str) -> str:
+        return render("title.html", title=title)
+
+    @staticmethod
+    def _error(message: str) -> str:
+        return render("error.html", message=message)
+
+    def _login(self, error: str = "") -> str:
+        return render(
+            "login.html",
+            error_class=" error" if error else "",
+            error_html=self._error(error) if error else "",
+        )
+
+    @staticmethod
+    def _button(product: Product, in_cart: bool, kind: str, slug=True):
+        button_id = "remove" if in_cart else "add-to-cart"
+        if slug:
+            button_id += f"-{product.slug}"
+        return render(
+            "cart_button.html",
+            style="btn_secondary" if in_cart else "btn_primary",
+            kind=kind,
+            button_id=button_id,
+            label="Remove" if in_cart else "Add to cart",
+        )
+
+    def _inventory_items(self, sort: str) -> str:
+        key, reverse = self.SORTS[sort][1:]
+        return "".join(
+            render(
+                "inventory_item.html",
+                id=product.id,
+                name=product.name,
+                description=product.description,
+                price=product.price,
+                image=product.image,
+                button_html=self._button(
+                    product, product.id in self.cart, "btn_inventory"
+                ),
+            )
+            for product in sorted(self.catalog, key=key, reverse=reverse)
+        )
+
+    def _inventory(self) -> str:
+        secondary = render(
+            "inventory_secondary.html", active_option=self.SORTS["az"][0]
+        )
+        return self._header(
+            secondary,
+            render("inventory.html", items_html=self._inventory_items("az")),
+        )
+
+    def _product(self, query: Dict[str, List[str]]) -> str:
+        try:
+            product = self.product(int(query["id"][0]))
+        except (KeyError, ValueError):
+            product = None
+        if product is None:
+            return self._header("", "<div>ITEM NOT FOUND</div>")
+        content = render(
+            "product.html",
+            name=product.name,
+            description=product.description,
+            price=product.price,
+            image=product.image,
+            button_html=self._button(
+                product, product.id in self.cart, "btn_inventory", slug=False
+            ),
+        )
+        return self._header(render("product_secondary.html"), content)
+
+    def _cart_items(self, removable: bool) -> str:
+        rows = []
+        for product in self.cart_products():
+            button = ""
+            if removable:
+                button = self._button(product, True, "cart_button")
+            rows.append(
+                render(
+                    "cart_item.html",
+                    id=product.id,
+                    name=product.name,
+                    description=product.description,
+                    price=product.price,
+                    button_html=button,
+                )
+            )
+        return "".join(rows)
+
+    def _cart(self) -> str:
+        return self._header(
+            self._title("Your Cart"),
+            render("cart.html", items_html=self._cart_items(True)),
+        )
+
+    def _checkout_info(self) -> str:
+        return self._header(
+            self._title("Checkout: Your Information"),
+            render("checkout_step_one.html"),
+        )
+
+    def totals(self) -> Tuple[Decimal, Decimal, Decimal]:
+        """item total, tax and total of the cart"""
+        subtotal = sum(
+            (product.price for product in self.cart_products()),
+            Decimal(0),
+        )
+        tax = (subtotal * TAX_RATE).quantize(
+            Decimal("0.01"), rounding=ROUND_HALF_UP
+        )
+        return subtotal, tax, subtotal + tax
+
+    def _checkout_overview(self) -> str:
+        subtotal, tax, total = self.totals()
+        return self._header(
+            self._title("Checkout: Overview"),
+            render(
+                "checkout_step_two.html",
+                items_html=self._cart_items(False),
+                subtotal=subtotal,
+                tax=tax,
+                total=total,
+            ),
+        )
+
+    def _checkout_complete(self) -> str:
+        return self._header(
+            self._title("Checkout: Complete!"),
+            render("checkout_complete.html"),
+        )
+
+    # in place updates
+
+    @staticmethod
+    def _select(driver: FakeDriver, selector: str) -> List[Node]:
+        return Selector(selector).select(driver.document)
+
+    @staticmethod
+    def _replace(node: Node, html: str):
+        """replace the children of node with the parsed html"""
+        for child in list(node.elements()):
+            child.remove()
+        node.children.clear()
+        for content in list(parse_html(html).children):
+            node.append(content)
+
+    def _update_badge(self, driver: FakeDriver):
+        for link in self._select(driver, ".shopping_cart_link"):
+            self._replace(link, self._badge())
+
+    def _show_error(self, driver: FakeDriver, message: str):
+        for container in self._select(driver, ".error-message-container"):
+            container.attrs["class"] = "error-message-container error"
+            self._replace(container, self._error(message))
+
+    def _sort(self, driver: FakeDriver, option: Node):
+        sort = option.attrs["value"]
+        for node in self._select(driver, ".active_option"):
+            self._replace(node, self.SORTS[sort][0])
+        for node in self._select(driver, ".inventory_list"):
+            self._replace(node, self._inventory_items(sort))
+
+    def _toggle(self, driver: FakeDriver, node: Node, product: Product | None):
+        if product is None:
+            return
+        if product.id in self.cart:
+            self.cart.remove(product.id)
+        else:
+            self.cart.append(product.id)
+        in_cart = product.id in self.cart
+        row = next(
+            (
+                ancestor
+                for ancestor in node.ancestors()
+                if "cart_item" in ancestor.classes
+            ),
+            None,
+        )
+        if row is not None:
+            # removed from the cart page, the row goes away
+            row.remove()
+        else:
+            (button,) = parse_html(
+                self._button(
+                    product,
+                    in_cart,
+                    "btn_inventory",
+                    slug=node.attrs["id"] not in ("add-to-cart", "remove"),
+                )
+            ).elements()
+            node.attrs = button.attrs
+            self._replace(node, button.text())
+        self._update_badge(driver)
+
+    # clicks
+
+    @staticmethod
+    def _navigate(driver: FakeDriver, route: str):
+        """client-side route change, like the app's router"""
+        scheme, host = urlsplit(driver.current_url)[:2]
+        driver.navigate(f"{scheme}://{host}{route}")
+
+    def on_click(self, driver: FakeDriver, node: Node):
+        """run the handler of the clicked node or of its closest ancestor
+        that has one"""
+        for target in (node, *node.ancestors()):
+            if self._handle(driver, target):
+                return
+
+    def _handle(self, driver: FakeDriver, node: Node) -> bool:
+        node_id = node.attrs.get("id", "")
+        route = urlsplit(driver.current_url).path
+        if node_id == "login-button":
+            self._login_click(driver)
+        elif node_id == "react-burger-menu-btn":
+            for menu in self._select(driver, ".bm-menu-wrap"):
+                menu.attrs.pop("hidden", None)
+        elif node_id == "react-burger-cross-btn":
+            for menu in self._select(driver, ".bm-menu-wrap"):
+                menu.attrs["hidden"] = ""
+        elif node_id == "logout_sidebar_link":
+            self.user = None
+            self._navigate(driver, "/")
+        elif node_id == "reset_sidebar_link":
+            self.cart.clear()
+            driver.navigate(driver.current_url)
+        elif node_id == "inventory_sidebar_link":
+            self._navigate(driver, "/inventory.html")
+        elif node_id in ("add-to-cart", "remove"):
+            query = parse_qs(urlsplit(driver.current_url).query)
+            self._toggle(driver, node, self.product(int(query["id"][0])))
+        elif match := re.fullmatch(r"(?:add-to-cart|remove)-(.+)", node_id):
+            self._toggle(driver, node, self._by_slug(match.group(1)))
+        elif match := re.fullmatch(r"item_(\d+)_(title|img)_link", node_id):
+            self._navigate(driver, f"/inventory-item.html?id={match.group(1)}")
+        elif (
+            node.tag == "option"
+            and node.parent is not None
+            and "product_sort_container" in node.parent.classes
+        ):
+            self._sort(driver, node)
+        elif "shopping_cart_link" in node.classes:
+            self._navigate(driver, "/cart.html")
+        elif node_id in ("back-to-products", "continue-shopping"):
+            self._navigate(driver, "/inventory.html")
+        elif node_id == "checkout":
+            self._navigate(driver, "/checkout-step-one.html")
+        elif node_id == "continue":
+            self._continue_click(driver)
+        elif node_id == "cancel":
+            self._navigate(
+                driver,
+                (
+                    "/cart.html"
+                    if route == "/checkout-step-one.html"
+                    else "/inventory.html"
+                ),
+            )
+        elif node_id == "finish":
+            self.cart.clear()
+            self._navigate(driver, "/checkout-complete.html")
+        else:
+            return False
+        return True
+
+    @staticmethod
+    def _value(driver: FakeDriver, input_id: str) -> str:
+        (node,) = Selector(f'[id="{input_id}"]').select(driver.document)
+        return node.attrs.get("value", "")
+
+    def _login_click(self, driver: FakeDriver):
+        username = self._value(driver, "user-name")
+        password = self._value(driver, "password")
+        if not username:
+            self._show_error(driver, "Epic sadface: Username is required")
+        elif not password:
+            self._show_error(driver, "Epic sadface: Password is required")
+        elif username not in USERS or password != PASSWORD:
+            self._show_error(
+                driver,
+                "Epic sadface: Username and password do not match any "
+                "user in this service",
+            )
+        elif username in LOCKED_OUT_USERS:
+            self._show_error(
+                driver, "Epic sadface: Sorry, this user has been locked out."
+            )
+        else:
+            self.user = username
+            self._navigate(driver, "/inventory.html")
+
+    def _continue_click(self, driver: FakeDriver):
+        fields = (
+            ("first-name", "First Name"),
+            ("last-name", "Last Name"),
+            ("postal-code", "Postal Code"),
+        )
+        for input_id, label in fields:
+            value = self._value(driver, input_id)
+            if not value:
+                self._show_error(driver, f"Error: {label} is required")
+                return
+            self.info[input_id] = value
+        self._navigate(driver, "/checkout-step-two.html")
+
+    # scripts
+
+    @staticmethod
+    def _catalog_script(
+        driver, container, name, description, price, button, link
+    ):
+        def text(item: Node, selector: str) -> str:
+            found = Selector(selector).select(item)
+            return found[0].text() if found else ""
+
+        def link_id(item: Node) -> str:
+            found = Selector(link).select(item)
+            return found[0].attrs.get("id", "") if found else ""
+
+        return [
+            {
+                "name": text(item, name),
+                "description": text(item, description),
+                "price": text(item, price),
+                "button": text(item, button),
+                "link": link_id(item),
+            }
+            for item in Selector(container).select(driver.document)
+        ]
+
+    @staticmethod
+    def _soft_navigation_script(driver, target, app_root):
+        if not Selector(app_root).select(driver.document):
+            return False
+        if urlsplit(target)[:2] != urlsplit(driver.current_url)[:2]:
+            return False
+        driver.navigate(target)
+        return True
+
+    def _state_script(self, driver, selectors):
+        def clickable(node: Node) -> bool:
+            return (
+                node.tag in ("a", "button")
+                or node.attrs.get("role") == "button"
+                or (
+                    node.tag == "input"
+                    and node.attrs.get("type") in ("submit", "button")
+                )
+            )
+
+        def editable(node: Node) -> bool:
+            return node.tag == "textarea" or (
+                node.tag == "input"
+                and node.attrs.get("type") not in ("submit", "button")
+            )
+
+        matches = []
+        for kind, selector in selectors:
+            nodes = (
+                Selector(selector).select(driver.document)
+                if kind == "css"
+                else []
+            )
+            matches.append(
+                {
+                    "clickable": [
+                        i for i, node in enumerate(nodes) if clickable(node)
+                    ],
+                    "editable": any(editable(node) for node in nodes),
+                }
+            )
+        parts = urlsplit(driver.current_url)
+        return {
+            "url": parts.path + (f"?{parts.query}" if parts.query else ""),
+            "dom": driver.document.html(),
+            "storage": json.dumps([self.user, self.cart]),
+            "locators": matches,
+        }
+
+    def _clear_storage_script(self, driver):
+        """the login and the cart are kept by the app instead of the
+        browser's cookies and storage"""
+        self.user = None
+        self.cart.clear()
+
+    @staticmethod
+    def _metrics_script(driver):
+        return {
+            "url": driver.current_url,
+            "now": 0,
+            "navigation": None,
+            "paint": [],
+            "longTasks": [],
+        }
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests of the failure artifacts writer's size cap and pruning, and of
+their capture from a stub browser"""
+
+import gzip
+import json
+import os
+
+from selenium.common.exceptions import WebDriverException
+
+from tests.utils.artifacts import ArtifactWriter, FailureArtifacts
+
+
+class StubDriver:
+    """a browser showing a page, or gone if `error` is set"""
+
+    def __init__(self, error: bool = False):
+        self.error: bool = error
+
+    @property
+    def current_url(self) -> str:
+        if self.error:
+            raise WebDriverException("browser is gone")
+        return "https://www.saucedemo.com/cart.html"
+
+    def get_screenshot_as_png(self) -> bytes:
+        return b"\x89PNG"
+
+    @property
+    def page_source(self) -> str:
+        return "<html></html>"
+
+
+def test_write(tmp_path):
+    writer = ArtifactWriter(str(tmp_path), "run")
+    try:
+        directory = writer.submit(
+            "tests/test_cart.py::test_add[chrome]",
+            {"screenshot.png": b"\x89PNG", "page.html": b"<html></html>"},
+        )
+        writer.flush()
+    finally:
+        writer.close()
+    assert directory == str(
+        tmp_path / "run" / "tests_test_cart.py_test_add_chrome"
+    )
+    # screenshots are already compressed, they are written as is
+    with open(os.path.join(directory, "screenshot.png"), "rb") as file:
+        assert file.read() == b"\x89PNG"
+    with gzip.open(os.path.join(directory, "page.html.gz")) as file:
+        assert file.read() == b"<html></html>"
+    assert (writer.dropped, writer.written) == (
+        0,
+        sum(entry.stat().st_size for entry in os.scandir(directory)),
+    )
+
+
+def test_size_cap(tmp_path):
+    writer = ArtifactWriter(str(tmp_path), "run", max_bytes=10)
+    try:
+        directory = writer.submit(
+            "test",
+            {
+                "screenshot.png": b"\x89PNG",
+                "page.html": b"<html></html>" * 100,
+                "page.json": b"{}",
+            },
+        )
+        writer.flush()
+    finally:
+        writer.close()
+    # the page.html is over the cap, the small page.json is always kept
+    assert sorted(os.listdir(directory)) == ["page.json.gz", "screenshot.png"]
+    assert writer.dropped == 1
+    assert writer.written > writer.max_bytes
+
+
+def test_prune(tmp_path):
+    for age, run in enumerate(("newest", "new", "old", "oldest")):
+        os.makedirs(tmp_path / run)
+        os.utime(tmp_path / run, (1000 - age, 1000 - age))
+    (tmp_path / "notes.txt").write_text("not a run")
+    writer = ArtifactWriter(str(tmp_path), "current", keep_runs=2)
+    try:
+        writer.prune()
+    finally:
+        writer.close()
+    assert sorted(os.listdir(tmp_path)) == ["new", "newest", "notes.txt"]
+
+
+def test_capture(tmp_path):
+    writer = ArtifactWriter(str(tmp_path), "run")
+    try:
+        plugin = FailureArtifacts(writer)
+        artifacts = plugin.capture(StubDriver())
+        # the stub has no console logs
+        assert sorted(artifacts) == [
+            "page.html",
+            "page.json",
+            "screenshot.png",
+        ]
+        assert json.loads(artifacts["page.json"]) == {
+            "url": "https://www.saucedemo.com/cart.html",
+            "page": None,
+            "page_url": None,
+        }
+
+        artifacts = plugin.capture(StubDriver(error=True))
+        assert list(artifacts) == ["page.json"]
+        assert json.loads(artifacts["page.json"])["error"] == "browser is gone"
+    finally:
+        writer.close()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests of the user context isolation, with a stub BiDi browser"""
+
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Dict, List, cast
+
+from selenium.common.exceptions import WebDriverException
+
+from tests.utils.contexts import BrowserContext, UserContexts
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+
+class StubDriver:
+    """a browser with user contexts, unless `contexts` is False, whose
+    tabs fail to open if `tabs` is False"""
+
+    def __init__(self, contexts: bool = True, tabs: bool = True):
+        self.contexts: bool = contexts
+        self.tabs: bool = tabs
+        self.user_contexts: Dict[str, List[str]] = {}
+        self.created: int = 0
+        self.current_window_handle: str = "home"
+        self.browser = SimpleNamespace(
+            create_user_context=self._create_user_context,
+            remove_user_context=self.user_contexts.pop,
+        )
+        self.browsing_context = SimpleNamespace(create=self._create_tab)
+        self.switch_to = SimpleNamespace(window=self._switch)
+
+    def _create_user_context(self) -> str:
+        if not self.contexts:
+            raise WebDriverException("unknown command")
+        user_context = f"context-{self.created}"
+        self.created += 1
+        self.user_contexts[user_context] = []
+        return user_context
+
+    def _create_tab(self, kind: str, user_context: str) -> str:
+        if not self.tabs:
+            raise WebDriverException("unsupported operation")
+        handle = f"{user_context}-{kind}"
+        self.user_contexts[user_context].append(handle)
+        return handle
+
+    def _switch(self, handle: str):
+        self.current_window_handle = handle
+
+
+def contexts_of(driver: StubDriver) -> UserContexts:
+    """user contexts of the stub browser"""
+    return UserContexts(cast("WebDriver", driver))
+
+
+def test_open_and_close():
+    driver = StubDriver()
+    contexts = contexts_of(driver)
+    context = contexts.open()
+    assert context == BrowserContext("context-0", "context-0-tab")
+    assert driver.current_window_handle == "context-0-tab"
+    assert contexts.supported
+
+    # a context opened over another one replaces it
+    assert contexts.open() == BrowserContext("context-1", "context-1-tab")
+    assert list(driver.user_contexts) == ["context-1"]
+    assert driver.current_window_handle == "context-1-tab"
+
+    contexts.close()
+    assert contexts.current is None
+    assert not driver.user_contexts
+    assert driver.current_window_handle == "home"
+    assert contexts.opened == 2
+    # closing without a context is a no-op
+    contexts.close()
+
+
+def test_unsupported():
+    driver = StubDriver(contexts=False)
+    contexts = contexts_of(driver)
+    assert contexts.open() is None
+    assert contexts.supported is False
+    # it isn't tried again
+    driver.contexts = True
+    assert contexts.open() is None
+    assert not driver.user_contexts
+
+
+def test_tab_fails():
+    driver = StubDriver(tabs=False)
+    contexts = contexts_of(driver)
+    assert contexts.open() is None
+    assert contexts.supported is False
+    # the context created without its tab is removed
+    assert not driver.user_contexts
+    assert driver.current_window_handle == "home"
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests of the state crawler, against the fake driver"""
+
+from typing import TYPE_CHECKING, cast
+
+from tests.unit.fake_driver import FakeDriver
+from tests.utils.crawler import StateCrawler, edge_cover
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+
+def walk(edges, path):
+    node = 0
+    for index in path:
+        assert edges[index][0] == node
+        node = edges[index][1]
+
+
+def test_edge_cover():
+    #   0 -> 1 -> 2 -> 1, 0 -> 2 -> 3, 1 -> 3
+    edges = [(0, 1), (1, 2), (2, 1), (0, 2), (2, 3), (1, 3)]
+    paths = edge_cover(4, edges)
+    # 0 leaves twice and is never entered, 3 is entered twice
+    assert len(paths) == 2
+    for path in paths:
+        walk(edges, path)
+    assert sorted(i for path in paths for i in path) == list(range(6))
+    # a cycle through the root is one walk
+    assert edge_cover(2, [(0, 1), (1, 0)]) == [[0, 1]]
+
+
+def test_crawl(fake_driver: FakeDriver):
+    crawler = StateCrawler(
+        cast("WebDriver", fake_driver), item_classes={}
+    ).crawl()
+    pages = {state.page for state in crawler.states}
+    assert "CheckoutCompletePage" in pages
+    # the burger menu's logout link can't be clicked until it's opened
+    assert {str(action) for _, action, _ in crawler.failed} == {
+        "InventoryPage.LOGOUT_LINK[0]"
+    }
+    edges = [(edge.source, edge.target) for edge in crawler.edges]
+    assert len(set(state.digest for state in crawler.states)) == len(
+        crawler.states
+    )
+    paths = crawler.cover()
+    covered = set()
+    for path in paths:
+        walk(edges, [crawler.edges.index(edge) for edge in path])
+        covered.update(path)
+    assert covered == set(crawler.edges)
+    assert all(
+        path[0].startswith("LoginPage.") for path in crawler.to_json()["paths"]
+    )
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests of the browser event stream's buffering and correlation, with a
+stub BiDi connection"""
+
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Callable, Dict, cast
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from tests.utils.events import EventStream
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+
+class StubConnection:
+    """a BiDi connection keeping the callback of each event"""
+
+    def __init__(self):
+        self.commands: list = []
+        self.callbacks: Dict[str, Callable[[dict], None]] = {}
+
+    def execute(self, command):
+        self.commands.append(next(command))
+
+    def add_callback(self, event, callback: Callable[[dict], None]):
+        self.callbacks[event.event_class] = callback
+
+
+class StubDriver:
+    """a driver started with BiDi enabled, or without if `bidi` is False"""
+
+    def __init__(self, bidi: bool = True):
+        self.bidi: bool = bidi
+        self.connection: StubConnection = StubConnection()
+
+    @property
+    def network(self):
+        if not self.bidi:
+            raise WebDriverException("BiDi is not enabled")
+        return SimpleNamespace(conn=self.connection)
+
+
+def attached(stream: EventStream) -> StubConnection:
+    """the connection of a stub driver the stream is attached to"""
+    driver = StubDriver()
+    assert stream.attach(cast("WebDriver", driver))
+    return driver.connection
+
+
+def log(text: str, level: str = "info", kind: str = "console") -> dict:
+    return {
+        "type": kind,
+        "level": level,
+        "text": text,
+        "stackTrace": {"callFrames": [{"url": "https://host/main.js"}]},
+    }
+
+
+def test_attach():
+    stream = EventStream(network=False)
+    connection = attached(stream)
+    assert stream.available
+    assert connection.commands == [
+        {
+            "method": "session.subscribe",
+            "params": {"events": ("log.entryAdded",)},
+        }
+    ]
+    assert list(connection.callbacks) == ["log.entryAdded"]
+
+    assert not stream.attach(cast("WebDriver", StubDriver(bidi=False)))
+    assert not stream.available
+
+
+def test_buffer():
+    stream = EventStream(capacity=3)
+    callback = attached(stream).callbacks["log.entryAdded"]
+    for index in range(5):
+        callback(log(f"message {index}"))
+    # only the latest events are kept
+    assert [e.text for e in stream.events()] == [
+        "message 2",
+        "message 3",
+        "message 4",
+    ]
+    mark = stream.mark()
+    assert mark == 5
+    callback(log("message 5"))
+    assert [e.text for e in stream.events(since=mark)] == ["message 5"]
+    assert stream.events()[-1].url == "https://host/main.js"
+
+
+def test_errors():
+    stream = EventStream(error_status=500)
+    callbacks = attached(stream).callbacks
+    callbacks["log.entryAdded"](log("warning", level="warn"))
+    callbacks["log.entryAdded"](
+        log("TypeError", level="error", kind="javascript")
+    )
+    request = {"method": "POST", "url": "https://host/api"}
+    callbacks["network.responseCompleted"](
+        {"request": request, "response": {"status": 404}}
+    )
+    callbacks["network.responseCompleted"](
+        {"request": request, "response": {"status": 503}}
+    )
+    callbacks["network.fetchError"](
+        {"request": request, "errorText": "net::ERR_FAILED"}
+    )
+    # 4xx responses are under the error status
+    assert [(e.kind, e.text) for e in stream.errors()] == [
+        ("javascript", "TypeError"),
+        ("network", "POST 503"),
+        ("network", "net::ERR_FAILED"),
+    ]
+
+
+def test_no_js_errors():
+    stream = EventStream()
+    callback = attached(stream).callbacks["log.entryAdded"]
+    stream.begin("test_checkout")
+    callback(log("before", level="error"))
+    with stream.no_js_errors("login"):
+        callback(log("logged in"))
+    with pytest.raises(AssertionError, match="browser errors during cart"):
+        with stream.no_js_errors("cart"):
+            callback(log("cart failed", level="error"))
+    stream.end()
+    callback(log("after"))
+
+    events = stream.events()
+    # events are tagged with the test and step they came during
+    assert [(e.test, e.step) for e in events] == [
+        ("test_checkout", None),
+        ("test_checkout", "login"),
+        ("test_checkout", "cart"),
+        (None, None),
+    ]
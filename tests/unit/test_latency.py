@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests of the per persona latency budgets"""
+
+from tests.utils.latency import LatencyBudgets
+
+BUDGETS = LatencyBudgets(
+    {
+        "default": {"login": 3.0, "open_cart": 2.0, "checkout": 2.0},
+        "personas": {
+            "standard_user": {},
+            "performance_glitch_user": {"login": 8.0},
+            "problem_user": {"unreachable": ["checkout"]},
+        },
+    }
+)
+
+
+def test_budget():
+    assert BUDGETS.personas() == [
+        "standard_user",
+        "performance_glitch_user",
+        "problem_user",
+    ]
+    assert BUDGETS.budget("performance_glitch_user", "login") == 8.0
+    assert BUDGETS.budget("problem_user", "login") == 3.0
+    assert BUDGETS.budget("problem_user", "unreachable") is None
+    assert BUDGETS.budget("standard_user", "logout") is None
+
+
+def test_violations():
+    timings = {"login": 5.0, "open_cart": 1.0, "checkout": 1.0}
+    assert BUDGETS.violations("standard_user", timings) == [
+        "standard_user login: 5.000s > 3.000s"
+    ]
+    assert not BUDGETS.violations("performance_glitch_user", timings)
+
+
+def test_unreached():
+    timings = {"login": 1.0}
+    # steps that weren't reached are violations, unless expected
+    assert BUDGETS.violations("standard_user", timings) == [
+        "standard_user open_cart: not reached",
+        "standard_user checkout: not reached",
+    ]
+    assert BUDGETS.violations("problem_user", timings) == [
+        "problem_user open_cart: not reached"
+    ]
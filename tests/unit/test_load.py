@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests of the load runner's scheduling and aggregation, with virtual users
+on fake drivers"""
+
+import threading
+from typing import TYPE_CHECKING, List, cast
+
+import pytest
+
+from tests.unit.fake_driver import FakeDriver
+from tests.unit.swag_labs_app import SwagLabsApp
+from tests.utils import load
+from tests.utils.load import (
+    UNATTRIBUTED,
+    LoadRunner,
+    LoadStats,
+    VirtualUser,
+    percentile,
+)
+
+if TYPE_CHECKING:
+    from tests.utils.session import BrowserSession
+
+
+class StubSession:
+    """a session on a fake driver serving its own app"""
+
+    def __init__(self):
+        self.driver: FakeDriver = FakeDriver(SwagLabsApp())
+        self.recycles: int = 0
+        self.closed: bool = False
+
+    def recycle(self) -> FakeDriver:
+        self.recycles += 1
+        self.driver = FakeDriver(SwagLabsApp())
+        return self.driver
+
+    def close(self):
+        self.closed = True
+
+
+class StubSessions:
+    """a session factory keeping the sessions it created"""
+
+    def __init__(self):
+        self.sessions: List[StubSession] = []
+        self._lock = threading.Lock()
+
+    def __call__(self) -> "BrowserSession":
+        session = StubSession()
+        with self._lock:
+            self.sessions.append(session)
+        return cast("BrowserSession", session)
+
+
+def test_percentile():
+    values = [float(value) for value in range(1, 101)]
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert percentile([3.0], 90) == 3
+    assert percentile([], 50) == 0
+
+
+def test_stats():
+    stats = LoadStats()
+    for seconds in (0.3, 0.1, 0.2):
+        stats.record("login", seconds)
+    stats.record("login", 5.0, ok=False)
+    stats.record(UNATTRIBUTED, 0.0, ok=False)
+
+    rows = {row[0]: row for row in stats.snapshot()}
+    _, count, errors, rate, p50, p90, p99 = rows["login"]
+    # failed steps count as errors, their latency isn't kept
+    assert (count, errors, p50, p90, p99) == (3, 1, 0.2, 0.3, 0.3)
+    assert rate > 0
+    assert rows[UNATTRIBUTED][1:3] == (0, 1)
+    lines = stats.lines()
+    assert lines[0].split() == [
+        "step",
+        "count",
+        "errors",
+        "req/s",
+        "p50",
+        "p90",
+        "p99",
+    ]
+    assert [line.split()[0] for line in lines[1:]] == [UNATTRIBUTED, "login"]
+
+
+def test_purchase():
+    stats = LoadStats()
+    user = VirtualUser(FakeDriver(SwagLabsApp()), "standard_user", stats)
+    load.purchase(user)
+    assert not stats.errors
+    assert {step for step, *_ in stats.snapshot()} == {
+        "open login",
+        "login",
+        "add to cart",
+        "open cart",
+        "checkout info",
+        "checkout overview",
+        "checkout complete",
+        "back to products",
+    }
+    # two products were added to the cart
+    assert stats.snapshot()[0][:2] == ("add to cart", 2)
+
+
+def test_failed_step():
+    stats = LoadStats()
+    user = VirtualUser(FakeDriver(SwagLabsApp()), "locked_out_user", stats)
+    # the login stays on the login page, the step fails
+    with pytest.raises(AssertionError, match="InventoryPage"):
+        load.browse(user)
+    assert user.failed_step == "login"
+    assert stats.errors == {"login": 1}
+
+
+def test_run(monkeypatch: pytest.MonkeyPatch):
+    def broken(user: VirtualUser):
+        raise RuntimeError("not in a step")
+
+    monkeypatch.setitem(load.SCENARIOS, "broken", broken)
+    sessions = StubSessions()
+    runner = LoadRunner(
+        users=3,
+        session_factory=sessions,
+        duration=0.5,
+        mix={"purchase": 2, "browse": 1, "broken": 1},
+        usernames=("standard_user", "locked_out_user"),
+        seed=1,
+    )
+    reports: List[LoadStats] = []
+    stats = runner.run(report=reports.append, interval=0.1)
+
+    # a session per user, closed once the duration is over
+    assert len(sessions.sessions) == 3
+    assert all(session.closed for session in sessions.sessions)
+    assert len(reports) >= 4
+    rows = {row[0]: row for row in stats.snapshot()}
+    # users are reset between iterations, each one logs in again
+    assert rows["checkout complete"][1] > 1
+    assert rows["product details"][1] > 1
+    # the locked out user fails at the login step, the broken scenario
+    # outside of the steps
+    assert rows["login"][2] > 0
+    assert rows[UNATTRIBUTED][2] > 0
+    assert set(stats.errors) == {"login", UNATTRIBUTED}
+
+
+def test_ramp_up():
+    sessions = StubSessions()
+    runner = LoadRunner(
+        users=2, session_factory=sessions, ramp_up=60, duration=0.2
+    )
+    runner.run(interval=0.1)
+    # the second user was due after 30s, it never started
+    assert len(sessions.sessions) == 1
+    assert sessions.sessions[0].closed
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests of the browser matrix sizing and report"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from tests.utils import matrix
+from tests.utils.matrix import MatrixReport, max_concurrent_browsers
+
+GB = 1024**3
+
+
+@pytest.mark.parametrize(
+    "cpus, memory, cpus_per_browser, memory_per_browser_mb, browsers",
+    [
+        # bound by the cores
+        (8, 64 * GB, 1, 1024, 8),
+        (8, 64 * GB, 2, 1024, 4),
+        (8, 64 * GB, 0.5, 1024, 16),
+        # bound by the available memory
+        (8, 3 * GB, 1, 1024, 3),
+        (8, 3 * GB, 1, 0, 8),
+        (8, None, 1, 1024, 8),
+        # at least one browser runs
+        (1, GB // 2, 2, 1024, 1),
+        (None, None, 1, 1024, 1),
+    ],
+)
+def test_max_concurrent_browsers(
+    monkeypatch: pytest.MonkeyPatch,
+    cpus,
+    memory,
+    cpus_per_browser,
+    memory_per_browser_mb,
+    browsers,
+):
+    monkeypatch.setattr(matrix.os, "cpu_count", lambda: cpus)
+    monkeypatch.setattr(matrix, "available_memory", lambda: memory)
+    assert (
+        max_concurrent_browsers(cpus_per_browser, memory_per_browser_mb)
+        == browsers
+    )
+
+
+def report(browser, when, outcome, duration=1.0):
+    return SimpleNamespace(
+        user_properties=[("browser", browser)] if browser else [],
+        when=when,
+        outcome=outcome,
+        duration=duration,
+    )
+
+
+def test_report():
+    plugin = MatrixReport()
+    for browser in ("chrome", "firefox"):
+        # passed
+        plugin.pytest_runtest_logreport(report(browser, "setup", "passed"))
+        plugin.pytest_runtest_logreport(report(browser, "call", "passed"))
+        plugin.pytest_runtest_logreport(report(browser, "teardown", "passed"))
+    # failed, then a teardown error counted on its own
+    plugin.pytest_runtest_logreport(report("chrome", "setup", "passed"))
+    plugin.pytest_runtest_logreport(report("chrome", "call", "failed"))
+    plugin.pytest_runtest_logreport(report("chrome", "teardown", "failed"))
+    # setup error and skip, without a call phase
+    plugin.pytest_runtest_logreport(report("firefox", "setup", "failed"))
+    plugin.pytest_runtest_logreport(report("firefox", "setup", "skipped"))
+    # tests that don't use a browser aren't counted
+    plugin.pytest_runtest_logreport(report(None, "call", "passed"))
+
+    assert plugin.outcomes == {
+        "chrome": {"passed": 1, "failed": 1, "error": 1},
+        "firefox": {"passed": 1, "error": 1, "skipped": 1},
+    }
+    assert plugin.lines() == [
+        "chrome: 1 error, 1 failed, 1 passed in 6.00s",
+        "firefox: 1 error, 1 passed, 1 skipped in 5.00s",
+    ]
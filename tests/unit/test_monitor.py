@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests of the browser resource monitor, with a stub browser reporting its
+JS heap"""
+
+from typing import TYPE_CHECKING, cast
+
+import pytest
+
+from tests.utils import monitor as monitor_module
+from tests.utils.monitor import (
+    MB,
+    ResourceDelta,
+    ResourceMonitor,
+    ResourceSample,
+    ResourceThresholds,
+)
+
+if TYPE_CHECKING:
+    from tests.utils.session import BrowserSession
+
+
+class StubDriver:
+    """a driver without a service process, reporting its JS heap over
+    CDP"""
+
+    def __init__(self, heap_mb: int):
+        self.heap: int = heap_mb * MB
+        self.commands: list = []
+
+    def execute_cdp_cmd(self, command: str, params: dict) -> dict:
+        self.commands.append(command)
+        if command == "Performance.getMetrics":
+            return {
+                "metrics": [{"name": "JSHeapUsedSize", "value": self.heap}]
+            }
+        return {}
+
+
+class StubSession:
+    """a session whose recycled browsers start with a small JS heap"""
+
+    def __init__(self, heap_mb: int):
+        self.driver: StubDriver = StubDriver(heap_mb)
+        self.recycles: int = 0
+
+    def recycle(self) -> StubDriver:
+        self.recycles += 1
+        self.driver = StubDriver(10)
+        return self.driver
+
+
+def monitored(
+    session: StubSession, thresholds: ResourceThresholds
+) -> ResourceMonitor:
+    """a monitor of the stub session"""
+    return ResourceMonitor(cast("BrowserSession", session), thresholds)
+
+
+def test_sample():
+    session = StubSession(100)
+    monitor = monitored(session, ResourceThresholds())
+    assert monitor.sample() == ResourceSample(None, None, None, 100 * MB)
+    monitor.sample()
+    # metrics are enabled once per browser
+    assert session.driver.commands == [
+        "Performance.enable",
+        "Performance.getMetrics",
+        "Performance.getMetrics",
+    ]
+
+
+def test_exceeded():
+    monitor = monitored(
+        StubSession(0), ResourceThresholds(rss_mb=100, js_heap_mb=0)
+    )
+    assert monitor.exceeded(ResourceSample(200 * MB, 1.0, 10, 900 * MB)) == [
+        "rss"
+    ]
+    # limits of 0 are disabled, unmeasured values never cross a limit
+    assert not monitor.exceeded(ResourceSample(100 * MB, None, None, None))
+    assert not monitor.exceeded(ResourceSample(None, None, 10**6, 10**12))
+
+
+def test_recycle_and_deltas():
+    session = StubSession(100)
+    monitor = monitored(session, ResourceThresholds(js_heap_mb=500))
+    monitor.begin("test_small")
+    session.driver.heap += 450 * MB
+    delta = monitor.end("test_small")
+    assert delta == ResourceDelta(
+        "test_small", None, None, None, 450 * MB, recycled=False
+    )
+
+    # the browser crossed the limit, it's replaced before the next test
+    monitor.begin("test_next")
+    assert session.recycles == 1
+    session.driver.heap += 5 * MB
+    delta = monitor.end("test_next")
+    assert (delta.js_heap, delta.recycled) == (5 * MB, True)
+    assert [d.test for d in monitor.deltas] == ["test_small", "test_next"]
+
+
+def test_leaks():
+    monitor = monitored(StubSession(0), ResourceThresholds())
+    monitor.deltas = [
+        ResourceDelta(name, rss, None, None, None, False)
+        for name, rss in [("a", 5), ("b", None), ("c", 50), ("d", -5)]
+    ]
+    assert [d.test for d in monitor.leaks()] == ["c", "a"]
+    assert [d.test for d in monitor.leaks(count=1)] == ["c"]
+
+
+def test_warns_without_psutil(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(monitor_module, "psutil", None)
+    with pytest.warns(RuntimeWarning, match="psutil"):
+        monitored(StubSession(0), ResourceThresholds(rss_mb=2048))
+    # the JS heap is measured without psutil
+    monitored(StubSession(0), ResourceThresholds(js_heap_mb=512))
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests of the motion freezing script's installation, over BiDi or CDP,
+with stub drivers"""
+
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, cast
+
+from selenium.common.exceptions import WebDriverException
+
+from tests.utils.motion import freeze_motion
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+
+class StubConnection:
+    """a BiDi connection, failing its commands if `fails` is set"""
+
+    def __init__(self, fails: bool = False):
+        self.fails: bool = fails
+        self.commands: list = []
+
+    def execute(self, command):
+        if self.fails:
+            raise WebDriverException("unknown command")
+        self.commands.append(next(command))
+
+
+class StubDriver:
+    """a driver started without BiDi"""
+
+    def __init__(self):
+        self.caps: dict = {}
+
+
+class BiDiDriver(StubDriver):
+    """a driver started with BiDi enabled"""
+
+    def __init__(self, fails: bool = False):
+        super().__init__()
+        self.caps["webSocketUrl"] = "ws://localhost:9222/session"
+        self.connection: StubConnection = StubConnection(fails)
+        self.network = SimpleNamespace(conn=self.connection)
+
+
+class ChromiumDriver(BiDiDriver):
+    """a chromium driver, its CDP commands are recorded"""
+
+    def __init__(self, fails: bool = False):
+        super().__init__(fails)
+        self.cdp: list = []
+
+    def execute_cdp_cmd(self, command: str, params: dict) -> dict:
+        self.cdp.append((command, params))
+        return {}
+
+
+def frozen(driver: StubDriver, fast_timers_ms: int = 0) -> str | None:
+    """the protocol freeze_motion used with the stub driver"""
+    return freeze_motion(cast("WebDriver", driver), fast_timers_ms)
+
+
+def test_bidi():
+    driver = ChromiumDriver()
+    assert frozen(driver, fast_timers_ms=50) == "bidi"
+    # the preload script is used when available, even on chromium
+    assert not driver.cdp
+    (command,) = driver.connection.commands
+    assert command["method"] == "script.addPreloadScript"
+    script = command["params"]["functionDeclaration"]
+    assert script.startswith("() => ((fastTimers) => {")
+    assert script.endswith("})(50)")
+
+
+def test_cdp_fallback():
+    # the preload script failed, chromium gets a script of its tab
+    driver = ChromiumDriver(fails=True)
+    assert frozen(driver) == "cdp"
+    ((command, params),) = driver.cdp
+    assert command == "Page.addScriptToEvaluateOnNewDocument"
+    assert params["source"].endswith("})(0);")
+
+    # without BiDi, chromium drivers use CDP
+    driver = ChromiumDriver()
+    del driver.caps["webSocketUrl"]
+    assert frozen(driver) == "cdp"
+    assert not driver.connection.commands
+
+
+def test_unsupported():
+    assert frozen(StubDriver()) is None
+    assert frozen(BiDiDriver(fails=True)) is None
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Unit tests of the page objects, against the fake driver"""
+
+import subprocess
+import sys
+from decimal import Decimal
+from typing import TYPE_CHECKING, cast
+
+import pytest
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    StaleElementReferenceException,
+    TimeoutException,
+)
+
+from swag_labs.catalog import CatalogIndex
+from swag_labs.pages.cart_page import CartPage
+from swag_labs.pages.checkout_complete import CheckoutCompletePage
+from swag_labs.pages.checkout_info import CheckoutInfoPage
+from swag_labs.pages.checkout_overview import CheckoutOverviewPage
+from swag_labs.pages.inventory_page import InventoryPage
+from swag_labs.pages.login import LoginPage
+from swag_labs.pages.page import Page
+from swag_labs.pages.product_page import ProductPage
+from tests.unit.fake_driver import FakeDriver, Selector, parse_html
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+BACKPACK = "Sauce Labs Backpack"
+JACKET = "Sauce Labs Fleece Jacket"
+ONESIE = "Sauce Labs Onesie"
+
+
+def login(driver: FakeDriver) -> InventoryPage:
+    page = LoginPage(cast("WebDriver", driver))
+    page.open()
+    inventory = page.login("standard_user", "secret_sauce")
+    assert isinstance(inventory, InventoryPage)
+    return inventory
+
+
+def test_selector():
+    document = parse_html(
+        '<div id="a" class="x y"><p data-test="t">1</p>'
+        '<span><p class="z">2</p></span></div><p class="z">3</p>'
+    )
+
+    def texts(selector):
+        return [node.text() for node in Selector(selector).select(document)]
+
+    assert texts("div p") == ["1", "2"]
+    assert texts("div > p") == ["1"]
+    assert texts("#a.y > span .z, [data-test='t']") == ["1", "2"]
+    assert texts("p.z") == ["2", "3"]
+    (div,) = Selector("div").select(document)
+    assert [node.text() for node in Selector("span p").select(div)] == ["2"]
+    assert not Selector("div span").select(div)
+
+
+@pytest.mark.parametrize(
+    "route, page_class",
+    [
+        ("/", LoginPage),
+        ("/inventory.html", InventoryPage),
+        ("/inventory-item.html?id=4", ProductPage),
+        ("/cart.html", CartPage),
+        ("/checkout-step-one.html", CheckoutInfoPage),
+        ("/checkout-step-two.html", CheckoutOverviewPage),
+        ("/checkout-complete.html", CheckoutCompletePage),
+    ],
+)
+def test_get_page_class(route, page_class):
+    assert Page.get_page_class("http://localhost:3000" + route) is page_class
+
+
+@pytest.mark.parametrize(
+    "username, password, error",
+    [
+        ("", "secret_sauce", "Epic sadface: Username is required"),
+        ("standard_user", "", "Epic sadface: Password is required"),
+        (
+            "locked_out_user",
+            "secret_sauce",
+            "Epic sadface: Sorry, this user has been locked out.",
+        ),
+    ],
+)
+def test_login_error(fake_driver, username, password, error):
+    page = LoginPage(fake_driver)
+    page.open()
+    assert page.error_message() == ""
+    assert isinstance(page.login(username, password), LoginPage)
+    assert page.error_message() == error
+
+
+def test_login_required(fake_driver):
+    with pytest.raises(TimeoutException):
+        InventoryPage(fake_driver).open()
+    assert Page.route(fake_driver.current_url) == "/"
+    assert "when you are logged in" in LoginPage(fake_driver).error_message()
+
+
+def test_pages_import_lazily():
+    # in a fresh interpreter, this one has imported every page module
+    code = (
+        "import sys\n"
+        "from swag_labs.pages import LoginPage\n"
+        "from swag_labs.pages.page import Page\n"
+        "cart = Page.get_page_class(LoginPage.url + 'cart.html')\n"
+        "assert cart.__name__ == 'CartPage'\n"
+        "assert 'selenium.webdriver' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_fixtures_import_no_page():
+    # the page modules are loaded by the tests that use them, not by the
+    # fixtures and plugins of the suite
+    code = (
+        "import sys\n"
+        "import tests.conftest\n"
+        "pages = {m for m in sys.modules\n"
+        "         if m.startswith('swag_labs.pages.')}\n"
+        "assert pages <= {'swag_labs.pages.by', 'swag_labs.pages.page'}\n"
+        "assert 'selenium.webdriver' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_inventory(fake_driver, app):
+    inventory = login(fake_driver)
+    assert isinstance(inventory, InventoryPage)
+    assert inventory.title() == "Products"
+    names = [item.name() for item in inventory.items()]
+    assert names == [product.name for product in app.catalog]
+    backpack = inventory.get_item_by_name(BACKPACK)
+    assert backpack.price() == 29.99
+    assert inventory.cart_count() == 0
+
+    assert backpack.add_to_cart()
+    assert not backpack.add_to_cart()
+    assert backpack.in_cart()
+    inventory.add_item_to_cart(ONESIE)
+    assert inventory.cart_count() == 2
+    assert backpack.remove_from_cart()
+    assert inventory.cart_count() == 1
+    assert app.cart == [2]
+
+
+def test_catalog(fake_driver):
+    inventory = login(fake_driver)
+    inventory.add_item_to_cart(JACKET)
+    catalog = {item.name: item for item in inventory.catalog()}
+    assert len(catalog) == 6
+    assert catalog[JACKET].price == Decimal("49.99")
+    assert catalog[JACKET].in_cart
+    assert not catalog[BACKPACK].in_cart
+    assert catalog[BACKPACK].description.startswith("carry.allTheThings()")
+
+
+def test_sort(fake_driver):
+    inventory = login(fake_driver)
+    catalog = inventory.sorted_catalog("az")
+    with pytest.raises(ValueError):
+        inventory.sorted_catalog("za")
+    for mode in ("za", "lohi", "hilo", "az"):
+        items = inventory.sort_by(mode).sorted_catalog(mode)
+        assert sorted(items) == sorted(catalog)
+    assert inventory.sort_by("hilo").sorted_catalog("hilo")[0].name == JACKET
+    with pytest.raises(ValueError, match="Unknown sort mode: price"):
+        inventory.sort_by("price")
+    with pytest.raises(ValueError, match="Unknown sort mode: price"):
+        inventory.sorted_catalog("price")
+
+
+def test_product_page(fake_driver):
+    product = login(fake_driver).item_details_page(JACKET)
+    assert isinstance(product, ProductPage)
+    assert product.item_name() == JACKET
+    assert product.price() == 49.99
+    assert product.add_to_cart()
+    assert product.cart_count() == 1
+    assert isinstance(product.back(), InventoryPage)
+
+
+def test_open_product(fake_driver, app, catalog_index, tmp_path):
+    login(fake_driver)
+    # not indexed yet, the inventory is read once to index it
+    product = ProductPage(fake_driver).open_product(JACKET)
+    assert product.item_name() == JACKET
+    assert fake_driver.current_url.endswith("inventory-item.html?id=5")
+    loads = fake_driver.loads
+    assert ProductPage(fake_driver).open_product(ONESIE.upper()).price() == (
+        7.99
+    )
+    assert fake_driver.loads == loads + 1
+    assert ProductPage(fake_driver).open_product(4).item_name() == BACKPACK
+
+    # the deployment renamed a product since it was indexed
+    jacket = app.product(5)
+    app.catalog[app.catalog.index(jacket)] = jacket._replace(name="Jacket")
+    with pytest.raises(NoSuchElementException):
+        ProductPage(fake_driver).open_product(JACKET)
+    assert ProductPage(fake_driver).open_product("jacket").price() == 49.99
+
+    store = str(tmp_path / "index.json")
+    catalog_index.save(store)
+    loaded = CatalogIndex.load(store)
+    assert loaded.product_id(LoginPage.url, "Jacket") == 5
+    assert CatalogIndex.load(store, max_age=-1).products(LoginPage.url) == {}
+
+
+def test_cart(fake_driver, app):
+    inventory = login(fake_driver)
+    for name in (BACKPACK, JACKET, ONESIE):
+        inventory.add_item_to_cart(name)
+    cart = inventory.check_cart()
+    assert isinstance(cart, CartPage)
+    assert cart.count_items() == 3
+    assert cart.total_items() == 3
+    assert cart.total_price() == pytest.approx(29.99 + 49.99 + 7.99)
+
+    rows = list(cart.items())
+    cart.remove_item(JACKET)
+    assert cart.count_items() == 2
+    with pytest.raises(StaleElementReferenceException):
+        rows[1].name()
+    assert rows[2].name() == ONESIE
+    assert cart.clear_cart().count_items() == 0
+    assert app.cart == []
+
+
+def test_checkout(fake_driver, app):
+    inventory = login(fake_driver)
+    inventory.add_item_to_cart(BACKPACK)
+    inventory.add_item_to_cart(JACKET)
+    info = inventory.check_cart().goto_checkout()
+    assert isinstance(info, CheckoutInfoPage)
+    assert info.continue_checkout() is info
+    assert info.error_message() == "Error: First Name is required"
+
+    overview = info.enter_user_info("Ada", "Lovelace", "10115")
+    overview = overview.continue_checkout()
+    assert isinstance(overview, CheckoutOverviewPage)
+    assert app.info["postal-code"] == "10115"
+    assert overview.payment_info() == "SauceCard #31337"
+    assert overview.price_before_tax() == 79.98
+    assert overview.tax() == 6.40
+    assert overview.price_after_tax() == 86.38
+
+    complete = overview.finish_checkout()
+    assert isinstance(complete, CheckoutCompletePage)
+    assert complete.title() == "Checkout: Complete!"
+    assert app.cart == []
+    assert isinstance(complete.back(), InventoryPage)
+
+
+def test_logout(fake_driver, app):
+    page = login(fake_driver).logout()
+    assert isinstance(page, LoginPage)
+    assert app.user is None
+
+
+def test_find_element_doesnt_wait(fake_driver):
+    page = login(fake_driver)
+    with pytest.raises(NoSuchElementException):
+        page.find_element("id", "missing")
+    assert page.find_elements("id", "missing") == []
+
+
+def test_soft_open(fake_driver):
+    login(fake_driver).add_item_to_cart(BACKPACK)
+    cart = CartPage(fake_driver)
+    cart.open(soft=True)
+    assert fake_driver.loads == 1
+    assert Page.route(fake_driver.current_url) == "/cart.html"
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests of the recording proxy's store and replay, over the loopback
+interface"""
+
+import os
+
+import pytest
+import urllib3
+
+from tests.utils.proxy import CachingProxy, ContentStore, RecordedResponse
+
+PAGE = "http://www.saucedemo.com/"
+SCRIPT = "http://www.saucedemo.com/static/js/main.js"
+
+
+@pytest.fixture
+def store(tmp_path) -> ContentStore:
+    """an empty store"""
+    return ContentStore(str(tmp_path / "store"))
+
+
+def test_store(store: ContentStore):
+    headers = [("Content-Type", "text/html")]
+    key = ContentStore.key("GET", PAGE)
+    assert key != ContentStore.key("HEAD", PAGE)
+    assert store.get(key) is None
+
+    response = store.put(key, 200, headers, b"<html></html>")
+    assert store.get(key) == (response, b"<html></html>")
+    assert response == RecordedResponse(200, headers, response.body)
+
+    # the same content is stored once, whatever the request
+    other = store.put(
+        ContentStore.key("GET", SCRIPT), 200, [], b"<html></html>"
+    )
+    assert other.body == response.body
+    blobs = [
+        name
+        for _, _, names in os.walk(os.path.join(store.root, "blobs"))
+        for name in names
+    ]
+    assert blobs == [response.body]
+
+    # re-recording a request replaces its entry
+    gone = store.put(key, 404, [], b"gone")
+    assert store.get(key) == (gone, b"gone")
+
+
+def test_replay(store: ContentStore):
+    store.put(
+        ContentStore.key("GET", PAGE),
+        200,
+        [("Content-Type", "text/html")],
+        b"<html></html>",
+    )
+    proxy = CachingProxy(store, mode="replay")
+    http = urllib3.ProxyManager(f"http://{proxy.start()}", retries=False)
+    try:
+        response = http.request("GET", PAGE)
+        assert response.status == 200
+        assert response.headers["Content-Type"] == "text/html"
+        assert response.data == b"<html></html>"
+
+        # HEAD is answered from the recorded GET, without its body
+        response = http.request("HEAD", PAGE)
+        assert (response.status, response.data) == (200, b"")
+
+        # requests that weren't recorded never reach the network
+        assert http.request("GET", SCRIPT).status == 504
+        assert http.request("POST", PAGE, body=b"{}").status == 502
+    finally:
+        http.clear()
+        proxy.stop()
+
+    assert (proxy.hits, proxy.misses, proxy.recorded) == (2, 1, 0)
+    assert proxy.lines() == [
+        "proxy replay: 0 response(s) recorded, 2 replayed, 1 not recorded"
+    ]
+
+
+def test_mode():
+    with pytest.raises(ValueError, match="Proxy mode replays"):
+        CachingProxy(None, mode="replays")
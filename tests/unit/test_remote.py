@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests of the remote node balancer, with the nodes' /status responses
+stubbed"""
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.options import ArgOptions
+from urllib3.exceptions import HTTPError
+
+from tests.utils import remote
+from tests.utils.remote import NodeBalancer, RemoteNode
+
+
+def grid_status(ready=True, slots=(), **extra):
+    """a /status response of a node with the given slots, a slot is busy
+    when it's true"""
+    slots = [{"session": {"id": "s"} if busy else None} for busy in slots]
+    return {"value": {"ready": ready, "nodes": [{"slots": slots}], **extra}}
+
+
+def stub_status(node: RemoteNode, response):
+    def request(method, url, body=None):
+        assert (method, url) == ("GET", f"{node.url}/status")
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    # the pooled connection sends /status through its _request method
+    setattr(node.connection, "_request", request)
+
+
+@pytest.mark.parametrize(
+    "response, status",
+    [
+        (grid_status(slots=(True, False, False, False)), (True, 0.25)),
+        (grid_status(ready=False, slots=(True, True)), (False, 1.0)),
+        # standalone nodes may not report their slots
+        ({"value": {"ready": True}}, (True, None)),
+        ({"value": "unexpected"}, (False, None)),
+        (HTTPError("refused"), (False, None)),
+        (OSError("unreachable"), (False, None)),
+    ],
+)
+def test_status(response, status):
+    node = RemoteNode("http://node:4444/")
+    stub_status(node, response)
+    assert node.url == "http://node:4444"
+    assert node.status() == status
+
+
+def test_nodes_by_load():
+    balancer = NodeBalancer([f"http://node{i}:4444" for i in range(5)])
+    busy, idle, down, unknown, failing = balancer.nodes
+    stub_status(busy, grid_status(slots=(True, True, False)))
+    stub_status(idle, grid_status(slots=(True, False, False)))
+    stub_status(down, OSError("unreachable"))
+    stub_status(unknown, {"value": {"ready": True}})
+    stub_status(failing, {"value": {"ready": True}})
+    # nodes without slots are compared by their sessions, then failures
+    unknown.acquired()
+    failing.failures = 1
+    assert balancer.nodes_by_load() == [failing, unknown, idle, busy, down]
+    unknown.released()
+    assert balancer.nodes_by_load() == [unknown, failing, idle, busy, down]
+
+
+def test_create_retries(monkeypatch: pytest.MonkeyPatch):
+    balancer = NodeBalancer(["http://node0:4444", "http://node1:4444"])
+    first, second = balancer.nodes
+    stub_status(first, grid_status(slots=(False, False)))
+    stub_status(second, grid_status(slots=(True, False)))
+    attempts = []
+
+    def create_session(command_executor, options):
+        attempts.append(command_executor.node)
+        if command_executor.node is first:
+            raise WebDriverException("session not created")
+        return "driver"
+
+    monkeypatch.setattr(remote.webdriver, "Remote", create_session)
+    assert balancer.create(ArgOptions()) == "driver"
+    assert attempts == [first, second]
+    assert (first.failures, first.active) == (1, 0)
+    assert (second.failures, second.active) == (0, 1)
+
+    def refuse(command_executor, options):
+        raise OSError("refused")
+
+    monkeypatch.setattr(remote.webdriver, "Remote", refuse)
+    with pytest.raises(WebDriverException, match="any node: refused"):
+        balancer.create(ArgOptions())
+    assert (first.failures, second.failures) == (2, 1)
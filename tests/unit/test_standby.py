@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests of the standby browser pool, with a stub driver factory"""
+
+import threading
+import time
+from typing import List
+
+from selenium.common.exceptions import WebDriverException
+
+from tests.utils.driver import StandbyPool
+
+
+class StubBrowser:
+    """a driver that can be killed, recording when it quits"""
+
+    def __init__(self, name: str):
+        self.name: str = name
+        self.dead: bool = False
+        self.quitted = threading.Event()
+
+    @property
+    def current_url(self) -> str:
+        if self.dead:
+            raise WebDriverException("browser is gone")
+        return "about:blank"
+
+    def quit(self):
+        self.quitted.set()
+
+
+class StubFactory:
+    """launches numbered browsers, once `gate` is set"""
+
+    def __init__(self, dead: int = 0):
+        self.browsers: List[StubBrowser] = []
+        self.dead: int = dead
+        self.gate = threading.Event()
+        self.gate.set()
+        self._lock = threading.Lock()
+
+    def __call__(self) -> StubBrowser:
+        self.gate.wait(5)
+        with self._lock:
+            browser = StubBrowser(f"browser-{len(self.browsers)}")
+            browser.dead = len(self.browsers) < self.dead
+            self.browsers.append(browser)
+        return browser
+
+
+def test_target():
+    pool = StandbyPool(StubFactory(), max_size=4, min_size=1)
+    try:
+        # no history yet
+        pool.startup = None
+        assert pool.target() == 1
+        # a 2s startup for drivers used 0.5s needs 4 in flight
+        pool.startup = 2.0
+        pool._usage.extend([0.5, 0.5])
+        assert pool.target() == 4
+        pool._usage.extend([0.01] * 16)
+        assert pool.target() == 4
+        pool._usage.extend([10.0] * 16)
+        assert pool.target() == 1
+    finally:
+        pool.close()
+
+
+def test_acquire_replaces_dead_browsers():
+    factory = StubFactory(dead=1)
+    pool = StandbyPool(factory, max_size=1)
+    try:
+        driver = pool.acquire()
+        assert driver.name == "browser-1"
+        assert factory.browsers[0].quitted.wait(5)
+        assert not driver.quitted.is_set()
+        assert pool.startup is not None
+    finally:
+        pool.close()
+
+
+def test_acquire_without_standby():
+    factory = StubFactory()
+    pool = StandbyPool(factory, max_size=1)
+    pool.close()
+    # no standby is launched once closed, the driver launches in the
+    # foreground
+    driver = pool.acquire()
+    assert factory.browsers[-1] is driver
+    assert not driver.quitted.is_set()
+
+
+def test_close_during_launch():
+    factory = StubFactory()
+    factory.gate.clear()
+    pool = StandbyPool(factory, max_size=2, min_size=2)
+    pool.close()
+    factory.gate.set()
+    # the launches finish after close, their browsers are quit
+    for _ in range(100):
+        if len(factory.browsers) == 2:
+            break
+        time.sleep(0.01)
+    assert len(factory.browsers) == 2
+    for browser in factory.browsers:
+        assert browser.quitted.wait(5)
+    assert not pool._ready
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests of the JSON stores shared by parallel runs"""
+
+import threading
+
+from swag_labs.store import load_json, update_json
+
+
+def test_update_json(tmp_path):
+    path = str(tmp_path / "store" / "counts.json")
+    assert load_json(path) is None
+
+    def increment(counts: dict) -> dict:
+        counts["saves"] = counts.get("saves", 0) + 1
+        return counts
+
+    # without the lock, updates reading the same data would drop each
+    # other's changes
+    threads = [
+        threading.Thread(target=update_json, args=(path, increment))
+        for _ in range(20)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert load_json(path) == {"saves": 20}
+
+    (tmp_path / "store" / "counts.json").write_text("{", encoding="utf-8")
+    assert load_json(path) is None
+    update_json(path, increment)
+    assert load_json(path) == {"saves": 1}
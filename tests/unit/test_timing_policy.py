@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests of the timing policy deriving wait timeouts from history"""
+
+from swag_labs.timing import TimingPolicy
+
+KEY = TimingPolicy.locator_key("id", "login-button")
+
+
+def test_default_without_history():
+    policy = TimingPolicy(default_timeout=10, default_poll=0.5)
+    policy.record(KEY, 0.2)
+    assert policy.timeout(KEY) == 10
+    assert policy.poll_frequency(KEY) == 0.5
+
+
+def test_timeout_from_history():
+    policy = TimingPolicy(safety_factor=3, min_timeout=1, min_samples=10)
+    for _ in range(99):
+        policy.record(KEY, 0.5)
+    policy.record(KEY, 2.0)
+    assert policy.timeout(KEY) == 6.0
+    assert policy.poll_frequency(KEY) == 0.1
+
+    fast = TimingPolicy.route_key("https://www.saucedemo.com/cart.html")
+    for _ in range(10):
+        policy.record(fast, 0.01)
+    assert policy.timeout(fast) == 1
+    assert policy.poll_frequency(fast) == 0.02
+
+
+def test_store_merges_runs(tmp_path):
+    store = str(tmp_path / "timings.json")
+    first = TimingPolicy.load(store)
+    second = TimingPolicy.load(store)
+    first.record(KEY, 0.1)
+    second.record(KEY, 0.3)
+    first.save(store)
+    second.save(store)
+    assert TimingPolicy.load(store).samples == {KEY: [0.1, 0.3]}
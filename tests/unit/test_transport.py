@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests of the WebDriver transport metrics, settings and tuning, against
+a local server"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingUnixStreamServer
+
+import pytest
+from selenium.webdriver.remote.client_config import ClientConfig
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+
+from tests.utils.transport import (
+    TransportConfig,
+    TransportMetrics,
+    parse_command_timeouts,
+    tune_transport,
+)
+
+
+def test_metrics():
+    metrics = TransportMetrics()
+    assert metrics.reuse_ratio() == 0.0
+    assert metrics.percentile(50) == 0.0
+
+    metrics.connection_opened()
+    # bounds are inclusive, the last bucket holds the slowest commands
+    for seconds in (0.0005, 0.001, 0.003, 0.003, 0.004, 0.015, 0.2, 6):
+        metrics.command_sent(seconds)
+    assert metrics.commands == 8
+    assert metrics.rtt[:4] == [2, 0, 3, 0]
+    assert metrics.rtt[-1] == 1
+    assert sum(metrics.rtt) == 8
+    assert metrics.reuse_ratio() == pytest.approx(7 / 8)
+    assert metrics.percentile(25) == 1.0
+    assert metrics.percentile(50) == 5.0
+    assert metrics.percentile(75) == 20.0
+    assert metrics.percentile(99) == float("inf")
+
+    lines = metrics.lines()
+    assert lines[0] == "8 commands over 1 connection(s), reuse ratio 87.50%"
+    assert lines[1] == "command RTT p50 <= 5ms, p99 <= infms"
+    assert lines[2] == (
+        "command RTT histogram: <=1ms: 2, <=5ms: 3, <=20ms: 1, "
+        "<=200ms: 1, <=infms: 1"
+    )
+
+
+def test_reuse_ratio_bounds():
+    metrics = TransportMetrics()
+    metrics.command_sent(0.001)
+    # connections of failed commands can outnumber the commands sent
+    metrics.connection_opened()
+    metrics.connection_opened()
+    assert metrics.reuse_ratio() == 0.0
+
+
+@pytest.mark.parametrize(
+    "value, timeouts",
+    [
+        ("", {}),
+        ("get=30", {"get": 30.0}),
+        (
+            " get = 30 , w3cExecuteScript=2.5,, ",
+            {"get": 30.0, "w3cExecuteScript": 2.5},
+        ),
+    ],
+)
+def test_parse_command_timeouts(value, timeouts):
+    assert parse_command_timeouts(value) == timeouts
+
+
+@pytest.mark.parametrize("value", ["get", "get=", "get=soon"])
+def test_parse_command_timeouts_invalid(value):
+    with pytest.raises(ValueError):
+        parse_command_timeouts(value)
+
+
+class JSONHandler(BaseHTTPRequestHandler):
+    """answers every request with an empty WebDriver value, keeping the
+    connection open"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = json.dumps({"value": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    # pylint: disable-next=redefined-builtin
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    """url of a local WebDriver-like server"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), JSONHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+# pylint: disable=redefined-outer-name
+def test_tune_transport(server_url):
+    connection = RemoteConnection(
+        client_config=ClientConfig(server_url, keep_alive=False)
+    )
+    metrics = TransportMetrics()
+    config = TransportConfig(pool_size=2, command_timeouts={"get": 5})
+    assert tune_transport(connection, config, metrics) is connection
+    # tuning twice doesn't time the commands twice
+    tune_transport(connection, config, TransportMetrics())
+
+    # the session id is taken out of the params of each command
+    assert connection.execute("getCurrentUrl", {"sessionId": "s"}) == {
+        "value": "/session/s/url"
+    }
+    connection.execute("getTitle", {"sessionId": "s"})
+    connection.execute("getTitle", {"sessionId": "s"})
+    # the kept alive connection is reused by the following commands
+    assert (metrics.commands, metrics.connections) == (3, 1)
+    assert metrics.reuse_ratio() == pytest.approx(2 / 3)
+
+
+def test_unix_socket(tmp_path):
+    path = str(tmp_path / "driver.sock")
+    server = ThreadingUnixStreamServer(path, JSONHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        # the url only names the Host header, the socket is connected to
+        connection = RemoteConnection(
+            client_config=ClientConfig("http://driver:9515")
+        )
+        metrics = TransportMetrics()
+        tune_transport(connection, TransportConfig(unix_socket=path), metrics)
+        assert connection.execute("getTitle", {"sessionId": "s"}) == {
+            "value": "/session/s/title"
+        }
+        assert (metrics.commands, metrics.connections) == (1, 1)
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Capture of failure artifacts (screenshot, DOM, page and console logs),
+written by a background thread so the next test isn't delayed"""
+
+import gzip
+import json
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from typing import Dict, List
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from swag_labs.pages.page import Page
+
+__all__ = (
+    "ArtifactWriter",
+    "FailureArtifacts",
+)
+
+# already compressed formats, written as is
+_STORED = (".png",)
+
+
+class ArtifactWriter:
+    """A class that compresses and writes artifacts in a background thread.
+
+    Every run writes to its own directory under `root`, only the latest
+    `keep_runs` run directories are kept. Once a run has written
+    `max_bytes`, the following artifacts are dropped, except the small
+    ones listed in `always_keep`.
+
+    Attributes
+    ----------
+        run_dir (str): directory of the current run.
+        written (int): bytes written by the current run.
+        dropped (int): artifacts dropped because of the size cap.
+
+    Methods
+    -------
+        submit (name: str, artifacts: dict): queue the artifacts of a test,
+        returns the directory they'll be written to.
+        prune (): remove the oldest run directories.
+        flush (): wait until the queued artifacts are written.
+        close (): write the queued artifacts and stop the thread.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        run: str,
+        max_bytes: int = 200 * 1024 * 1024,
+        keep_runs: int = 5,
+        always_keep: tuple = ("page.json",),
+    ):
+        self.root: str = root
+        self.run_dir: str = os.path.join(root, run)
+        self.max_bytes: int = max_bytes
+        self.keep_runs: int = keep_runs
+        self.always_keep: tuple = always_keep
+        self.written: int = 0
+        self.dropped: int = 0
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._work, daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _dirname(name: str) -> str:
+        safe = re.sub(r"[^\w.-]+", "_", name).strip("_")
+        return safe[-120:] or "test"
+
+    def submit(self, name: str, artifacts: Dict[str, bytes]) -> str:
+        """queue the artifacts of a test, by file name"""
+        directory = os.path.join(self.run_dir, self._dirname(name))
+        self._queue.put((directory, artifacts))
+        return directory
+
+    def _write(self, directory: str, artifacts: Dict[str, bytes]):
+        os.makedirs(directory, exist_ok=True)
+        for filename, content in artifacts.items():
+            if not filename.endswith(_STORED):
+                content = gzip.compress(content, compresslevel=6)
+                filename += ".gz"
+            over_cap = self.written + len(content) > self.max_bytes
+            if over_cap and not filename.startswith(self.always_keep):
+                self.dropped += 1
+                continue
+            with open(os.path.join(directory, filename), "wb") as file:
+                file.write(content)
+            self.written += len(content)
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            except OSError:
+                self.dropped += len(item[1])
+            finally:
+                self._queue.task_done()
+
+    def prune(self):
+        """remove the run directories older than the latest keep_runs"""
+        if not os.path.isdir(self.root):
+            return
+        runs = sorted(
+            (entry for entry in os.scandir(self.root) if entry.is_dir()),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in runs[: max(0, len(runs) - self.keep_runs)]:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+    def flush(self):
+        """wait until the queued artifacts are written"""
+        self._queue.join()
+
+    def close(self):
+        """write the queued artifacts and stop the writer thread"""
+        self._queue.put(None)
+        self._thread.join()
+
+
+class FailureArtifacts:
+    """A pytest plugin that captures the state of the browser when a test
+    using the `driver` fixture fails: a screenshot, the page source, the
+    name and url of the last page object and the browser console logs.
+
+    Capturing only reads from the browser, compressing and writing the
+    artifacts is left to an `ArtifactWriter`.
+
+    Attributes
+    ----------
+        writer (ArtifactWriter): writer of the captured artifacts.
+        failures (int): number of failures captured.
+
+    Methods
+    -------
+        capture (driver: WebDriver): Returns the artifacts of the browser's
+        current state.
+    """
+
+    def __init__(self, writer: ArtifactWriter):
+        self.writer: ArtifactWriter = writer
+        self.failures: int = 0
+        self._page: Page | None = None
+
+    def _track(self, page: Page, event: str):
+        self._page = page
+
+    def capture(self, driver) -> Dict[str, bytes]:
+        """read the artifacts of the browser's current state, the ones the
+        browser can't provide are left out"""
+        artifacts: Dict[str, bytes] = {}
+        page: Dict[str, str | None] = {
+            "url": None,
+            "page": None,
+            "page_url": None,
+        }
+        if self._page is not None and self._page.driver is driver:
+            page["page"] = self._page.page_name
+            page["page_url"] = self._page.url
+        try:
+            page["url"] = driver.current_url
+            artifacts["screenshot.png"] = driver.get_screenshot_as_png()
+            artifacts["page.html"] = driver.page_source.encode("utf-8")
+        except WebDriverException as error:
+            page["error"] = error.msg
+        try:
+            logs: List[dict] = driver.get_log("browser")
+        except (AttributeError, WebDriverException):
+            pass
+        else:
+            artifacts["console.json"] = json.dumps(logs).encode("utf-8")
+        artifacts["page.json"] = json.dumps(page).encode("utf-8")
+        return artifacts
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_protocol(self, item: pytest.Item):
+        self._page = None
+        Page.add_listener(self._track)
+        try:
+            return (yield)
+        finally:
+            Page.remove_listener(self._track)
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_makereport(self, item: pytest.Item, call):
+        report = yield
+        driver = getattr(item, "funcargs", {}).get("driver")
+        if report.failed and report.when != "teardown" and driver:
+            start = time.perf_counter()
+            directory = self.writer.submit(item.nodeid, self.capture(driver))
+            self.failures += 1
+            report.user_properties.append(("artifacts", directory))
+            report.sections.append(
+                (
+                    "failure artifacts",
+                    f"{directory} (captured in "
+                    f"{time.perf_counter() - start:.2f}s)",
+                )
+            )
+        return report
+
+    def pytest_unconfigure(self, config: pytest.Config):
+        self.writer.close()
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.failures:
+            # the summary is written before unconfigure, wait for the writes
+            self.writer.flush()
+            terminalreporter.write_line(
+                f"artifacts of {self.failures} failure(s) in "
+                f"{self.writer.run_dir} "
+                f"({self.writer.written / 1024 / 1024:.1f} MB, "
+                f"{self.writer.dropped} dropped over the size cap)"
+            )
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Planning of the carts that cover the checkout pricing of a catalog"""
+
+import itertools
+import random
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, FrozenSet, List, NamedTuple, Sequence
+
+from swag_labs.pages.inventory_page import CatalogItem
+
+__all__ = (
+    "TAX_RATE",
+    "PlannedCart",
+    "pairwise_carts",
+    "edge_carts",
+    "expected_prices",
+    "order_carts",
+    "plan_carts",
+)
+
+# swag-labs taxes the item total at 8%, rounded to the cent
+TAX_RATE = Decimal("0.08")
+CENT = Decimal("0.01")
+
+
+class PlannedCart(NamedTuple):
+    """a cart to check out, with its expected prices"""
+
+    items: FrozenSet[str]
+    subtotal: Decimal
+    tax: Decimal
+    total: Decimal
+
+
+def pairwise_carts(names: Sequence[str], seed: int = 0) -> List[frozenset]:
+    """carts covering every pair of products in all four in / out of cart
+    combinations, picked greedily from every cart (or from random carts for
+    big catalogs)"""
+    names = list(names)
+    if len(names) < 2:
+        return [frozenset(names)] if names else []
+    uncovered = {
+        (a, b, in_a, in_b)
+        for a, b in itertools.combinations(range(len(names)), 2)
+        for in_a in (True, False)
+        for in_b in (True, False)
+    }
+    if len(names) <= 12:
+        candidates = list(itertools.product((True, False), repeat=len(names)))
+    else:
+        rng = random.Random(seed)
+        candidates = [
+            tuple(rng.random() < 0.5 for _ in names) for _ in range(4096)
+        ]
+    # an empty cart can't be checked out
+    candidates = [row for row in candidates if any(row)]
+
+    def covered(row):
+        return {
+            (a, b, row[a], row[b])
+            for a, b in itertools.combinations(range(len(row)), 2)
+        } & uncovered
+
+    rows = []
+    while uncovered:
+        best = max(candidates, key=lambda row: len(covered(row)))
+        gain = covered(best)
+        if not gain:
+            break
+        uncovered -= gain
+        rows.append(best)
+    return [
+        frozenset(name for name, in_cart in zip(names, row) if in_cart)
+        for row in rows
+    ]
+
+
+def edge_carts(catalog: Sequence[CatalogItem]) -> List[frozenset]:
+    """the single cheapest item, the single most expensive item and the
+    whole catalog"""
+    if not catalog:
+        return []
+    cheapest = min(catalog, key=lambda item: item.price)
+    priciest = max(catalog, key=lambda item: item.price)
+    return [
+        frozenset({cheapest.name}),
+        frozenset({priciest.name}),
+        frozenset(item.name for item in catalog),
+    ]
+
+
+def expected_prices(
+    carts: Sequence[frozenset], catalog: Sequence[CatalogItem]
+) -> List[PlannedCart]:
+    """subtotal, tax and total of every cart, computed at once as the
+    product of the carts' incidence matrix with the price vector"""
+    names = [item.name for item in catalog]
+    prices = [item.price for item in catalog]
+    incidence = [[int(name in cart) for name in names] for cart in carts]
+    subtotals = [
+        sum((count * price for count, price in zip(row, prices)), Decimal(0))
+        for row in incidence
+    ]
+    taxes = [
+        (subtotal * TAX_RATE).quantize(CENT, rounding=ROUND_HALF_UP)
+        for subtotal in subtotals
+    ]
+    return [
+        PlannedCart(cart, subtotal, tax, subtotal + tax)
+        for cart, subtotal, tax in zip(carts, subtotals, taxes)
+    ]
+
+
+def order_carts(
+    carts: Sequence[PlannedCart], start: frozenset = frozenset()
+) -> List[PlannedCart]:
+    """order the carts so that each one is reached from the previous one
+    with the fewest items added or removed (nearest neighbour)"""
+    remaining = list(carts)
+    ordered = []
+    current = start
+    while remaining:
+        nearest = min(
+            remaining,
+            key=lambda cart: (len(cart.items ^ current), sorted(cart.items)),
+        )
+        remaining.remove(nearest)
+        ordered.append(nearest)
+        current = nearest.items
+    return ordered
+
+
+def plan_carts(
+    catalog: Sequence[CatalogItem], start: frozenset = frozenset()
+) -> List[PlannedCart]:
+    """pairwise and edge case carts of a catalog, with their expected
+    prices, in the order that changes the cart the least"""
+    carts: Dict[frozenset, None] = dict.fromkeys(
+        edge_carts(catalog) + pairwise_carts([i.name for i in catalog])
+    )
+    return order_carts(expected_prices(list(carts), catalog), start)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Isolation of tests in WebDriver BiDi user contexts of one browser, each
+with its own cookies, storage and cache"""
+
+from typing import NamedTuple
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+__all__ = (
+    "BrowserContext",
+    "UserContexts",
+)
+
+
+class BrowserContext(NamedTuple):
+    """a user context and the handle of its tab"""
+
+    user_context: str
+    handle: str
+
+
+class UserContexts:
+    """A class that opens a fresh user context (like a private window) in
+    a browser started with BiDi enabled, and switches its driver to a tab of
+    that context.
+
+    Removing a context drops its cookies, storage and pages at once, so a
+    browser can serve test after test without being restarted or cleaned.
+    Browsers that don't support user contexts are detected on the first
+    `open()`, which then returns None for the caller to fall back on
+    cleaning the browser.
+
+    Attributes
+    ----------
+        driver (WebDriver): driver of the browser.
+        supported (bool): whether the browser supports user contexts, None
+        until the first `open()`.
+        current (BrowserContext): the open context, None if there is none.
+        opened (int): number of contexts opened.
+
+    Methods
+    -------
+        open (): Returns a new context the driver is switched to.
+        close (): remove the open context and switch back to the browser's
+        own window.
+    """
+
+    def __init__(self, driver: WebDriver):
+        self.driver: WebDriver = driver
+        self.supported: bool | None = None
+        self.current: BrowserContext | None = None
+        self.opened: int = 0
+        self._home: str | None = None
+
+    def open(self) -> BrowserContext | None:
+        """create a user context with one tab and switch the driver to it,
+        None if the browser doesn't support user contexts"""
+        if self.supported is False:
+            return None
+        self.close()
+        try:
+            home = self.driver.current_window_handle
+            user_context = self.driver.browser.create_user_context()
+        except WebDriverException:
+            self.supported = False
+            return None
+        try:
+            handle = self.driver.browsing_context.create(
+                "tab", user_context=user_context
+            )
+            self.driver.switch_to.window(handle)
+        except WebDriverException:
+            self.supported = False
+            self.driver.browser.remove_user_context(user_context)
+            return None
+        self.supported = True
+        self.opened += 1
+        self._home = home
+        self.current = BrowserContext(user_context, handle)
+        return self.current
+
+    def close(self):
+        """remove the open context with its tabs, cookies and storage"""
+        if self.current is None:
+            return
+        context, self.current = self.current, None
+        try:
+            self.driver.browser.remove_user_context(context.user_context)
+        finally:
+            self.driver.switch_to.window(self._home)
@@ -0,0 +1,583 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""State crawler, explores the swag-labs pages breadth-first from the login
+page by acting on the locators the page classes declare, and derives the
+fewest journeys covering every transition it discovered.
+
+usage:
+
+    python -m tests.utils.crawler --max-states 200 \\
+        --base-url http://localhost:3000 --json graph.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+from collections import deque
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Sequence,
+    Tuple,
+)
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from swag_labs.pages.cart_page import CartItem, CartPage
+from swag_labs.pages.inventory_page import InventoryItem, InventoryPage
+from swag_labs.pages.login import LoginPage
+from swag_labs.pages.page import Page
+from tests.utils.locator_audit import locators, to_selector
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+__all__ = (
+    "Action",
+    "State",
+    "Edge",
+    "edge_cover",
+    "StateCrawler",
+)
+
+# text typed by the fill action, by locator constant
+VALUES = {
+    "USERNAME_INPUT": "standard_user",
+    "PASSWORD_INPUT": "secret_sauce",
+    "FIRST_NAME_INPUT": "State",
+    "LAST_NAME_INPUT": "Crawler",
+    "POSTAL_CODE_INPUT": "12345",
+}
+
+# item classes whose locators are acted on (for every item) on a page
+ITEM_CLASSES: Dict[type, Iterable[type]] = {
+    InventoryPage: (InventoryItem,),
+    CartPage: (CartItem,),
+}
+
+_CLEAR_STORAGE_SCRIPT = (
+    "window.sessionStorage.clear(); window.localStorage.clear();"
+)
+
+# reads the state of the page in one call: its route, its DOM reduced to
+# the tags, the attributes that identify or show/hide elements, the form
+# values and the text, and its cookies and storage. For each [kind,
+# selector] it also returns the indexes of the matches that can be clicked
+# and whether one of them can be typed in
+_STATE_SCRIPT = """
+const [selectors] = arguments;
+const KEPT = ["id", "class", "data-test", "type", "name", "role",
+    "disabled", "hidden", "aria-hidden", "aria-expanded"];
+const SKIPPED = ["SCRIPT", "STYLE", "NOSCRIPT", "TEMPLATE"];
+const CLICKABLE = "a, button, input[type=submit], input[type=button], "
+    + "[role=button]";
+const EDITABLE = "input:not([type=submit]):not([type=button]), textarea";
+const serialize = (node) => {
+    if (node.nodeType === Node.TEXT_NODE) {
+        const text = node.textContent.replace(/\\s+/g, " ").trim();
+        return text ? JSON.stringify(text) : "";
+    }
+    if (node.nodeType !== Node.ELEMENT_NODE || SKIPPED.includes(node.tagName)) {
+        return "";
+    }
+    const attributes = KEPT.filter((name) => node.hasAttribute(name))
+        .map((name) => `${name}=${JSON.stringify(node.getAttribute(name))}`);
+    if (["INPUT", "TEXTAREA", "SELECT"].includes(node.tagName)) {
+        attributes.push(`value=${JSON.stringify(node.value)}`);
+    }
+    const children = Array.from(node.childNodes, serialize).join("");
+    return `<${node.tagName.toLowerCase()} ${attributes.join(" ")}>`
+        + `${children}</>`;
+};
+const resolve = ([kind, selector]) => {
+    if (kind !== "xpath") {
+        return Array.from(document.querySelectorAll(selector));
+    }
+    const result = document.evaluate(selector, document, null,
+        XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    const nodes = [];
+    for (let i = 0; i < result.snapshotLength; i++) {
+        nodes.push(result.snapshotItem(i));
+    }
+    return nodes;
+};
+const entries = (storage) => Object.keys(storage).sort()
+    .map((key) => [key, storage.getItem(key)]);
+return {
+    url: location.pathname + location.search,
+    dom: serialize(document.body),
+    storage: JSON.stringify([
+        document.cookie.split("; ").sort(),
+        entries(window.localStorage),
+        entries(window.sessionStorage),
+    ]),
+    locators: selectors.map((selector) => {
+        const nodes = resolve(selector);
+        return {
+            clickable: nodes.flatMap((node, i) =>
+                node.matches(CLICKABLE) ? [i] : []),
+            editable: nodes.some((node) => node.matches(EDITABLE)),
+        };
+    }),
+};
+"""
+
+
+class Action(NamedTuple):
+    """a click on a match of a locator constant of owner (page or item
+    class), or a fill of the page's inputs with `VALUES`"""
+
+    owner: str
+    name: str
+    position: int = 0
+    kind: str = "click"
+
+    def __str__(self):
+        if self.kind == "fill":
+            return f"{self.owner}.fill"
+        return f"{self.owner}.{self.name}[{self.position}]"
+
+
+class State(NamedTuple):
+    """a distinct state of the application, `page` is the name of the page
+    class of its url (None if no class is registered for it)"""
+
+    id: int
+    url: str
+    page: str | None
+    digest: str
+
+
+class Edge(NamedTuple):
+    """a transition between two distinct states"""
+
+    source: int
+    action: Action
+    target: int
+
+
+class _FlowNetwork:
+    """residual network of a max flow, edge e's reverse is e ^ 1"""
+
+    def __init__(self, nodes: int):
+        self.adjacent: List[List[int]] = [[] for _ in range(nodes)]
+        self.heads: List[int] = []
+        self.capacities: List[int] = []
+
+    def add_edge(self, tail: int, head: int, capacity: int) -> int:
+        edge = len(self.heads)
+        for node, other, residual in (
+            (tail, head, capacity),
+            (head, tail, 0),
+        ):
+            self.adjacent[node].append(len(self.heads))
+            self.heads.append(other)
+            self.capacities.append(residual)
+        return edge
+
+    def flow(self, edge: int) -> int:
+        """flow pushed through an edge"""
+        return self.capacities[edge ^ 1]
+
+    def remove(self, edge: int):
+        self.capacities[edge] = self.capacities[edge ^ 1] = 0
+
+    def max_flow(self, source: int, sink: int) -> int:
+        """augment along shortest paths (Edmonds-Karp), returns the flow
+        pushed"""
+        total = 0
+        while True:
+            via: Dict[int, int] = {source: -1}
+            queue = deque([source])
+            while queue and sink not in via:
+                node = queue.popleft()
+                for edge in self.adjacent[node]:
+                    head = self.heads[edge]
+                    if head not in via and self.capacities[edge] > 0:
+                        via[head] = edge
+                        queue.append(head)
+            if sink not in via:
+                return total
+            path = []
+            node = sink
+            while node != source:
+                path.append(via[node])
+                node = self.heads[via[node] ^ 1]
+            pushed = min(self.capacities[edge] for edge in path)
+            for edge in path:
+                self.capacities[edge] -= pushed
+                self.capacities[edge ^ 1] += pushed
+            total += pushed
+
+
+def edge_cover(
+    nodes: int, edges: Sequence[Tuple[int, int]], root: int = 0
+) -> List[List[int]]:
+    """fewest walks from root traversing every edge at least once, as lists
+    of edge indexes. Every node must be reachable from root.
+
+    The number of walks is the minimum flow from root to a sink every node
+    leads to, with each edge carrying at least one unit; the walks are the
+    pieces of an Euler circuit of the flow's multigraph, closed by the
+    sink's returns to root."""
+    if not edges:
+        return []
+    sink, source, target = nodes, nodes + 1, nodes + 2
+    unbounded = len(edges) + 1
+    network = _FlowNetwork(nodes + 3)
+    # the lower bound of each edge is taken out of the network and
+    # restored by the demands of its ends
+    excess = [0] * nodes
+    flows = []
+    for tail, head in edges:
+        flows.append(network.add_edge(tail, head, unbounded))
+        excess[head] += 1
+        excess[tail] -= 1
+    ends = [network.add_edge(node, sink, unbounded) for node in range(nodes)]
+    back = network.add_edge(sink, root, unbounded)
+    for node, demand in enumerate(excess):
+        if demand > 0:
+            network.add_edge(source, node, demand)
+        elif demand < 0:
+            network.add_edge(node, target, -demand)
+    network.max_flow(source, target)
+    # a feasible flow, reduced to the minimum by sending flow back
+    walks = network.flow(back)
+    network.remove(back)
+    walks -= network.max_flow(sink, root)
+
+    outgoing: List[List[Tuple[int, int | None]]] = [
+        [] for _ in range(nodes + 1)
+    ]
+    for index, ((tail, head), arc) in enumerate(zip(edges, flows)):
+        outgoing[tail].extend([(head, index)] * (1 + network.flow(arc)))
+    for node, end in enumerate(ends):
+        outgoing[node].extend([(sink, None)] * network.flow(end))
+    if walks == 0:
+        # the edges form circulations, covered by one walk back to root
+        walks = 1
+        outgoing[root].append((sink, None))
+    outgoing[sink].extend([(root, None)] * walks)
+    # Hierholzer's algorithm
+    stack: List[Tuple[int, int | None]] = [(root, None)]
+    circuit: List[Tuple[int, int | None]] = []
+    while stack:
+        node = stack[-1][0]
+        if outgoing[node]:
+            stack.append(outgoing[node].pop())
+        else:
+            circuit.append(stack.pop())
+    circuit.reverse()
+    paths: List[List[int]] = []
+    path: List[int] = []
+    for node, edge in circuit[1:]:
+        if edge is not None:
+            path.append(edge)
+        elif node == sink:
+            paths.append(path)
+            path = []
+    # the circuit may not start with a walk's first edge, its tail goes
+    # back to root and continues into the first walk
+    paths[0] = path + paths[0]
+    return [path for path in paths if path]
+
+
+class StateCrawler:
+    """A class that explores the states of the application breadth-first.
+
+    A state is the route, the normalized DOM and the cookies and storage
+    of the browser, hashed so equivalent states are explored once. The
+    actions of a state are clicks on the clickable matches of the locator
+    constants of its page class (and of the page's item classes), and a
+    fill of the inputs that have a value in `values`. Each state is reached
+    again by replaying the shortest path to it from a fresh session, so
+    the effort grows with the distinct states and their actions.
+
+    Attributes
+    ----------
+        driver (WebDriver): driver of the browser the states are explored
+        in.
+        values (dict): text typed in the inputs by locator constant.
+        item_classes (dict): item classes of each page class.
+        max_states (int): number of distinct states explored at most.
+        max_depth (int): length of the paths to the explored states at
+        most, None for no limit.
+        states (list): the distinct states discovered.
+        edges (list): the transitions between them.
+        paths (dict): shortest path (edge indexes) to each state.
+        failed (list): the actions that raised, with their state.
+        truncated (int): transitions to states beyond `max_states`.
+        actions_run (int): actions performed, replays included.
+
+    Methods
+    -------
+        crawl (): explore the states reachable from the login page.
+        cover (): Returns the fewest paths covering every edge.
+        to_json (): Returns the graph and its covering paths.
+        lines (): Returns a human readable report.
+    """
+
+    def __init__(
+        self,
+        driver: WebDriver,
+        values: Dict[str, str] | None = None,
+        item_classes: Dict[type, Iterable[type]] | None = None,
+        max_states: int = 100,
+        max_depth: int | None = None,
+    ):
+        self.driver: WebDriver = driver
+        self.values: Dict[str, str] = VALUES if values is None else values
+        self.item_classes: Dict[type, Iterable[type]] = (
+            ITEM_CLASSES if item_classes is None else item_classes
+        )
+        self.max_states: int = max_states
+        self.max_depth: int | None = max_depth
+        self.states: List[State] = []
+        self.edges: List[Edge] = []
+        self.paths: Dict[int, List[int]] = {}
+        self.failed: List[Tuple[int, Action, str]] = []
+        self.truncated: int = 0
+        self.actions_run: int = 0
+        self._digests: Dict[str, int] = {}
+        self._actions: Dict[int, List[Action]] = {}
+        self._owners: Dict[str, type] = {}
+        self._current: str | None = None
+
+    def _owner_classes(self, page_class: type | None) -> List[type]:
+        if page_class is None:
+            return []
+        owners = [page_class, *self.item_classes.get(page_class, ())]
+        for owner in owners:
+            self._owners[owner.__name__] = owner
+        return owners
+
+    def _observe(self) -> Tuple[str, str, type | None, List[Action]]:
+        """digest, url, page class and actions of the current state"""
+        url = self.driver.current_url
+        try:
+            page_class = Page.get_page_class(url)
+        except KeyError:
+            page_class = None
+        if page_class is not None:
+            try:
+                page_class(self.driver).wait_until_ready()
+            except TimeoutException:
+                pass
+        constants = [
+            (owner, name, selector)
+            for owner in self._owner_classes(page_class)
+            for name, locator in sorted(locators(owner).items())
+            if (selector := to_selector(*locator)) is not None
+        ]
+        observed = self.driver.execute_script(
+            _STATE_SCRIPT, [list(selector) for _, _, selector in constants]
+        )
+        digest = hashlib.sha1(
+            json.dumps(
+                [observed["url"], observed["dom"], observed["storage"]]
+            ).encode("utf-8")
+        ).hexdigest()
+        actions = []
+        if any(
+            name in self.values and matches["editable"]
+            for (_, name, _), matches in zip(constants, observed["locators"])
+        ):
+            actions.append(Action(page_class.__name__, "", 0, "fill"))
+        for (owner, name, _), matches in zip(constants, observed["locators"]):
+            actions.extend(
+                Action(owner.__name__, name, index)
+                for index in matches["clickable"]
+            )
+        self._current = digest
+        return digest, observed["url"], page_class, actions
+
+    def _restart(self):
+        """a fresh session on the login page"""
+        try:
+            self.driver.delete_all_cookies()
+            self.driver.execute_script(_CLEAR_STORAGE_SCRIPT)
+        except WebDriverException:
+            pass
+        self.driver.get(LoginPage(self.driver).url)
+
+    def _perform(self, action: Action):
+        self.actions_run += 1
+        owner = self._owners[action.owner]
+        if action.kind == "fill":
+            for name, locator in locators(owner).items():
+                if name not in self.values:
+                    continue
+                for element in self.driver.find_elements(*locator):
+                    element.clear()
+                    element.send_keys(self.values[name])
+            return
+        elements = self.driver.find_elements(*locators(owner)[action.name])
+        if action.position >= len(elements):
+            raise WebDriverException(f"{action} is gone")
+        elements[action.position].click()
+
+    def _reach(self, state: int) -> bool:
+        """bring the browser to a state, replaying its path if needed"""
+        if self._current == self.states[state].digest:
+            return True
+        self._restart()
+        try:
+            for edge in self.paths[state]:
+                self._perform(self.edges[edge].action)
+        except WebDriverException:
+            self._current = None
+            return False
+        return self._observe()[0] == self.states[state].digest
+
+    def _add_state(
+        self, digest: str, url: str, page_class, actions, path: List[int]
+    ) -> int:
+        state = len(self.states)
+        self.states.append(
+            State(
+                state,
+                url,
+                page_class.__name__ if page_class is not None else None,
+                digest,
+            )
+        )
+        self._digests[digest] = state
+        self._actions[state] = actions
+        self.paths[state] = path
+        return state
+
+    def crawl(self) -> StateCrawler:
+        """explore the states reachable from a fresh session on the login
+        page, breadth-first"""
+        self._restart()
+        root = self._add_state(*self._observe(), [])
+        queue = deque([root])
+        while queue:
+            state = queue.popleft()
+            if (
+                self.max_depth is not None
+                and len(self.paths[state]) >= self.max_depth
+            ):
+                continue
+            for action in self._actions[state]:
+                if not self._reach(state):
+                    self.failed.append((state, action, "unreachable"))
+                    break
+                try:
+                    self._perform(action)
+                except WebDriverException as error:
+                    self._current = None
+                    self.failed.append((state, action, type(error).__name__))
+                    continue
+                digest, url, page_class, actions = self._observe()
+                if digest == self.states[state].digest:
+                    # no transition
+                    continue
+                target = self._digests.get(digest)
+                if target is None:
+                    if len(self.states) >= self.max_states:
+                        self.truncated += 1
+                        continue
+                    target = self._add_state(
+                        digest,
+                        url,
+                        page_class,
+                        actions,
+                        self.paths[state] + [len(self.edges)],
+                    )
+                    queue.append(target)
+                self.edges.append(Edge(state, action, target))
+        return self
+
+    def cover(self) -> List[List[Edge]]:
+        """fewest paths from the login page covering every edge"""
+        return [
+            [self.edges[index] for index in path]
+            for path in edge_cover(
+                len(self.states),
+                [(edge.source, edge.target) for edge in self.edges],
+            )
+        ]
+
+    def to_json(self) -> dict:
+        """the states, the edges and the paths covering them"""
+        return {
+            "states": [state._asdict() for state in self.states],
+            "edges": [
+                {
+                    "source": edge.source,
+                    "action": str(edge.action),
+                    "target": edge.target,
+                }
+                for edge in self.edges
+            ],
+            "paths": [
+                [str(edge.action) for edge in path] for path in self.cover()
+            ],
+            "failed": [
+                {"state": state, "action": str(action), "error": error}
+                for state, action, error in self.failed
+            ],
+        }
+
+    def lines(self) -> List[str]:
+        """report of the graph and of the paths covering it"""
+        paths = self.cover()
+        lines = [
+            f"{len(self.states)} states, {len(self.edges)} transitions, "
+            f"{self.actions_run} actions run",
+            f"{len(paths)} paths cover every transition "
+            f"({sum(len(path) for path in paths)} actions):",
+        ]
+        for path in paths:
+            lines.append("  " + " -> ".join(str(e.action) for e in path))
+        if self.truncated:
+            lines.append(
+                f"{self.truncated} transitions to states beyond the "
+                f"{self.max_states} states limit"
+            )
+        if self.failed:
+            lines.append(f"{len(self.failed)} actions failed")
+        return lines
+
+
+def main(args: Sequence[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-states", type=int, default=100)
+    parser.add_argument("--max-depth", type=int, default=None)
+    parser.add_argument("--browser", default="chrome")
+    parser.add_argument("--base-url", default="")
+    parser.add_argument("--json", default="")
+    parser.add_argument("--no-headless", action="store_true")
+    options = parser.parse_args(args)
+
+    if options.base_url:
+        Page.set_base_url(options.base_url)
+
+    # imports the browser drivers
+    from tests.utils.session import BrowserSession
+
+    session = BrowserSession(options.browser, headless=not options.no_headless)
+    try:
+        crawler = StateCrawler(
+            session.driver,
+            max_states=options.max_states,
+            max_depth=options.max_depth,
+        ).crawl()
+    finally:
+        session.close()
+
+    print("\n".join(crawler.lines()))
+    if options.json:
+        with open(options.json, "w", encoding="utf-8") as file:
+            json.dump(crawler.to_json(), file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Checkout identity datasets, streamed in deterministic chunks from JSONL
+or CSV files, or generated, without loading them into memory"""
+
+import csv
+import json
+import os
+import random
+from typing import Iterator, NamedTuple
+
+__all__ = (
+    "CheckoutIdentity",
+    "expected_error",
+    "read_lines",
+    "jsonl_identities",
+    "csv_identities",
+    "generated_identities",
+    "identities",
+)
+
+FIRST_NAMES = ("Ada", "Grace", "Linus", "Zoë", "José", "Ngozi", "Li", "Ana")
+LAST_NAMES = ("Lovelace", "Hopper", "O'Brien", "Müller", "Nakamura", "Diaz")
+
+
+class CheckoutIdentity(NamedTuple):
+    """a checkout form entry, and the error message it's expected to get
+    ("" if it's accepted)"""
+
+    first_name: str
+    last_name: str
+    postal_code: str
+    error: str
+
+
+def expected_error(first_name: str, last_name: str, postal_code: str) -> str:
+    """the error message the checkout form shows for an entry, the first
+    missing field is reported"""
+    for value, label in (
+        (first_name, "First Name"),
+        (last_name, "Last Name"),
+        (postal_code, "Postal Code"),
+    ):
+        if not value:
+            return f"Error: {label} is required"
+    return ""
+
+
+def _identity(first_name, last_name, postal_code, error=None):
+    first_name, last_name = first_name or "", last_name or ""
+    postal_code = postal_code or ""
+    if error is None:
+        error = expected_error(first_name, last_name, postal_code)
+    return CheckoutIdentity(first_name, last_name, postal_code, error)
+
+
+def read_lines(
+    path: str, chunk: int, chunks: int, header: bool = False
+) -> Iterator[str]:
+    """lines of one of `chunks` byte ranges of a file, a line belongs to
+    the range its first byte is in, so the chunks split the file exactly
+    and each one is read by seeking to it"""
+    size = os.path.getsize(path)
+    with open(path, "rb") as file:
+        first = 0
+        if header:
+            file.readline()
+            first = file.tell()
+        start = first + (size - first) * chunk // chunks
+        end = first + (size - first) * (chunk + 1) // chunks
+        if start > first:
+            # skip the end of the line the previous chunk started
+            file.seek(start - 1)
+            file.readline()
+        else:
+            file.seek(start)
+        while file.tell() < end:
+            line = file.readline()
+            if not line:
+                break
+            if line.strip():
+                yield line.decode("utf-8")
+
+
+def jsonl_identities(
+    path: str, chunk: int = 0, chunks: int = 1
+) -> Iterator[CheckoutIdentity]:
+    """identities of a chunk of a JSON lines file, with the `first_name`,
+    `last_name`, `zip` and (optional) `error` keys of the user info"""
+    for line in read_lines(path, chunk, chunks):
+        row = json.loads(line)
+        yield _identity(
+            row.get("first_name"),
+            row.get("last_name"),
+            row.get("zip"),
+            row.get("error"),
+        )
+
+
+def csv_identities(
+    path: str, chunk: int = 0, chunks: int = 1
+) -> Iterator[CheckoutIdentity]:
+    """identities of a chunk of a CSV file with a header row of the same
+    columns as jsonl_identities(), values can't span lines"""
+    with open(path, encoding="utf-8", newline="") as file:
+        columns = next(csv.reader(file))
+    for line in read_lines(path, chunk, chunks, header=True):
+        row = dict(zip(columns, next(csv.reader([line]))))
+        yield _identity(
+            row.get("first_name"),
+            row.get("last_name"),
+            row.get("zip"),
+            row.get("error"),
+        )
+
+
+def generated_identities(
+    count: int, seed: int = 0, chunk: int = 0, chunks: int = 1
+) -> Iterator[CheckoutIdentity]:
+    """identities number chunk, chunk + chunks, ... of count identities
+    generated from seed, each one only depends on its number. About a
+    quarter of them leave a field blank."""
+    for number in range(chunk, count, chunks):
+        rng = random.Random(f"{seed}:{number}")
+        values = [
+            rng.choice(FIRST_NAMES),
+            rng.choice(LAST_NAMES),
+            f"{rng.randrange(100000):05d}",
+        ]
+        if rng.random() < 0.25:
+            values[rng.randrange(3)] = ""
+        yield _identity(*values)
+
+
+def identities(
+    source: str, chunk: int = 0, chunks: int = 1
+) -> Iterator[CheckoutIdentity]:
+    """identities of a chunk of a source: a `.jsonl` or `.csv` file, or
+    `generate:COUNT[:SEED]`"""
+    if source.startswith("generate:"):
+        count, _, seed = source[len("generate:") :].partition(":")
+        return generated_identities(int(count), int(seed or 0), chunk, chunks)
+    if source.endswith(".jsonl"):
+        return jsonl_identities(source, chunk, chunks)
+    if source.endswith(".csv"):
+        return csv_identities(source, chunk, chunks)
+    raise ValueError(f"Unsupported checkout dataset: {source}")
@@ -1,20 +1,46 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import math
+import threading
+import time
+from collections import deque
+from typing import Callable, List
+
 from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.common.proxy import Proxy, ProxyType
 from selenium.webdriver.firefox.firefox_profile import FirefoxProfile
 from selenium.webdriver.firefox.options import Options as FFoxOptions
 from selenium.webdriver.firefox.service import Service as FFoxService
+from selenium.webdriver.remote.webdriver import WebDriver
 from webdriver_manager.chrome import ChromeDriverManager
 from webdriver_manager.firefox import GeckoDriverManager
 
 
-def get_chrome_driver(headless=True):
-    """get a new chrome webdriver driver instance"""
+def proxy_settings(proxy: str) -> Proxy:
+    """get the capability sending a session's traffic to proxy (host:port)"""
+
+    return Proxy(
+        {
+            "proxyType": ProxyType.MANUAL,
+            "httpProxy": proxy,
+            "sslProxy": proxy,
+        }
+    )
+
+
+def chrome_options(
+    headless=True, proxy: str | None = None, bidi=False
+) -> ChromeOptions:
+    """get the options used for chrome sessions"""
 
     options = ChromeOptions()
+    options.enable_bidi = bidi
+    if proxy is not None:
+        options.proxy = proxy_settings(proxy)
     if headless:
         options.add_argument("--headless")
         options.add_argument("--disable-gpu")
@@ -26,15 +52,20 @@ def get_chrome_driver(headless=True):
             "profile.managed_default_content_settings.images": 2,
         },
     )
-    service = ChromeService(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
-    return driver
+    # keep the console logs, read by the failure artifacts
+    options.set_capability("goog:loggingPrefs", {"browser": "ALL"})
+    return options
 
 
-def get_firefox_driver(headless=True):
-    """get a new firefox webdriver instance"""
+def firefox_options(
+    headless=True, proxy: str | None = None, bidi=False
+) -> FFoxOptions:
+    """get the options used for firefox sessions"""
 
     options = FFoxOptions()
+    options.enable_bidi = bidi
+    if proxy is not None:
+        options.proxy = proxy_settings(proxy)
     if headless:
         options.add_argument("--headless")
         options.add_argument("--disable-gpu")
@@ -43,6 +74,169 @@ def get_firefox_driver(headless=True):
     profile = FirefoxProfile()
     profile.set_preference("permissions.default.image", 2)
     options.profile = profile
+    return options
+
+
+def get_chrome_driver(headless=True, proxy: str | None = None, bidi=False):
+    """get a new chrome webdriver driver instance"""
+
+    options = chrome_options(headless=headless, proxy=proxy, bidi=bidi)
+    service = ChromeService(ChromeDriverManager().install())
+    driver = webdriver.Chrome(service=service, options=options)
+    return driver
+
+
+def get_firefox_driver(headless=True, proxy: str | None = None, bidi=False):
+    """get a new firefox webdriver instance"""
+
+    options = firefox_options(headless=headless, proxy=proxy, bidi=bidi)
     service = FFoxService(GeckoDriverManager().install())
     driver = webdriver.Firefox(service=service, options=options)
     return driver
+
+
+def get_driver(
+    browser: str, headless=True, proxy: str | None = None, bidi=False
+):
+    """get a new webdriver instance for the given browser name, proxy is
+    the host:port of an HTTP proxy to send the browser traffic to, bidi
+    enables the WebDriver BiDi connection of the session"""
+
+    if browser == "chrome":
+        return get_chrome_driver(headless=headless, proxy=proxy, bidi=bidi)
+
+    if browser == "firefox":
+        return get_firefox_driver(headless=headless, proxy=proxy, bidi=bidi)
+
+    raise ValueError(f"Browser {browser} is not supported")
+
+
+class StandbyPool:
+    """A pool of browsers launched in background threads, so that a
+    replacement driver is handed out without waiting for browser startup.
+
+    The number of standby browsers is tuned from the observed startup
+    latency and how long each driver is used before the next one is
+    requested: a pool needs about `startup latency / usage time` browsers
+    in flight to always have one ready, bounded by `min_size` and
+    `max_size`.
+
+    Attributes
+    ----------
+        factory (Callable): creates a new ready-to-use driver.
+        min_size (int): minimum number of standby browsers.
+        max_size (int): maximum number of standby browsers.
+        startup (float): average browser startup time in seconds.
+
+    Methods
+    -------
+        target (): Returns the number of standby browsers to keep.
+        acquire (): Returns a standby driver, launching one if none is ready.
+        close (): Quits all standby drivers.
+    """
+
+    # weight of the latest startup time in the startup average
+    SMOOTHING = 0.3
+
+    def __init__(
+        self,
+        factory: Callable[[], WebDriver],
+        max_size: int = 1,
+        min_size: int = 1,
+    ):
+        self.factory: Callable[[], WebDriver] = factory
+        self.min_size: int = min(min_size, max_size)
+        self.max_size: int = max_size
+        self.startup: float | None = None
+        self._ready: List[WebDriver] = []
+        self._launching: int = 0
+        self._closed: bool = False
+        self._usage: deque = deque(maxlen=16)
+        self._handed_out: float | None = None
+        self._cond = threading.Condition()
+        with self._cond:
+            self._refill()
+
+    def target(self) -> int:
+        """number of standby browsers needed to keep up with the demand"""
+        if self.startup is None or not self._usage:
+            return self.min_size
+        usage = max(sum(self._usage) / len(self._usage), 1e-3)
+        needed = math.ceil(self.startup / usage)
+        return max(self.min_size, min(self.max_size, needed))
+
+    def _timed_launch(self) -> WebDriver:
+        start = time.monotonic()
+        driver = self.factory()
+        elapsed = time.monotonic() - start
+        with self._cond:
+            if self.startup is None:
+                self.startup = elapsed
+            else:
+                self.startup += self.SMOOTHING * (elapsed - self.startup)
+        return driver
+
+    def _launch(self):
+        driver = None
+        try:
+            driver = self._timed_launch()
+        finally:
+            # a failed launch is only reported by the thread, acquire()
+            # falls back to launching in the foreground
+            with self._cond:
+                self._launching -= 1
+                if driver is not None and self._closed:
+                    threading.Thread(target=driver.quit, daemon=True).start()
+                elif driver is not None:
+                    self._ready.append(driver)
+                self._cond.notify_all()
+
+    def _refill(self):
+        """start background launches up to the target, must be called with
+        the lock held"""
+        if self._closed:
+            return
+        while len(self._ready) + self._launching < self.target():
+            self._launching += 1
+            threading.Thread(target=self._launch, daemon=True).start()
+
+    @staticmethod
+    def _alive(driver: WebDriver) -> bool:
+        try:
+            driver.current_url
+        except WebDriverException:
+            return False
+        return True
+
+    def _take(self) -> WebDriver | None:
+        with self._cond:
+            # time between handing out the previous driver and this request,
+            # waiting for a launch isn't counted as usage
+            if self._handed_out is not None:
+                self._usage.append(time.monotonic() - self._handed_out)
+                self._handed_out = None
+            while not self._ready and self._launching:
+                self._cond.wait()
+            driver = self._ready.pop(0) if self._ready else None
+            self._refill()
+        return driver
+
+    def acquire(self) -> WebDriver:
+        """get a ready driver, or launch one if no standby is available"""
+        driver = self._take()
+        while driver is not None and not self._alive(driver):
+            threading.Thread(target=driver.quit, daemon=True).start()
+            driver = self._take()
+        if driver is None:
+            driver = self._timed_launch()
+        with self._cond:
+            self._handed_out = time.monotonic()
+        return driver
+
+    def close(self):
+        """quit all standby drivers and stop launching new ones"""
+        with self._cond:
+            self._closed = True
+            ready, self._ready = self._ready, []
+        for driver in ready:
+            driver.quit()
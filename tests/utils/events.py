@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Console, JavaScript error and network events pushed by the browser over
+WebDriver BiDi, buffered and correlated with the running test and page"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, List, NamedTuple, Tuple
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.bidi.session import Session
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from swag_labs.pages.page import Page
+
+__all__ = (
+    "BrowserEvent",
+    "EventStream",
+)
+
+
+class BrowserEvent(NamedTuple):
+    """an event pushed by the browser, with the test, page and step that
+    were active when it arrived"""
+
+    kind: str
+    level: str
+    text: str
+    url: str | None
+    time: float
+    test: str | None
+    page: str | None
+    step: str | None
+
+    def is_error(self) -> bool:
+        """check if the event is a JS error, an error logged to the console,
+        a request that failed or got an error status"""
+        return self.kind == "javascript" or self.level == "error"
+
+
+class _BiDiEvent:
+    """BiDi event passed to the callbacks as its raw parameters"""
+
+    def __init__(self, event_class: str):
+        self.event_class: str = event_class
+
+    @staticmethod
+    def from_json(params: dict) -> dict:
+        return params
+
+
+class EventStream:
+    """A class that subscribes once per driver to the BiDi `log.entryAdded`
+    and network events, and keeps the latest `capacity` of them.
+
+    Events are delivered by the driver's websocket thread, no command is
+    sent to the browser to collect them. Each event is tagged with the test,
+    page object and step active when it arrived.
+
+    Requests count as errors when they fail (`network.fetchError`), and
+    when their response status is at least `error_status` if it's set, as
+    4xx responses are often expected (e.g. a probe for a missing asset).
+
+    Attributes
+    ----------
+        network (bool): whether the network events are subscribed to.
+        error_status (int): lowest response status counted as an error, 0
+        to only count the failed requests.
+        available (bool): whether the last attached driver supports BiDi.
+        test (str): id of the running test.
+        page (str): name of the last page object.
+        step (str): name of the running step.
+
+    Methods
+    -------
+        attach (driver: WebDriver): subscribe to the driver's events.
+        mark (): Returns a position to get the events that come after it.
+        events (since: int): Returns the buffered events.
+        errors (since: int): Returns the buffered error events.
+        begin (test: str): start correlating events with a test.
+        end (): stop correlating events with the test.
+        no_js_errors (step: str): context manager failing if errors are
+        reported during the step.
+    """
+
+    NETWORK_EVENTS = ("network.responseCompleted", "network.fetchError")
+
+    def __init__(
+        self, capacity: int = 1000, network: bool = True, error_status: int = 0
+    ):
+        self.network: bool = network
+        self.error_status: int = error_status
+        self.available: bool = False
+        self.test: str | None = None
+        self.page: str | None = None
+        self.step: str | None = None
+        self._buffer: Deque[Tuple[int, BrowserEvent]] = deque(maxlen=capacity)
+        self._count: int = 0
+        self._lock = threading.Lock()
+
+    def _add(self, kind: str, level: str, text: str, url: str | None):
+        event = BrowserEvent(
+            kind,
+            level,
+            text,
+            url,
+            time.time(),
+            self.test,
+            self.page,
+            self.step,
+        )
+        with self._lock:
+            self._count += 1
+            self._buffer.append((self._count, event))
+
+    def _on_log(self, params: dict):
+        # the entry's source is a realm, the script url is in its stack
+        frames = (params.get("stackTrace") or {}).get("callFrames") or []
+        self._add(
+            params.get("type", "console"),
+            params.get("level", "info"),
+            params.get("text") or "",
+            (frames[0].get("url") or None) if frames else None,
+        )
+
+    def _on_network(self, params: dict):
+        request = params.get("request", {})
+        if "errorText" in params:
+            self._add(
+                "network", "error", params["errorText"], request.get("url")
+            )
+            return
+        status = params.get("response", {}).get("status", 0)
+        error = 0 < self.error_status <= status
+        self._add(
+            "network",
+            "error" if error else "info",
+            f"{request.get('method', 'GET')} {status}",
+            request.get("url"),
+        )
+
+    def attach(self, driver: WebDriver) -> bool:
+        """subscribe to the events of a driver started with BiDi enabled,
+        returns False if the driver doesn't support BiDi"""
+        try:
+            connection = driver.network.conn
+            events: Tuple[str, ...] = ("log.entryAdded",)
+            if self.network:
+                events += self.NETWORK_EVENTS
+            connection.execute(Session(connection).subscribe(*events))
+        except WebDriverException:
+            self.available = False
+            return False
+        connection.add_callback(_BiDiEvent("log.entryAdded"), self._on_log)
+        for event in events[1:]:
+            connection.add_callback(_BiDiEvent(event), self._on_network)
+        self.available = True
+        return True
+
+    def track(self, page: Page, event: str):
+        """Page listener keeping the name of the last page object"""
+        self.page = page.page_name
+
+    def mark(self) -> int:
+        """position of the latest event"""
+        with self._lock:
+            return self._count
+
+    def events(self, since: int = 0) -> List[BrowserEvent]:
+        """buffered events that came after the since mark"""
+        with self._lock:
+            return [event for count, event in self._buffer if count > since]
+
+    def errors(self, since: int = 0) -> List[BrowserEvent]:
+        """buffered error events that came after the since mark"""
+        return [event for event in self.events(since) if event.is_error()]
+
+    def begin(self, test: str):
+        """tag the following events with test"""
+        self.test, self.page, self.step = test, None, None
+
+    def end(self):
+        """stop tagging the events with the test"""
+        self.test, self.page, self.step = None, None, None
+
+    @contextmanager
+    def no_js_errors(self, step: str, settle: float = 0.0):
+        """fail if errors are reported while running the step, or within
+        settle seconds after it (events arrive asynchronously)"""
+        start = self.mark()
+        previous, self.step = self.step, step
+        try:
+            yield self
+            if settle > 0:
+                time.sleep(settle)
+        finally:
+            self.step = previous
+        errors = self.errors(since=start)
+        assert not errors, f"browser errors during {step}:\n" + "\n".join(
+            f"  [{e.kind}] {e.text} ({e.url})" for e in errors
+        )
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Test impact analysis, maps each test to the page object modules, classes
+and locators it exercised, and selects the tests a git diff affects"""
+
+import ast
+import importlib
+import os
+import re
+import subprocess
+from typing import Dict, Iterable, List, NamedTuple, Set, Tuple
+
+import pytest
+
+import swag_labs.pages
+from swag_labs.pages.page import Page
+from swag_labs.store import load_json, update_json
+
+__all__ = (
+    "ImpactMap",
+    "Changes",
+    "changed_lines",
+    "locator_spans",
+    "classify",
+    "ImpactAnalysis",
+)
+
+# changes to these files don't affect any test
+_IGNORED = (".md", ".rst", ".txt")
+_HUNK = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+class ImpactMap:
+    """A class that maps tests to what they exercised: the modules of their
+    page objects (with the modules of the base classes), the page classes
+    and the locator constants of the page classes
+    (`module.Class.CONSTANT`).
+
+    Methods
+    -------
+        record (test: str, modules, pages, locators, replace: bool): record
+        what a test exercised.
+        affected (changes: Changes): Returns the mapped tests the changes
+        affect.
+        load (path: str): Returns the map of a store.
+        save (path: str): merge the tests recorded since loading into a
+        store.
+    """
+
+    def __init__(self):
+        self.tests: Dict[str, Dict[str, List[str]]] = {}
+        self._recorded: Dict[str, Dict[str, List[str]]] = {}
+
+    def record(
+        self,
+        test: str,
+        modules: Iterable[str],
+        pages: Iterable[str],
+        locators: Iterable[str],  # pylint: disable=redefined-outer-name
+        replace: bool = True,
+    ):
+        """record what a test exercised, replace=False adds to what was
+        recorded before (e.g. for a test that stopped early)"""
+        exercised: Dict[str, Set[str]] = {
+            "modules": set(modules),
+            "pages": set(pages),
+            "locators": set(locators),
+        }
+        previous = self.tests.get(test)
+        if not replace and previous is not None:
+            for key, values in previous.items():
+                exercised[key] |= set(values)
+        entry = {key: sorted(values) for key, values in exercised.items()}
+        self.tests[test] = entry
+        self._recorded[test] = entry
+
+    def affected(self, changes: "Changes") -> Set[str]:
+        """mapped tests exercising a changed module or locator"""
+        return {
+            test
+            for test, entry in self.tests.items()
+            if changes.modules.intersection(entry["modules"])
+            or changes.locators.intersection(entry["locators"])
+        }
+
+    @classmethod
+    def load(cls, path: str) -> "ImpactMap":
+        """create a map from a JSON store, an empty one if the store
+        doesn't exist yet"""
+        impact = cls()
+        impact.tests = load_json(path) or {}
+        return impact
+
+    def save(self, path: str):
+        """add the tests recorded since loading to a JSON store, merged
+        with the ones other processes saved in the meantime"""
+        recorded, self._recorded = self._recorded, {}
+        if not recorded:
+            return
+        update_json(
+            path,
+            lambda tests: {**tests, **recorded},
+            indent=1,
+            sort_keys=True,
+        )
+
+
+class Changes(NamedTuple):
+    """what a diff changed, `everything` if it can't be narrowed down"""
+
+    everything: bool
+    modules: Set[str]
+    locators: Set[str]
+    test_files: Set[str]
+
+
+def changed_lines(diff: str) -> Dict[str, List[Tuple[int, int]]]:
+    """changed line ranges of the new version of each file in a unified
+    diff, a deletion is a range around the line it happened at"""
+    files: Dict[str, List[Tuple[int, int]]] = {}
+    current, header = None, False
+    for line in diff.splitlines():
+        if line.startswith("diff --git "):
+            current, header = None, True
+        elif header and line.startswith("+++ "):
+            path = line[4:].strip()
+            current = None if path == "/dev/null" else path[2:]
+            if current is not None:
+                files.setdefault(current, [])
+        elif header and line.startswith("--- "):
+            # deleted and renamed files are changed as a whole
+            if line[4:].strip() != "/dev/null":
+                files.setdefault(line[6:].strip(), [])
+        elif current is not None and (match := _HUNK.match(line)):
+            header = False
+            start = int(match.group(1))
+            count = 1 if match.group(2) is None else int(match.group(2))
+            if count == 0:
+                files[current].append((start, start + 1))
+            else:
+                files[current].append((start, start + count - 1))
+    return files
+
+
+def locator_spans(source: str, module: str) -> Dict[str, Tuple[int, int]]:
+    """lines of the locator constants of the page classes of a module, by
+    `module.Class.CONSTANT`, only literal (by, value) tuples are locators"""
+    from tests.utils.locator_audit import locators
+
+    try:
+        imported = importlib.import_module(module)
+    except ImportError:
+        return {}
+    spans = {}
+    for node in ast.parse(source).body:
+        page_class = getattr(imported, getattr(node, "name", ""), None)
+        if not (
+            isinstance(node, ast.ClassDef)
+            and isinstance(page_class, type)
+            and issubclass(page_class, Page)
+        ):
+            continue
+        constants = locators(page_class)
+        for statement in node.body:
+            if (
+                isinstance(statement, ast.Assign)
+                and len(statement.targets) == 1
+                and isinstance(statement.targets[0], ast.Name)
+                and statement.targets[0].id in constants
+                and isinstance(statement.value, ast.Tuple)
+            ):
+                name = f"{module}.{node.name}.{statement.targets[0].id}"
+                spans[name] = (
+                    statement.lineno,
+                    statement.end_lineno or statement.lineno,
+                )
+    return spans
+
+
+def _pages_dir(root: str) -> str:
+    directory = os.path.dirname(swag_labs.pages.__file__)
+    return os.path.relpath(directory, root).replace(os.sep, "/")
+
+
+def classify(root: str, diff: str) -> Changes:
+    """the page modules, locators and test files a diff changed, relative
+    to the root it was taken in.
+
+    A page module whose changes are all within locator constants of its
+    page classes only affects the tests that used these locators, other
+    changes to a page module affect the tests that used any of its
+    classes (the base page's module is used by all of them). Changes to
+    test modules select their tests, changes to anything else (fixtures,
+    helpers, other packages) select every test.
+    """
+    pages_dir = _pages_dir(root)
+    modules: Set[str] = set()
+    changed_locators: Set[str] = set()
+    test_files: Set[str] = set()
+    for path, ranges in changed_lines(diff).items():
+        if path.endswith(_IGNORED):
+            continue
+        directory, filename = os.path.split(path)
+        if filename.startswith("test_") and filename.endswith(".py"):
+            test_files.add(path)
+            continue
+        if (
+            directory != pages_dir
+            or not filename.endswith(".py")
+            or filename == "__init__.py"
+        ):
+            return Changes(True, modules, changed_locators, test_files)
+        module = f"{swag_labs.pages.__name__}.{filename[:-3]}"
+        try:
+            with open(os.path.join(root, path), encoding="utf-8") as file:
+                spans = locator_spans(file.read(), module)
+        except (OSError, SyntaxError):
+            spans = {}
+        if not ranges:
+            modules.add(module)
+            continue
+        touched = set()
+        for start, end in ranges:
+            names = {
+                name
+                for name, (first, last) in spans.items()
+                if first <= start and end <= last
+            }
+            if not names:
+                modules.add(module)
+                break
+            touched |= names
+        else:
+            changed_locators |= touched
+    return Changes(False, modules, changed_locators, test_files)
+
+
+def git_diff(root: str, rev: str) -> str:
+    """diff of the working tree against a revision, paths relative to
+    root"""
+    return subprocess.run(
+        ["git", "diff", "--unified=0", "--relative", rev, "--"],
+        cwd=root,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+
+class ImpactAnalysis:
+    """A pytest plugin that records the page object modules, classes and
+    locators each test exercised (created, looked up in the registry or
+    used to find elements), through the page listeners, and with a
+    revision deselects the tests a `git diff` against it doesn't affect.
+
+    Only the tests using the `driver` fixture are mapped, the unit tests
+    drive the page objects with a fake driver and would map them to every
+    test data change. Tests missing from the map (new tests) are always
+    selected. Lookups made through elements (e.g. `InventoryItem`) aren't
+    seen, they're covered by their module.
+
+    Attributes
+    ----------
+        impact (ImpactMap): the map of the tests.
+        path (str): the store of the map.
+        rev (str): the revision to select the tests against, None to run
+        all tests.
+        selected (int): number of tests selected.
+        deselected (int): number of tests deselected.
+    """
+
+    def __init__(self, path: str, rev: str | None = None):
+        self.path: str = path
+        self.rev: str | None = rev
+        self.impact: ImpactMap = ImpactMap.load(path)
+        self.selected: int = 0
+        self.deselected: int = 0
+        self._changes: Changes | None = None
+        self._modules: Set[str] = set()
+        self._pages: Set[str] = set()
+        self._locators: Set[str] = set()
+        self._names: Dict[Tuple[type, str, str], List[str]] = {}
+        self._running: str | None = None
+
+    def _on_route(self, url: str, page_class: type):
+        self._pages.add(f"{page_class.__module__}.{page_class.__qualname__}")
+        for cls in page_class.__mro__:
+            if isinstance(cls, type) and issubclass(cls, Page):
+                self._modules.add(cls.__module__)
+
+    def _on_page(self, page: Page, event: str):
+        self._on_route(page.url, type(page))
+        if page.READY_LOCATOR is not None:
+            self._on_lookup(page, *page.READY_LOCATOR)
+
+    def _on_lookup(self, page: Page, by: str, value: str):
+        key = (type(page), by, value)
+        if key not in self._names:
+            from tests.utils.locator_audit import locators
+
+            self._names[key] = [
+                f"{cls.__module__}.{cls.__qualname__}.{name}"
+                for cls in type(page).__mro__
+                if isinstance(cls, type) and issubclass(cls, Page)
+                for name, locator in locators(cls).items()
+                if name in vars(cls) and locator == (by, value)
+            ]
+        self._locators.update(self._names[key])
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(
+        self, config: pytest.Config, items: List[pytest.Item]
+    ):
+        if self.rev is None:
+            return
+        root = str(config.rootpath)
+        try:
+            changes = classify(root, git_diff(root, self.rev))
+        except (OSError, subprocess.CalledProcessError) as error:
+            raise pytest.UsageError(
+                f"Couldn't diff against {self.rev}: {error}"
+            ) from error
+        self._changes = changes
+        if changes.everything:
+            self.selected = len(items)
+            return
+        affected = self.impact.affected(changes)
+        selected, deselected = [], []
+        for item in items:
+            path = item.nodeid.split("::", 1)[0]
+            if (
+                item.nodeid not in self.impact.tests
+                or item.nodeid in affected
+                or path in changes.test_files
+            ):
+                selected.append(item)
+            else:
+                deselected.append(item)
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = selected
+        self.selected, self.deselected = len(selected), len(deselected)
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_protocol(self, item: pytest.Item):
+        if "driver" not in getattr(item, "fixturenames", ()):
+            return (yield)
+        self._modules, self._pages, self._locators = set(), set(), set()
+        self._running = item.nodeid
+        Page.add_listener(self._on_page)
+        Page.add_lookup_listener(self._on_lookup)
+        Page.add_route_listener(self._on_route)
+        try:
+            return (yield)
+        finally:
+            Page.remove_listener(self._on_page)
+            Page.remove_lookup_listener(self._on_lookup)
+            Page.remove_route_listener(self._on_route)
+            self._running = None
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport):
+        # xdist controllers get the reports of the tests run by workers
+        if report.nodeid != self._running:
+            return
+        if report.when != "call" or report.skipped:
+            return
+        if dict(report.user_properties).get("journey") == "replayed":
+            # a replayed journey doesn't use the page objects, it keeps
+            # what it exercised when it was recorded
+            return
+        self.impact.record(
+            report.nodeid,
+            self._modules,
+            self._pages,
+            self._locators,
+            # a failed test may have stopped before using everything
+            replace=report.passed,
+        )
+
+    def pytest_sessionfinish(self, session: pytest.Session):
+        # a no-op if no test used the driver
+        self.impact.save(self.path)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self._changes is None:
+            return
+        terminalreporter.section("test impact")
+        if self._changes.everything:
+            terminalreporter.write_line(
+                f"changes since {self.rev} can't be narrowed down, "
+                "running every test"
+            )
+            return
+        terminalreporter.write_line(
+            f"{self.selected} test(s) affected by the changes since "
+            f"{self.rev}, {self.deselected} deselected "
+            f"({len(self._changes.modules)} module(s), "
+            f"{len(self._changes.locators)} locator(s) changed)"
+        )
@@ -0,0 +1,727 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Journey replay, records the WebDriver commands and observed values of a
+passing journey test, compiles them into a plan of merged lookups and value
+checks, and replays the plan instead of the page object code while the code
+and the test's inputs don't change"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import os
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Set, Tuple
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+import swag_labs
+from swag_labs.pages.page import Page
+from swag_labs.store import load_json, update_json
+
+# selenium.webdriver is imported once a journey is recorded or replayed,
+# importing it loads the drivers of every browser
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+    from selenium.webdriver.remote.webelement import WebElement
+
+__all__ = (
+    "JourneyDivergence",
+    "JourneyRecorder",
+    "compile_journey",
+    "JourneyPlayer",
+    "JourneyPlans",
+    "fingerprint",
+    "JourneyReplay",
+)
+
+# commands are named like selenium's remote `Command` values
+
+# element lookups, by whether they find all elements and whether they're
+# made from another element
+_FINDS = {
+    "findElement": (False, False),
+    "findElements": (True, False),
+    "findChildElement": (False, True),
+    "findChildElements": (True, True),
+}
+# reads the batch script can evaluate in the page
+_READS = (
+    "getElementText",
+    "getCurrentUrl",
+    "getTitle",
+    "getElementAttribute",
+    "getElementProperty",
+    "getElementTagName",
+    "isElementSelected",
+    "isElementEnabled",
+)
+# commands whose results differ from run to run
+_UNCHECKED = (
+    "screenshot",
+    "elementScreenshot",
+    "w3cGetCurrentWindowHandle",
+    "w3cGetWindowHandles",
+    "newWindow",
+    "getWindowRect",
+    "getPageSource",
+    "getCookies",
+)
+
+# resolves the lookups of a batch in one call, in the recorded order, and
+# compares the reads with the recorded values. Returns the found elements,
+# or the first lookup or read that doesn't match (yet).
+_BATCH_SCRIPT = """
+const [batch, outer] = arguments;
+const elements = {};
+batch.outer.forEach((ref, i) => { elements[ref] = outer[i]; });
+const normalize = (text) => String(text).replace(/\\s+/g, " ").trim();
+const query = (root, using, value) => {
+    switch (using) {
+    case "css selector":
+        return Array.from(root.querySelectorAll(value));
+    case "tag name":
+        return Array.from(root.getElementsByTagName(value));
+    case "xpath": {
+        const result = document.evaluate(
+            value, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+        );
+        return Array.from(
+            {length: result.snapshotLength}, (_, i) => result.snapshotItem(i)
+        );
+    }
+    case "link text":
+    case "partial link text":
+        return Array.from(root.querySelectorAll("a")).filter((link) => {
+            const text = normalize(link.innerText);
+            return using === "link text"
+                ? text === normalize(value) : text.includes(value);
+        });
+    }
+    throw new Error(`Unsupported locator strategy: ${using}`);
+};
+const read = (kind, element, name) => {
+    switch (kind) {
+    case "getElementText": return normalize(element.innerText);
+    case "getCurrentUrl": return location.href;
+    case "getTitle": return document.title;
+    case "getElementAttribute": return element.getAttribute(name);
+    case "getElementProperty": return element[name];
+    case "getElementTagName": return element.tagName.toLowerCase();
+    case "isElementSelected": return !!(element.checked || element.selected);
+    case "isElementEnabled": return !element.disabled;
+    }
+    throw new Error(`Unsupported read: ${kind}`);
+};
+for (const [i, q] of batch.queries.entries()) {
+    const root = q.parent === null ? document : elements[q.parent];
+    if (!root || (root !== document && !root.isConnected)) {
+        return {ok: false, failed: ["query", i], actual: "detached"};
+    }
+    const found = query(root, q.using, q.value);
+    if (q.exact ? found.length !== q.count : found.length < q.count) {
+        return {ok: false, failed: ["query", i], actual: found.length};
+    }
+    for (const [index, ref] of q.refs) {
+        elements[ref] = found[index];
+    }
+}
+for (const [i, r] of batch.reads.entries()) {
+    const element = r.ref === null ? null : elements[r.ref];
+    if (r.ref !== null && !(element && element.isConnected)) {
+        return {ok: false, failed: ["read", i], actual: "detached"};
+    }
+    const actual = read(r.kind, element, r.name);
+    if (JSON.stringify(actual) !== JSON.stringify(r.expected)) {
+        return {ok: false, failed: ["read", i], actual: actual};
+    }
+}
+return {ok: true, elements: batch.defined.map((ref) => elements[ref])};
+"""
+
+
+class JourneyDivergence(Exception):
+    """the browser didn't behave like the recorded journey at a step of the
+    plan"""
+
+    def __init__(self, step: int, reason: str):
+        super().__init__(f"step {step}: {reason}")
+        self.step: int = step
+        self.reason: str = reason
+
+
+def _is_ref(value) -> bool:
+    return isinstance(value, dict) and len(value) == 1 and "ref" in value
+
+
+def _primitive(value) -> bool:
+    return value is None or isinstance(value, (str, int, float, bool))
+
+
+class JourneyRecorder:
+    """A class that records every command a driver sends while it's
+    attached, with the parameters and the returned value. Elements are
+    replaced by `{"ref": n}` references, numbered in the order the elements
+    are first seen, so the same element always gets the same reference.
+
+    Failed element lookups are recorded as lookups that found nothing,
+    other failed commands are left out, page objects retry them.
+
+    Attributes
+    ----------
+        driver (WebDriver): the recorded driver.
+        commands (list): recorded commands, as dicts with the `command`,
+        `params` and `value` (or `error`) keys, commands with values that
+        can't be recorded (e.g. shadow roots) have an `unsupported` key.
+
+    Methods
+    -------
+        attach (): start recording the driver's commands.
+        detach (): stop recording.
+    """
+
+    def __init__(self, driver: WebDriver):
+        from selenium.webdriver.remote.webelement import WebElement
+
+        self.driver: WebDriver = driver
+        self.commands: List[Dict[str, Any]] = []
+        self._element_type = WebElement
+        self._refs: Dict[str, int] = {}
+        self._execute_command = driver.execute
+
+    def _encode(self, value, key: str | None = None):
+        if isinstance(value, self._element_type):
+            return {"ref": self._refs.setdefault(value.id, len(self._refs))}
+        if key == "id" and isinstance(value, str) and value in self._refs:
+            # element commands pass the element's id
+            return {"ref": self._refs[value]}
+        if isinstance(value, dict):
+            return {
+                k: self._encode(v, k)
+                for k, v in value.items()
+                if k != "sessionId"
+            }
+        if isinstance(value, (list, tuple)):
+            return [self._encode(item) for item in value]
+        if _primitive(value):
+            return value
+        raise TypeError(f"Can't record a {type(value).__name__}")
+
+    def _execute(self, command: str, params: dict | None = None) -> dict:
+        entry: Dict[str, Any] = {"command": command}
+        try:
+            entry["params"] = self._encode(params or {})
+        except TypeError as error:
+            entry["unsupported"] = str(error)
+        try:
+            response = self._execute_command(command, params)
+        except WebDriverException:
+            if command in _FINDS and "unsupported" not in entry:
+                entry["error"] = True
+                self.commands.append(entry)
+            raise
+        if "unsupported" not in entry:
+            try:
+                entry["value"] = self._encode(response.get("value"))
+            except TypeError as error:
+                entry["unsupported"] = str(error)
+        self.commands.append(entry)
+        return response
+
+    def attach(self):
+        """send the driver's commands through the recorder"""
+        self.driver.execute = self._execute
+
+    def detach(self):
+        """restore the driver's own execute()"""
+        if self.driver.__dict__.get("execute") == self._execute:
+            del self.driver.execute
+
+
+class _Batch:
+    """lookups and reads recorded between two actions, only their last
+    result counts, it's what a replay waits for"""
+
+    def __init__(self):
+        self.queries: Dict[tuple, dict] = {}
+        self.reads: Dict[tuple, dict] = {}
+
+    def add(self, entry: dict):
+        command, params = entry["command"], entry["params"]
+        # a JSON value, e.g. the elements a lookup found
+        value: Any = entry.get("value")
+        if command in _FINDS:
+            multiple, child = _FINDS[command]
+            parent = params["id"]["ref"] if child else None
+            key = (parent, params["using"], params["value"], multiple)
+            found: List[dict]
+            if entry.get("error"):
+                found, count, exact = [], 0, True
+            elif multiple:
+                found, count, exact = value, len(value), True
+            else:
+                found, count, exact = [value], 1, False
+            # a lookup made again keeps its first position
+            self.queries.setdefault(key, {}).update(
+                {
+                    "parent": parent,
+                    "using": params["using"],
+                    "value": params["value"],
+                    "count": count,
+                    "exact": exact,
+                    "refs": [
+                        [index, element["ref"]]
+                        for index, element in enumerate(found)
+                    ],
+                }
+            )
+            return
+        ref = params["id"]["ref"] if "id" in params else None
+        if command == "getElementText":
+            value = " ".join(value.split())
+        elif command == "getElementTagName":
+            value = value.lower()
+        read = (command, ref, params.get("name"))
+        self.reads.pop(read, None)
+        self.reads[read] = {
+            "kind": command,
+            "ref": ref,
+            "name": params.get("name"),
+            "expected": value,
+        }
+
+    def compile(self, defined: set) -> dict:
+        """the batch step, with the references it defines added to
+        defined"""
+        found = {ref for q in self.queries.values() for _, ref in q["refs"]}
+        outer = []
+        for query in self.queries.values():
+            parent = query["parent"]
+            if parent is not None and parent not in found:
+                if parent not in defined:
+                    raise ValueError(f"Element {parent} is never found")
+                outer.append(parent)
+        reads = []
+        for read in self.reads.values():
+            if read["ref"] is not None and read["ref"] not in found:
+                if read["ref"] not in defined:
+                    # read from an element the page replaced since
+                    continue
+                outer.append(read["ref"])
+            reads.append(read)
+        defined |= found
+        return {
+            "batch": {
+                "queries": list(self.queries.values()),
+                "reads": reads,
+                "outer": sorted(set(outer)),
+                "defined": sorted(found),
+            }
+        }
+
+
+def _refs(value) -> Iterable[int]:
+    if _is_ref(value):
+        yield value["ref"]
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _refs(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _refs(item)
+
+
+def compile_journey(commands: List[Dict[str, Any]]) -> List[dict]:
+    """compile recorded commands into the steps of a plan.
+
+    The lookups and reads between two actions are merged into one batch
+    step that a replay polls until every lookup finds its elements and
+    every read returns the recorded value. Other commands (navigation,
+    clicks, keys, scripts) are replayed as they were sent, and their
+    results are checked unless they differ from run to run.
+    """
+    steps: List[dict] = []
+    batch: _Batch | None = None
+    # references to the elements the steps so far looked up
+    defined: Set[int] = set()
+    for entry in commands:
+        command = entry["command"]
+        if "unsupported" in entry:
+            raise ValueError(f"{command}: {entry['unsupported']}")
+        if command in _FINDS or (
+            command in _READS
+            and "error" not in entry
+            and _primitive(entry["value"])
+        ):
+            batch = batch or _Batch()
+            batch.add(entry)
+            continue
+        if "error" in entry:
+            continue
+        if batch is not None:
+            steps.append(batch.compile(defined))
+            batch = None
+        for ref in _refs(entry["params"]):
+            if ref not in defined:
+                raise ValueError(f"Element {ref} is never found")
+        defined |= set(_refs(entry["value"]))
+        steps.append(
+            {
+                "command": command,
+                "params": entry["params"],
+                "expected": entry["value"],
+                "check": command not in _UNCHECKED,
+            }
+        )
+    if batch is not None:
+        steps.append(batch.compile(defined))
+    return steps
+
+
+class JourneyPlayer:
+    """A class that replays the steps of a plan on a driver.
+
+    Batch steps are polled with the timing policy's timeout and poll
+    interval of their key (`journey:TEST#STEP`), so they wait for the page
+    like the page objects do, and their latency is recorded. The first
+    step that doesn't behave like the recording raises a
+    JourneyDivergence.
+
+    Attributes
+    ----------
+        driver (WebDriver): the driver to replay the plan on.
+        test (str): id of the replayed test, used in the timing keys.
+        elements (dict): the elements found so far, by reference.
+        round_trips (int): number of commands sent.
+
+    Methods
+    -------
+        play (steps: list): replay the steps of a plan.
+    """
+
+    def __init__(self, driver: WebDriver, test: str = ""):
+        from selenium.webdriver.remote.webelement import WebElement
+
+        self.driver: WebDriver = driver
+        self._element_type = WebElement
+        self.test: str = test
+        self.elements: Dict[int, WebElement] = {}
+        self.round_trips: int = 0
+
+    def _resolve(self, value, key: str | None = None):
+        if _is_ref(value):
+            element = self.elements[value["ref"]]
+            return element.id if key == "id" else element
+        if isinstance(value, dict):
+            return {k: self._resolve(v, k) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._resolve(item) for item in value]
+        return value
+
+    def _match(self, expected, actual) -> bool:
+        if _is_ref(expected):
+            if not isinstance(actual, self._element_type):
+                return False
+            element = self.elements.setdefault(expected["ref"], actual)
+            return element.id == actual.id
+        if isinstance(expected, dict):
+            return (
+                isinstance(actual, dict)
+                and expected.keys() == actual.keys()
+                and all(self._match(v, actual[k]) for k, v in expected.items())
+            )
+        if isinstance(expected, list):
+            return (
+                isinstance(actual, list)
+                and len(expected) == len(actual)
+                and all(map(self._match, expected, actual))
+            )
+        return expected == actual
+
+    def _command(self, index: int, step: dict):
+        try:
+            params = self._resolve(copy.deepcopy(step["params"]))
+        except KeyError as error:
+            raise JourneyDivergence(
+                index, f"element {error} isn't found"
+            ) from None
+        self.round_trips += 1
+        try:
+            response = self.driver.execute(step["command"], params)
+        except WebDriverException as error:
+            raise JourneyDivergence(
+                index, f"{step['command']} failed: {error.msg}"
+            ) from None
+        value = response.get("value")
+        if step["check"] and not self._match(step["expected"], value):
+            raise JourneyDivergence(
+                index,
+                f"{step['command']} returned {value!r}, "
+                f"expected {step['expected']!r}",
+            )
+
+    def _batch(self, index: int, batch: dict):
+        key = f"journey:{self.test}#{index}"
+        timeout = Page.timing.timeout(key)
+        poll = Page.timing.poll_frequency(key)
+        outer = [self.elements[ref] for ref in batch["outer"]]
+        start = time.perf_counter()
+        while True:
+            self.round_trips += 1
+            try:
+                result = self.driver.execute_script(
+                    _BATCH_SCRIPT, batch, outer
+                )
+            except WebDriverException as error:
+                raise JourneyDivergence(
+                    index, error.msg or str(error)
+                ) from None
+            if result["ok"]:
+                break
+            if time.perf_counter() - start >= timeout:
+                kind, position = result["failed"]
+                if kind == "query":
+                    step = batch["queries"][position]
+                    expected = step["count"]
+                    what = f"{step['using']}={step['value']} count"
+                else:
+                    step = batch["reads"][position]
+                    expected = step["expected"]
+                    what = step["kind"]
+                raise JourneyDivergence(
+                    index,
+                    f"{what} is {result['actual']!r}, expected {expected!r}",
+                )
+            time.sleep(poll)
+        Page.timing.record(key, time.perf_counter() - start)
+        self.elements.update(zip(batch["defined"], result["elements"]))
+
+    def play(self, steps: List[dict]):
+        """replay steps, raises JourneyDivergence at the first step that
+        differs from the recording"""
+        for index, step in enumerate(steps):
+            if "batch" in step:
+                self._batch(index, step["batch"])
+            else:
+                self._command(index, step)
+
+
+class JourneyPlans:
+    """A class that keeps the compiled plans of the recorded tests, with
+    the fingerprint of what they were recorded with.
+
+    Methods
+    -------
+        get (test: str, fingerprint: str): Returns the plan of a test, None
+        if it's missing or was recorded with another fingerprint.
+        record (test: str, fingerprint: str, commands: int, steps: list):
+        keep the plan of a test.
+        load (path: str): Returns the plans of a store.
+        save (path: str): merge the plans recorded since loading into a
+        store.
+    """
+
+    def __init__(self):
+        self.plans: Dict[str, dict] = {}
+        self._recorded: Dict[str, dict] = {}
+
+    def get(self, test: str, fingerprint: str) -> dict | None:
+        """the plan of a test, if it was recorded with fingerprint"""
+        plan = self.plans.get(test)
+        if plan is None or plan["fingerprint"] != fingerprint:
+            return None
+        return plan
+
+    def record(
+        self, test: str, fingerprint: str, commands: int, steps: List[dict]
+    ):
+        """keep the plan of a test, compiled from commands commands"""
+        plan = {
+            "fingerprint": fingerprint,
+            "commands": commands,
+            "steps": steps,
+        }
+        self.plans[test] = plan
+        self._recorded[test] = plan
+
+    @classmethod
+    def load(cls, path: str) -> "JourneyPlans":
+        """create the plans of a JSON store, none if the store doesn't exist
+        yet"""
+        plans = cls()
+        plans.plans = load_json(path) or {}
+        return plans
+
+    def save(self, path: str):
+        """add the plans recorded since loading to a JSON store, merged
+        with the ones other processes saved in the meantime"""
+        recorded, self._recorded = self._recorded, {}
+        if not recorded:
+            return
+        update_json(path, lambda plans: {**plans, **recorded})
+
+
+def _sources() -> List[str]:
+    directory = os.path.dirname(swag_labs.__file__)
+    return [
+        os.path.join(root, name)
+        for root, _, names in os.walk(directory)
+        for name in names
+        if name.endswith(".py")
+    ]
+
+
+def fingerprint(paths: Iterable[str], values: Dict[str, Any]) -> str:
+    """hash of the content of source files and of the JSON serializable
+    values, values that can't be serialized are left out"""
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        digest.update(os.path.basename(path).encode("utf-8"))
+        with open(path, "rb") as file:
+            digest.update(file.read())
+    for name in sorted(values):
+        try:
+            value = json.dumps(values[name], sort_keys=True)
+        except (TypeError, ValueError):
+            continue
+        digest.update(f"{name}={value}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _reset(driver: WebDriver):
+    try:
+        driver.delete_all_cookies()
+        driver.execute_script(
+            "window.sessionStorage.clear(); window.localStorage.clear();"
+        )
+    except WebDriverException:
+        pass
+
+
+class JourneyReplay:
+    """A pytest plugin that records the tests marked with `journey` and
+    replays them from their compiled plan.
+
+    In `record` mode the marked tests run as usual, and the commands of
+    the ones that pass are compiled into plans. In `replay` mode a test
+    with a plan recorded with the same fingerprint (`swag_labs` sources,
+    test module, JSON fixture values, base url) replays the plan instead of
+    calling the test, and passes if the browser returns every recorded
+    value, since the test's assertions only depend on them. On the first
+    divergence the browser's cookies and storage are cleared and the test
+    runs as usual, and its plan is recorded again if it passes.
+
+    Page objects aren't created by a replay, so their listeners (impact
+    map, page metrics, browser event steps) see nothing of it.
+
+    Attributes
+    ----------
+        path (str): the store of the plans.
+        mode (str): `record` or `replay`.
+        plans (JourneyPlans): the recorded plans.
+        replayed (list): (test, recorded commands, round trips) of the
+        replayed tests.
+        fallbacks (list): (test, reason) of the tests that diverged.
+        recorded (list): tests whose plan was recorded.
+    """
+
+    MODES = ("record", "replay")
+
+    def __init__(self, path: str, mode: str):
+        self.path: str = path
+        self.mode: str = mode
+        self.plans: JourneyPlans = JourneyPlans.load(path)
+        self.replayed: List[Tuple[str, int, int]] = []
+        self.fallbacks: List[Tuple[str, str]] = []
+        self.recorded: List[str] = []
+        self._recorders: Dict[str, Tuple[JourneyRecorder, str]] = {}
+        self._sources: List[str] = _sources()
+
+    def _fingerprint(self, item: pytest.Function) -> str:
+        values = {
+            name: value
+            for name, value in item.funcargs.items()
+            if name != "driver"
+        }
+        values["base_url"] = Page._base_url  # pylint: disable=protected-access
+        values["soft_navigation"] = Page.soft_navigation
+        return fingerprint([*self._sources, str(item.path)], values)
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_pyfunc_call(self, pyfuncitem: pytest.Function):
+        from selenium.webdriver.remote.webdriver import WebDriver
+
+        driver = pyfuncitem.funcargs.get("driver")
+        if pyfuncitem.get_closest_marker("journey") is None or not (
+            isinstance(driver, WebDriver)
+        ):
+            return None
+        test = pyfuncitem.nodeid
+        key = self._fingerprint(pyfuncitem)
+        plan = self.plans.get(test, key) if self.mode == "replay" else None
+        if plan is not None:
+            player = JourneyPlayer(driver, test)
+            try:
+                player.play(plan["steps"])
+            except JourneyDivergence as divergence:
+                self.fallbacks.append((test, str(divergence)))
+                pyfuncitem.user_properties.append(
+                    ("journey", f"fallback: {divergence}")
+                )
+                _reset(driver)
+            else:
+                self.replayed.append(
+                    (test, plan["commands"], player.round_trips)
+                )
+                pyfuncitem.user_properties.append(("journey", "replayed"))
+                return True
+        recorder = JourneyRecorder(driver)
+        recorder.attach()
+        self._recorders[test] = (recorder, key)
+        return None
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_call(self, item: pytest.Item):
+        try:
+            result = yield
+        finally:
+            recording = self._recorders.pop(item.nodeid, None)
+            if recording is not None:
+                recording[0].detach()
+        # only the commands of a passing test are compiled
+        if recording is not None:
+            recorder, key = recording
+            try:
+                steps = compile_journey(recorder.commands)
+            except (TypeError, ValueError) as error:
+                item.user_properties.append(
+                    ("journey", f"not recorded: {error}")
+                )
+            else:
+                self.plans.record(
+                    item.nodeid, key, len(recorder.commands), steps
+                )
+                self.recorded.append(item.nodeid)
+        return result
+
+    def pytest_sessionfinish(self, session: pytest.Session):
+        self.plans.save(self.path)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not (self.replayed or self.fallbacks or self.recorded):
+            return
+        terminalreporter.section("journeys")
+        for test, commands, round_trips in self.replayed:
+            terminalreporter.write_line(
+                f"{test}: replayed in {round_trips} round trip(s), "
+                f"{commands} recorded command(s)"
+            )
+        for test, reason in self.fallbacks:
+            terminalreporter.write_line(f"{test}: fell back at {reason}")
+        if self.recorded:
+            terminalreporter.write_line(
+                f"{len(self.recorded)} plan(s) recorded"
+            )
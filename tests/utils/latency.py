@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Page transition timing and per persona latency budgets"""
+
+import json
+import time
+from typing import Callable, Dict, List, NamedTuple
+
+from selenium.common.exceptions import TimeoutException
+
+from swag_labs.pages.page import Page
+
+__all__ = (
+    "Transition",
+    "TransitionTimer",
+    "LatencyBudgets",
+)
+
+
+class Transition(NamedTuple):
+    """timing of a page transition, `ready` is the part of `total` spent
+    waiting for the page's ready locator, a transition that didn't reach
+    the expected page isn't timed"""
+
+    step: str
+    total: float
+    ready: float
+    reached: bool
+
+
+class TransitionTimer:
+    """A class that times page transitions, from the action that triggers
+    the transition until the new page's ready locator is present.
+
+    Attributes
+    ----------
+        timeout (float): maximum wait for a page to be ready.
+        transitions (list): the timed transitions, in order.
+
+    Methods
+    -------
+        open (step: str, page: Page): open the page and time it.
+        transition (step: str, action: Callable, expected: type): run the
+        action and time the transition to the page it returns.
+        timings (): Returns the total time of each reached step.
+    """
+
+    def __init__(self, timeout: float = 30):
+        self.timeout: float = timeout
+        self.transitions: List[Transition] = []
+
+    def _ready(self, step: str, page: Page, start: float) -> Page | None:
+        ready_start = time.perf_counter()
+        try:
+            page.wait_until_ready(self.timeout, poll_frequency=0.05)
+        except TimeoutException:
+            self.transitions.append(Transition(step, 0.0, 0.0, False))
+            return None
+        end = time.perf_counter()
+        self.transitions.append(
+            Transition(step, end - start, end - ready_start, True)
+        )
+        return page
+
+    def open(self, step: str, page: Page) -> Page | None:
+        """open the page by its url and time it until it's ready"""
+        start = time.perf_counter()
+        page.driver.get(page.url)
+        return self._ready(step, page, start)
+
+    def transition(
+        self, step: str, action: Callable[[], Page], expected: type
+    ) -> Page | None:
+        """run an action that navigates to another page and time it until
+        the new page is ready, returns None if the action didn't lead to a
+        page of the expected class"""
+        start = time.perf_counter()
+        page = action()
+        if not isinstance(page, expected):
+            self.transitions.append(Transition(step, 0.0, 0.0, False))
+            return None
+        return self._ready(step, page, start)
+
+    def timings(self) -> Dict[str, float]:
+        """total time of each reached step"""
+        return {t.step: t.total for t in self.transitions if t.reached}
+
+
+class LatencyBudgets:
+    """A class that holds latency budgets (in seconds) of journey steps for
+    each persona.
+
+    The configuration has `default` budgets per step, and a `personas`
+    mapping of each persona to its overrides of the default budgets, and to
+    the steps it's expected not to reach under `unreachable`:
+
+        {
+            "default": {"login": 3.0, "open_cart": 2.0},
+            "personas": {
+                "standard_user": {},
+                "performance_glitch_user": {"login": 8.0},
+                "problem_user": {"unreachable": ["open_cart"]}
+            }
+        }
+
+    Methods
+    -------
+        load (path: str): Returns the budgets read from a JSON file.
+        personas (): Returns the configured personas.
+        budget (persona: str, step: str): Returns a step's budget.
+        violations (persona: str, timings: dict): Returns a description of
+        each step that exceeded its budget or wasn't reached.
+    """
+
+    def __init__(self, config: dict):
+        self.default: Dict[str, float] = config.get("default", {})
+        self.overrides: Dict[str, Dict[str, float]] = {}
+        self.unreachable: Dict[str, List[str]] = {}
+        for persona, overrides in config.get("personas", {}).items():
+            overrides = dict(overrides)
+            self.unreachable[persona] = overrides.pop("unreachable", [])
+            self.overrides[persona] = overrides
+
+    @classmethod
+    def load(cls, path: str) -> "LatencyBudgets":
+        """read latency budgets from a JSON file"""
+        with open(path, encoding="utf-8") as file:
+            return cls(json.load(file))
+
+    def personas(self) -> List[str]:
+        """get the configured personas"""
+        return list(self.overrides)
+
+    def budget(self, persona: str, step: str) -> float | None:
+        """get a step's budget for a persona, None if it has no budget"""
+        overrides = self.overrides.get(persona, {})
+        return overrides.get(step, self.default.get(step))
+
+    def violations(self, persona: str, timings: Dict[str, float]) -> List[str]:
+        """describe the steps that took longer than their budget, and the
+        budgeted steps missing from the timings unless the persona is
+        expected not to reach them"""
+        violations = []
+        steps = {**self.default, **self.overrides.get(persona, {})}
+        for step in steps:
+            if step in timings:
+                budget = self.budget(persona, step)
+                seconds = timings[step]
+                if budget is not None and seconds > budget:
+                    violations.append(
+                        f"{persona} {step}: {seconds:.3f}s > {budget:.3f}s"
+                    )
+            elif step not in self.unreachable.get(persona, []):
+                violations.append(f"{persona} {step}: not reached")
+        return violations
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Load generation, runs the swag-labs purchase funnel page objects as
+concurrent virtual users and reports per step throughput and latency.
+
+usage:
+
+    python -m tests.utils.load --users 20 --ramp-up 60 --duration 600 \\
+        --base-url http://localhost:3000 --mix purchase=3,browse=1
+"""
+
+import argparse
+import math
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Sequence, Tuple, Type, TypeVar
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.support.ui import WebDriverWait
+
+from swag_labs.pages.cart_page import CartPage
+from swag_labs.pages.checkout_complete import CheckoutCompletePage
+from swag_labs.pages.checkout_info import CheckoutInfoPage
+from swag_labs.pages.checkout_overview import CheckoutOverviewPage
+from swag_labs.pages.inventory_page import InventoryPage
+from swag_labs.pages.login import LoginPage
+from swag_labs.pages.page import Page
+from swag_labs.pages.product_page import ProductPage
+from tests.utils.session import BrowserSession
+
+__all__ = (
+    "percentile",
+    "LoadStats",
+    "VirtualUser",
+    "LoadRunner",
+    "SCENARIOS",
+)
+
+P = TypeVar("P", bound=Page)
+
+PASSWORD = "secret_sauce"
+CHECKOUT_INFO = ("Load", "Tester", "12345")
+# errors of a scenario raised outside of its steps
+UNATTRIBUTED = "(unattributed)"
+
+
+def percentile(values: Sequence[float], p: float) -> float:
+    """nearest-rank percentile of already sorted values"""
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(values)))
+    return values[rank - 1]
+
+
+class LoadStats:
+    """A class that collects the latency of each funnel step, thread safe.
+
+    Attributes
+    ----------
+        started (float): monotonic time the stats started at.
+        latencies (dict): latencies in seconds per step name.
+        errors (dict): number of failures per step name.
+
+    Methods
+    -------
+        record (step: str, seconds: float, ok: bool): record a step.
+        snapshot (): Returns the throughput and latency percentiles per step.
+        lines (): Returns the snapshot as a human readable table.
+    """
+
+    def __init__(self):
+        self.started: float = time.monotonic()
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, step: str, seconds: float, ok: bool = True):
+        with self._lock:
+            if ok:
+                self.latencies.setdefault(step, []).append(seconds)
+            else:
+                self.errors[step] = self.errors.get(step, 0) + 1
+
+    def snapshot(self) -> List[tuple]:
+        """get (step, count, errors, per second, p50, p90, p99) per step"""
+        with self._lock:
+            steps = {
+                step: sorted(values) for step, values in self.latencies.items()
+            }
+            errors = dict(self.errors)
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        rows = []
+        for step in sorted(set(steps) | set(errors)):
+            values = steps.get(step, [])
+            rows.append(
+                (
+                    step,
+                    len(values),
+                    errors.get(step, 0),
+                    len(values) / elapsed,
+                    percentile(values, 50),
+                    percentile(values, 90),
+                    percentile(values, 99),
+                )
+            )
+        return rows
+
+    def lines(self) -> List[str]:
+        """get the snapshot as a table"""
+        lines = [
+            f"{'step':<20}{'count':>8}{'errors':>8}{'req/s':>9}"
+            f"{'p50':>9}{'p90':>9}{'p99':>9}"
+        ]
+        for step, count, errors, rate, p50, p90, p99 in self.snapshot():
+            lines.append(
+                f"{step:<20}{count:>8}{errors:>8}{rate:>9.2f}"
+                f"{p50:>9.3f}{p90:>9.3f}{p99:>9.3f}"
+            )
+        return lines
+
+
+def wait_for(page: Page, page_class: Type[P], timeout: float = 30) -> P:
+    """wait until the browser is on the page's route and the page is
+    ready, raises AssertionError if the step landed on another page than a
+    page_class one"""
+    if not isinstance(page, page_class):
+        raise AssertionError(
+            f"expected a {page_class.__name__}, got a {type(page).__name__}"
+        )
+    WebDriverWait(page.driver, timeout, poll_frequency=0.05).until(
+        lambda driver: Page.route(driver.current_url) == Page.route(page.url)
+    )
+    page.wait_until_ready(timeout, poll_frequency=0.05)
+    return page
+
+
+class VirtualUser:
+    """A class that represents a virtual user running funnel scenarios in
+    its own browser.
+
+    Attributes
+    ----------
+        driver (WebDriver): the user's browser.
+        username (str): swag-labs user to login with.
+        stats (LoadStats): where step latencies are recorded.
+        think_time (tuple): min and max pause between steps in seconds.
+        rng (random.Random): the user's random generator.
+        failed_step (str): the step that failed last, None if no step
+        failed since it was cleared.
+
+    Methods
+    -------
+        step (name: str): context manager that times a funnel step.
+        think (): pause for a random think time.
+        reset (): clear cookies and storage between iterations.
+    """
+
+    def __init__(
+        self,
+        driver: WebDriver,
+        username: str,
+        stats: LoadStats,
+        think_time: Tuple[float, float] = (0.0, 0.0),
+        rng: random.Random | None = None,
+    ):
+        self.driver: WebDriver = driver
+        self.username: str = username
+        self.stats: LoadStats = stats
+        self.think_time: Tuple[float, float] = think_time
+        self.rng: random.Random = rng or random.Random()
+        self.failed_step: str | None = None
+
+    @contextmanager
+    def step(self, name: str):
+        """time a step, a failed step is counted as an error"""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.failed_step = name
+            self.stats.record(name, time.perf_counter() - start, ok=False)
+            raise
+        self.stats.record(name, time.perf_counter() - start)
+
+    def think(self):
+        """pause between two steps like a real user would"""
+        low, high = self.think_time
+        if high > 0:
+            time.sleep(self.rng.uniform(low, high))
+
+    def reset(self):
+        """clear the session state between two scenario iterations"""
+        self.driver.delete_all_cookies()
+        self.driver.execute_script("window.sessionStorage.clear();")
+        self.driver.execute_script("window.localStorage.clear();")
+
+    def login(self) -> InventoryPage:
+        login_page = LoginPage(self.driver)
+        with self.step("open login"):
+            login_page.open()
+        self.think()
+        with self.step("login"):
+            inventory = wait_for(
+                login_page.login(self.username, PASSWORD), InventoryPage
+            )
+        self.think()
+        return inventory
+
+    def fill_cart(self, inventory: InventoryPage) -> CartPage:
+        names = [item.name() for item in inventory.items()]
+        for name in self.rng.sample(names, k=min(2, len(names))):
+            with self.step("add to cart"):
+                inventory.add_item_to_cart(name)
+            self.think()
+        with self.step("open cart"):
+            cart = wait_for(inventory.check_cart(), CartPage)
+        self.think()
+        return cart
+
+
+def browse(user: VirtualUser):
+    """login, look at a product's details and logout"""
+    inventory = user.login()
+    names = [item.name() for item in inventory.items()]
+    with user.step("product details"):
+        product = wait_for(
+            inventory.item_details_page(user.rng.choice(names)), ProductPage
+        )
+    user.think()
+    with user.step("back to products"):
+        inventory = wait_for(product.back(), InventoryPage)
+    user.think()
+    with user.step("logout"):
+        wait_for(inventory.logout(), LoginPage)
+
+
+def abandon(user: VirtualUser):
+    """login, fill the cart and leave at the checkout info step"""
+    cart = user.fill_cart(user.login())
+    with user.step("checkout info"):
+        wait_for(cart.goto_checkout(), CheckoutInfoPage)
+
+
+def purchase(user: VirtualUser):
+    """go through the whole purchase funnel"""
+    cart = user.fill_cart(user.login())
+    with user.step("checkout info"):
+        info = wait_for(cart.goto_checkout(), CheckoutInfoPage)
+    user.think()
+    with user.step("checkout overview"):
+        info.enter_user_info(*CHECKOUT_INFO)
+        overview = wait_for(info.continue_checkout(), CheckoutOverviewPage)
+    user.think()
+    with user.step("checkout complete"):
+        complete = wait_for(overview.finish_checkout(), CheckoutCompletePage)
+    user.think()
+    with user.step("back to products"):
+        wait_for(complete.back(), InventoryPage)
+
+
+SCENARIOS: Dict[str, Callable[[VirtualUser], None]] = {
+    "purchase": purchase,
+    "browse": browse,
+    "abandon": abandon,
+}
+
+
+class LoadRunner:
+    """A class that runs virtual users concurrently.
+
+    Users are started evenly over the ramp-up period, each one in its own
+    thread and browser, and keep running scenarios picked by weight from the
+    mix until the duration is over.
+
+    Attributes
+    ----------
+        users (int): number of virtual users.
+        ramp_up (float): seconds over which the users are started.
+        duration (float): seconds to run the load for, ramp-up included.
+        mix (dict): weight of each scenario name.
+        usernames (list): swag-labs users assigned to virtual users in turn.
+        think_time (tuple): min and max pause between steps in seconds.
+        session_factory (Callable): creates the browser session of a user.
+        stats (LoadStats): collected step latencies.
+
+    Methods
+    -------
+        run (report: Callable, interval: float): run the load, calling report
+        with the stats every interval seconds.
+    """
+
+    def __init__(
+        self,
+        users: int,
+        session_factory: Callable[[], BrowserSession],
+        ramp_up: float = 0,
+        duration: float = 60,
+        mix: Dict[str, float] | None = None,
+        usernames: Sequence[str] = ("standard_user",),
+        think_time: Tuple[float, float] = (0.0, 0.0),
+        seed: int | None = None,
+    ):
+        self.users: int = users
+        self.session_factory: Callable[[], BrowserSession] = session_factory
+        self.ramp_up: float = ramp_up
+        self.duration: float = duration
+        self.mix: Dict[str, float] = mix or {"purchase": 1}
+        self.usernames: Sequence[str] = usernames
+        self.think_time: Tuple[float, float] = think_time
+        self.seed: int | None = seed
+        self.stats: LoadStats = LoadStats()
+        self._stop = threading.Event()
+
+    def _user(self, index: int):
+        delay = self.ramp_up * index / max(self.users, 1)
+        if self._stop.wait(delay):
+            return
+
+        session = self.session_factory()
+        rng = random.Random(None if self.seed is None else self.seed + index)
+        scenarios = list(self.mix)
+        weights = [self.mix[name] for name in scenarios]
+        try:
+            user = VirtualUser(
+                session.driver,
+                self.usernames[index % len(self.usernames)],
+                self.stats,
+                think_time=self.think_time,
+                rng=rng,
+            )
+            while not self._stop.is_set():
+                scenario = rng.choices(scenarios, weights=weights)[0]
+                user.failed_step = None
+                try:
+                    SCENARIOS[scenario](user)
+                except Exception:  # pylint: disable=broad-except
+                    # step errors are already counted, errors raised
+                    # between steps are counted apart, then start over
+                    if user.failed_step is None:
+                        self.stats.record(UNATTRIBUTED, 0.0, ok=False)
+                try:
+                    user.reset()
+                except WebDriverException:
+                    # the browser is gone, continue with a new one
+                    user.driver = session.recycle()
+        finally:
+            session.close()
+
+    def run(
+        self,
+        report: Callable[[LoadStats], None] | None = None,
+        interval: float = 5,
+    ) -> LoadStats:
+        """run the virtual users for the configured duration"""
+        threads = [
+            threading.Thread(target=self._user, args=(i,), daemon=True)
+            for i in range(self.users)
+        ]
+        for thread in threads:
+            thread.start()
+
+        deadline = time.monotonic() + self.duration
+        while time.monotonic() < deadline:
+            self._stop.wait(min(interval, deadline - time.monotonic()))
+            if report is not None:
+                report(self.stats)
+
+        self._stop.set()
+        for thread in threads:
+            thread.join()
+        return self.stats
+
+
+def _parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for pair in value.split(","):
+        name, _, weight = pair.partition("=")
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def _parse_range(value: str) -> Tuple[float, float]:
+    low, _, high = value.partition("-")
+    return float(low), float(high or low)
+
+
+def main(args: Sequence[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--ramp-up", type=float, default=10)
+    parser.add_argument("--duration", type=float, default=60)
+    parser.add_argument("--think-time", type=_parse_range, default=(0, 0))
+    parser.add_argument("--mix", type=_parse_mix, default={"purchase": 1})
+    parser.add_argument("--usernames", default="standard_user")
+    parser.add_argument("--browser", default="chrome")
+    parser.add_argument("--remote-nodes", default="")
+    parser.add_argument("--base-url", default="")
+    parser.add_argument("--report-interval", type=float, default=5)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--no-headless", action="store_true")
+    options = parser.parse_args(args)
+
+    if options.base_url:
+        Page.set_base_url(options.base_url)
+
+    def session_factory() -> BrowserSession:
+        return BrowserSession(
+            options.browser,
+            headless=not options.no_headless,
+            remote_nodes=[n for n in options.remote_nodes.split(",") if n],
+        )
+
+    def report(stats: LoadStats):
+        print(f"--- {time.monotonic() - stats.started:.0f}s", flush=True)
+        print("\n".join(stats.lines()), flush=True)
+
+    runner = LoadRunner(
+        users=options.users,
+        session_factory=session_factory,
+        ramp_up=options.ramp_up,
+        duration=options.duration,
+        mix=options.mix,
+        usernames=options.usernames.split(","),
+        think_time=options.think_time,
+        seed=options.seed,
+    )
+    runner.run(report=report, interval=options.report_interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Locator audit, walks the swag-labs pages and times the resolution of
+every locator constant of the page objects, checks that it matches a single
+element and suggests `data-test` or id locators for it.
+
+usage:
+
+    python -m tests.utils.locator_audit --runs 1000 --top 15 \\
+        --base-url http://localhost:3000 --json locators.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    List,
+    NamedTuple,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from swag_labs.pages.by import By
+from swag_labs.pages.page import Page
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+    from selenium.webdriver.remote.webelement import WebElement
+
+__all__ = (
+    "LocatorResult",
+    "locators",
+    "to_selector",
+    "LocatorAudit",
+)
+
+P = TypeVar("P", bound=Page)
+
+PASSWORD = "secret_sauce"
+CHECKOUT_INFO = ("Locator", "Audit", "12345")
+
+# resolves a locator in the browser `runs` times (so the timer's coarse
+# resolution is amortized), and describes the first match's stable
+# attributes with how many elements of the scope share them
+_AUDIT_SCRIPT = """
+const [kind, selector, scope, runs] = arguments;
+const root = scope || document;
+const resolve = kind === "xpath"
+    ? () => {
+        const result = document.evaluate(selector, root, null,
+            XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        const nodes = [];
+        for (let i = 0; i < result.snapshotLength; i++) {
+            nodes.push(result.snapshotItem(i));
+        }
+        return nodes;
+    }
+    : () => root.querySelectorAll(selector);
+let matches = resolve();
+const start = performance.now();
+for (let i = 0; i < runs; i++) {
+    matches = resolve();
+}
+const micros = (performance.now() - start) * 1000 / runs;
+const first = matches[0];
+const count = (attribute, value) => value
+    ? root.querySelectorAll(`[${attribute}="${CSS.escape(value)}"]`).length
+    : 0;
+return {
+    matches: matches.length,
+    micros: micros,
+    dataTest: first ? first.getAttribute("data-test") : null,
+    dataTestMatches: first ? count("data-test", first.getAttribute("data-test")) : 0,
+    id: first ? first.id : null,
+    idMatches: first ? count("id", first.id) : 0,
+};
+"""
+
+
+class LocatorResult(NamedTuple):
+    """audit of a locator constant, times are per resolution: `browser_us`
+    in the page (microseconds) and `driver_ms` through the driver
+    (milliseconds, round trip included)"""
+
+    owner: str
+    name: str
+    locator: Tuple[str, str]
+    matches: int
+    browser_us: float
+    driver_ms: float
+    suggestion: Tuple[str, str] | None
+    suggestion_us: float | None
+
+
+def locators(cls: type) -> Dict[str, Tuple[str, str]]:
+    """get the locator constants of a page object class, by name"""
+    strategies = {
+        value
+        for name, value in vars(By).items()
+        if name.isupper() and isinstance(value, str)
+    }
+    found: Dict[str, Tuple[str, str]] = {}
+    for name in dir(cls):
+        value = getattr(cls, name)
+        if (
+            name.isupper()
+            and name != "READY_LOCATOR"
+            and isinstance(value, tuple)
+            and len(value) == 2
+            and value[0] in strategies
+        ):
+            found[name] = value
+    return found
+
+
+def to_selector(by: str, value: str) -> Tuple[str, str] | None:
+    """translate a locator to the CSS selector or XPath the driver resolves
+    it with, None for the link text strategies"""
+    if by == By.ID:
+        return "css", f'[id="{value}"]'
+    if by == By.NAME:
+        return "css", f'[name="{value}"]'
+    if by == By.CLASS_NAME:
+        return "css", f".{value}"
+    if by in (By.CSS_SELECTOR, By.TAG_NAME):
+        return "css", value
+    if by == By.XPATH:
+        return "xpath", value
+    return None
+
+
+class LocatorAudit:
+    """A class that audits the locators of page objects on live pages.
+
+    Attributes
+    ----------
+        driver (WebDriver): driver of the browser the pages are open in.
+        runs (int): resolutions of each locator timed in the browser.
+        driver_runs (int): resolutions of each locator timed through the
+        driver.
+        results (list): audited locators.
+        skipped (list): page classes that couldn't be reached.
+
+    Methods
+    -------
+        audit (owner: type, scope: WebElement): audit the locators of a
+        class on the current page, within scope if given.
+        audit_journey (username: str): walk the pages from login to
+        checkout complete and audit them, then their item classes.
+        slowest (top: int): Returns the locators slowest to resolve.
+        lines (top: int): Returns a human readable report.
+    """
+
+    def __init__(self, driver: WebDriver, runs: int = 1000, driver_runs=20):
+        self.driver: WebDriver = driver
+        self.runs: int = runs
+        self.driver_runs: int = driver_runs
+        self.results: List[LocatorResult] = []
+        self.skipped: List[str] = []
+
+    def _browser_time(
+        self, locator: Tuple[str, str], scope: WebElement | None
+    ) -> dict | None:
+        selector = to_selector(*locator)
+        if selector is None:
+            return None
+        return self.driver.execute_script(
+            _AUDIT_SCRIPT, *selector, scope, self.runs
+        )
+
+    def _driver_time(
+        self, locator: Tuple[str, str], scope: WebElement | None
+    ) -> float:
+        context = scope if scope is not None else self.driver
+        start = time.perf_counter()
+        for _ in range(self.driver_runs):
+            context.find_elements(*locator)
+        return (time.perf_counter() - start) * 1000 / self.driver_runs
+
+    @staticmethod
+    def _suggest(
+        locator: Tuple[str, str], measured: dict
+    ) -> Tuple[str, str] | None:
+        if measured["dataTest"] and measured["dataTestMatches"] == 1:
+            suggestion = (
+                By.CSS_SELECTOR,
+                f"[data-test='{measured['dataTest']}']",
+            )
+        elif measured["id"] and measured["idMatches"] == 1:
+            suggestion = (By.ID, measured["id"])
+        else:
+            return None
+        return None if suggestion == tuple(locator) else suggestion
+
+    def audit(
+        self, owner: type, scope: WebElement | None = None
+    ) -> List[LocatorResult]:
+        """audit every locator constant of owner on the current page"""
+        results = []
+        for name, locator in sorted(locators(owner).items()):
+            measured = self._browser_time(locator, scope)
+            if measured is None:
+                continue
+            suggestion = self._suggest(locator, measured)
+            suggestion_us = None
+            if suggestion is not None:
+                suggested = self._browser_time(suggestion, scope)
+                if suggested is not None:
+                    suggestion_us = suggested["micros"]
+            results.append(
+                LocatorResult(
+                    owner=owner.__name__,
+                    name=name,
+                    locator=locator,
+                    matches=measured["matches"],
+                    browser_us=measured["micros"],
+                    driver_ms=self._driver_time(locator, scope),
+                    suggestion=suggestion,
+                    suggestion_us=suggestion_us,
+                )
+            )
+        self.results.extend(results)
+        return results
+
+    def _audit_items(self, page: Page, container: tuple, owner: type):
+        items = page.find_elements(*container)
+        if items:
+            self.audit(owner, scope=items[0])
+        else:
+            self.skipped.append(owner.__name__)
+
+    def audit_journey(self, username: str = "standard_user"):
+        """walk the purchase funnel and audit each page on the way"""
+        # the page modules are loaded on demand, importing this module
+        # (e.g. for `locators()`) doesn't load them
+        from swag_labs.pages.cart_page import CartItem, CartPage
+        from swag_labs.pages.checkout_complete import CheckoutCompletePage
+        from swag_labs.pages.checkout_info import CheckoutInfoPage
+        from swag_labs.pages.checkout_overview import CheckoutOverviewPage
+        from swag_labs.pages.inventory_page import InventoryItem, InventoryPage
+        from swag_labs.pages.login import LoginPage
+        from swag_labs.pages.product_page import ProductPage
+
+        reached = set()
+
+        def visit(page: Page, expected: Type[P]) -> P | None:
+            if not isinstance(page, expected):
+                return None
+            page.wait_until_ready()
+            self.audit(expected)
+            reached.add(expected)
+            return page
+
+        login = LoginPage(self.driver)
+        login.open()
+        visit(login, LoginPage)
+        inventory = visit(login.login(username, PASSWORD), InventoryPage)
+        if inventory is not None:
+            self._audit_items(
+                inventory, InventoryPage.ITEM_CONTAINER, InventoryItem
+            )
+            item = next(iter(inventory.items()), None)
+            name = item.name() if item is not None else ""
+            product = visit(inventory.item_details_page(name), ProductPage)
+            if product is not None:
+                product.add_to_cart()
+                cart = visit(product.check_cart(), CartPage)
+                if cart is not None:
+                    self._audit_items(
+                        cart, CartPage.CART_ITEM_CONTAINER, CartItem
+                    )
+                    info = visit(cart.goto_checkout(), CheckoutInfoPage)
+                    if info is not None:
+                        info.enter_user_info(*CHECKOUT_INFO)
+                        overview = visit(
+                            info.continue_checkout(), CheckoutOverviewPage
+                        )
+                        if overview is not None:
+                            visit(
+                                overview.finish_checkout(),
+                                CheckoutCompletePage,
+                            )
+        for page_class in Page.page_classes().values():
+            if page_class not in reached:
+                self.skipped.append(page_class.__name__)
+
+    def slowest(self, top: int = 10) -> List[LocatorResult]:
+        """locators that take the longest to resolve in the browser"""
+        return sorted(self.results, key=lambda r: -r.browser_us)[:top]
+
+    def lines(self, top: int = 10) -> List[str]:
+        """report of the slowest locators, the locators that don't match
+        exactly one element and the suggested replacements"""
+        lines = [f"slowest {top} locators (per resolution):"]
+        for result in self.slowest(top):
+            lines.append(
+                f"  {result.owner}.{result.name} {result.locator}: "
+                f"{result.browser_us:.2f} us in page, "
+                f"{result.driver_ms:.2f} ms through the driver"
+            )
+        not_unique = [r for r in self.results if r.matches != 1]
+        if not_unique:
+            lines.append("locators not matching exactly one element:")
+            for result in not_unique:
+                lines.append(
+                    f"  {result.owner}.{result.name} {result.locator}: "
+                    f"{result.matches} matches"
+                )
+        suggested = [
+            (r, r.suggestion) for r in self.results if r.suggestion is not None
+        ]
+        if suggested:
+            lines.append("suggested locators:")
+            for result, (strategy, selector) in suggested:
+                by = next(
+                    name
+                    for name, value in vars(By).items()
+                    if name.isupper() and value == strategy
+                )
+                lines.append(
+                    f"  {result.owner}: {result.name} = "
+                    f'(By.{by}, "{selector}")  '
+                    f"# {result.browser_us:.2f} -> "
+                    f"{result.suggestion_us or 0:.2f} us"
+                )
+        if self.skipped:
+            lines.append("not audited: " + ", ".join(self.skipped))
+        return lines
+
+
+def main(args: Sequence[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=1000)
+    parser.add_argument("--driver-runs", type=int, default=20)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--username", default="standard_user")
+    parser.add_argument("--browser", default="chrome")
+    parser.add_argument("--base-url", default="")
+    parser.add_argument("--json", default="")
+    parser.add_argument("--no-headless", action="store_true")
+    options = parser.parse_args(args)
+
+    if options.base_url:
+        Page.set_base_url(options.base_url)
+
+    # imports the browser drivers
+    from tests.utils.session import BrowserSession
+
+    session = BrowserSession(options.browser, headless=not options.no_headless)
+    try:
+        audit = LocatorAudit(
+            session.driver, runs=options.runs, driver_runs=options.driver_runs
+        )
+        audit.audit_journey(options.username)
+    finally:
+        session.close()
+
+    print("\n".join(audit.lines(options.top)))
+    if options.json:
+        with open(options.json, "w", encoding="utf-8") as file:
+            json.dump([r._asdict() for r in audit.results], file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Browser matrix helpers, size concurrent browser runs to the machine and
+combine the results of all browsers into one report"""
+
+import os
+from typing import Dict, List
+
+try:
+    import psutil  # type: ignore[import-untyped]
+except ImportError:  # fall back to sysconf for available memory
+    psutil = None
+
+__all__ = (
+    "SUPPORTED_BROWSERS",
+    "available_memory",
+    "max_concurrent_browsers",
+    "MatrixReport",
+)
+
+SUPPORTED_BROWSERS = ("chrome", "firefox")
+
+
+def available_memory() -> int | None:
+    """get the available system memory in bytes, None if unknown"""
+    if psutil is not None:
+        return psutil.virtual_memory().available
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def max_concurrent_browsers(
+    cpus_per_browser: float = 1, memory_per_browser_mb: int = 1024
+) -> int:
+    """get the number of browsers that can run at the same time without
+    oversubscribing the CPU cores or the available memory"""
+    cpus = os.cpu_count() or 1
+    limit = int(cpus // max(cpus_per_browser, 1e-3))
+
+    memory = available_memory()
+    if memory is not None and memory_per_browser_mb > 0:
+        limit = min(limit, memory // (memory_per_browser_mb * 1024 * 1024))
+
+    return max(1, int(limit))
+
+
+class MatrixReport:
+    """A pytest plugin that collects test outcomes per browser, and reports
+    them side by side at the end of a run over more than one browser.
+
+    Attributes
+    ----------
+        outcomes (dict): count of each outcome per browser.
+        durations (dict): total test duration per browser in seconds.
+
+    Methods
+    -------
+        add (browser: str, when: str, outcome: str, duration: float): record
+        a test report phase.
+        lines (): Returns one summary line per browser.
+        pytest_runtest_logreport (report): record a report of a test tagged
+        with a "browser" user property.
+        pytest_terminal_summary (terminalreporter): write the summary.
+    """
+
+    def __init__(self):
+        self.outcomes: Dict[str, Dict[str, int]] = {}
+        self.durations: Dict[str, float] = {}
+
+    def add(self, browser: str, when: str, outcome: str, duration: float):
+        """record a phase (setup, call or teardown) of a test report"""
+        self.durations[browser] = self.durations.get(browser, 0.0) + duration
+        # a test is counted once, by its call outcome or by a setup that
+        # failed or skipped, teardown errors are counted on their own
+        if when == "call" or (when == "setup" and outcome != "passed"):
+            key = (
+                "error" if when == "setup" and outcome == "failed" else outcome
+            )
+        elif when == "teardown" and outcome == "failed":
+            key = "error"
+        else:
+            return
+        counts = self.outcomes.setdefault(browser, {})
+        counts[key] = counts.get(key, 0) + 1
+
+    def lines(self) -> List[str]:
+        """get a summary line for each browser"""
+        lines = []
+        for browser in sorted(self.outcomes):
+            counts = ", ".join(
+                f"{count} {outcome}"
+                for outcome, count in sorted(self.outcomes[browser].items())
+            )
+            lines.append(
+                f"{browser}: {counts} in {self.durations[browser]:.2f}s"
+            )
+        return lines
+
+    def pytest_runtest_logreport(self, report):
+        browser = dict(report.user_properties).get("browser")
+        if browser is not None:
+            self.add(browser, report.when, report.outcome, report.duration)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if len(self.outcomes) < 2:
+            return
+        terminalreporter.section("browser matrix")
+        for line in self.lines():
+            terminalreporter.write_line(line)
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Browser resource monitor, samples the browser between tests and recycles
+the session when it grows past the configured thresholds"""
+
+from __future__ import annotations
+
+import warnings
+from typing import TYPE_CHECKING, List, NamedTuple
+
+from selenium.common.exceptions import WebDriverException
+
+if TYPE_CHECKING:
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+    from tests.utils.session import BrowserSession
+
+try:
+    import psutil  # type: ignore[import-untyped]
+except ImportError:  # process sampling is skipped without psutil
+    psutil = None
+
+__all__ = (
+    "MB",
+    "ResourceSample",
+    "ResourceDelta",
+    "ResourceThresholds",
+    "ResourceMonitor",
+)
+
+MB = 1024 * 1024
+
+
+class ResourceSample(NamedTuple):
+    """resources used by the browser at a point in time, values are None
+    when they can't be measured for the current browser"""
+
+    rss: int | None
+    cpu: float | None
+    handles: int | None
+    js_heap: int | None
+
+
+class ResourceDelta(NamedTuple):
+    """resources consumed by a single test"""
+
+    test: str
+    rss: int | None
+    cpu: float | None
+    handles: int | None
+    js_heap: int | None
+    recycled: bool
+
+
+class ResourceThresholds(NamedTuple):
+    """limits that trigger a browser recycle, a limit of 0 is disabled"""
+
+    rss_mb: int = 0
+    js_heap_mb: int = 0
+    handles: int = 0
+
+
+def _diff(after, before):
+    if after is None or before is None:
+        return None
+    return after - before
+
+
+class ResourceMonitor:
+    """A class that samples the resources used by the browser of a
+    `BrowserSession`, and recycles it when a threshold is crossed.
+
+    Process metrics (RSS, CPU time and open handles) are summed over the
+    driver service process and all of its children, which includes the
+    browser processes. JS heap size is read through the CDP
+    `Performance.getMetrics` command when the driver supports it.
+
+    Attributes
+    ----------
+        session (BrowserSession): the monitored browser session.
+        thresholds (ResourceThresholds): limits that trigger a recycle.
+        deltas (list): resources consumed by each finished test.
+
+    Methods
+    -------
+        sample (): Returns the current ResourceSample of the browser.
+        exceeded (sample: ResourceSample): Returns the names of the
+        thresholds crossed by the sample.
+        begin (test: str): Samples the browser before a test, recycling it
+        first if needed.
+        end (test: str): Samples the browser after a test and records the
+        test's ResourceDelta.
+        leaks (count: int): Returns the tests with the largest RSS growth.
+    """
+
+    def __init__(
+        self, session: BrowserSession, thresholds: ResourceThresholds
+    ):
+        self.session: BrowserSession = session
+        self.thresholds: ResourceThresholds = thresholds
+        self.deltas: List[ResourceDelta] = []
+        self._before: ResourceSample | None = None
+        self._recycled: bool = False
+        self._cdp_enabled: WebDriver | None = None
+        if psutil is None and (thresholds.rss_mb or thresholds.handles):
+            warnings.warn(
+                "psutil isn't installed, the browser won't be recycled on its"
+                " RSS or handles (install the 'monitor' extra)",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+
+    def _processes(self, driver: WebDriver):
+        service = getattr(driver, "service", None)
+        process = getattr(service, "process", None)
+        if psutil is None or process is None:
+            return []
+        try:
+            root = psutil.Process(process.pid)
+            return [root] + root.children(recursive=True)
+        except psutil.Error:
+            return []
+
+    @staticmethod
+    def _handles(process) -> int:
+        if hasattr(process, "num_handles"):
+            return process.num_handles()
+        return process.num_fds()
+
+    def _js_heap(self, driver: WebDriver) -> int | None:
+        if not hasattr(driver, "execute_cdp_cmd"):
+            return None
+        try:
+            if self._cdp_enabled is not driver:
+                driver.execute_cdp_cmd("Performance.enable", {})
+                self._cdp_enabled = driver
+            metrics = driver.execute_cdp_cmd("Performance.getMetrics", {})
+        except WebDriverException:
+            return None
+        for metric in metrics.get("metrics", []):
+            if metric["name"] == "JSHeapUsedSize":
+                return int(metric["value"])
+        return None
+
+    def sample(self) -> ResourceSample:
+        """sample the resources currently used by the browser"""
+        driver = self.session.driver
+        processes = self._processes(driver)
+        rss, cpu, handles = 0, 0.0, 0
+        for process in processes:
+            try:
+                with process.oneshot():
+                    rss += process.memory_info().rss
+                    times = process.cpu_times()
+                    cpu += times.user + times.system
+                    handles += self._handles(process)
+            except psutil.Error:
+                # process exited between listing and sampling
+                continue
+
+        if not processes:
+            return ResourceSample(None, None, None, self._js_heap(driver))
+        return ResourceSample(rss, cpu, handles, self._js_heap(driver))
+
+    def exceeded(self, sample: ResourceSample) -> List[str]:
+        """get the names of the thresholds crossed by the given sample"""
+        crossed = []
+        limits = (
+            ("rss", sample.rss, self.thresholds.rss_mb * MB),
+            ("js_heap", sample.js_heap, self.thresholds.js_heap_mb * MB),
+            ("handles", sample.handles, self.thresholds.handles),
+        )
+        for name, value, limit in limits:
+            if limit > 0 and value is not None and value > limit:
+                crossed.append(name)
+        return crossed
+
+    def begin(self, test: str) -> ResourceSample:
+        """sample the browser before a test, recycle it if it has crossed
+        any of the thresholds"""
+        sample = self.sample()
+        self._recycled = bool(self.exceeded(sample))
+        if self._recycled:
+            self.session.recycle()
+            sample = self.sample()
+        self._before = sample
+        return sample
+
+    def end(self, test: str) -> ResourceDelta:
+        """sample the browser after a test and record its resource delta"""
+        after = self.sample()
+        before = self._before or after
+        delta = ResourceDelta(
+            test=test,
+            rss=_diff(after.rss, before.rss),
+            cpu=_diff(after.cpu, before.cpu),
+            handles=_diff(after.handles, before.handles),
+            js_heap=_diff(after.js_heap, before.js_heap),
+            recycled=self._recycled,
+        )
+        self.deltas.append(delta)
+        self._before = None
+        return delta
+
+    def leaks(self, count: int = 5) -> List[ResourceDelta]:
+        """get the tests that grew the browser's memory the most"""
+        grown = [d for d in self.deltas if d.rss is not None and d.rss > 0]
+        return sorted(grown, key=lambda d: d.rss or 0, reverse=True)[:count]
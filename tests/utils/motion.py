@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Cosmetic motion (CSS transitions and animations, Web Animations and
+optionally short timers) turned off in every document a browser loads, so
+interaction steps don't wait on it"""
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.bidi.common import command_builder
+from selenium.webdriver.remote.webdriver import WebDriver
+
+__all__ = ("freeze_motion",)
+
+# runs before the scripts of every document: a style ending transitions and
+# animations as soon as they start (their end events still fire) and Web
+# Animations finished when created. Timeouts of up to `fastTimers` ms (0
+# keeps them all) run immediately, longer ones (polling, session expiry)
+# keep their delay
+_FREEZE_FUNCTION = """(fastTimers) => {
+    const css = "*, *::before, *::after {"
+        + " transition-duration: 0s !important;"
+        + " transition-delay: 0s !important;"
+        + " animation-duration: 0s !important;"
+        + " animation-delay: 0s !important;"
+        + " animation-iteration-count: 1 !important;"
+        + " scroll-behavior: auto !important; }";
+    const insert = () => {
+        const style = document.createElement("style");
+        style.textContent = css;
+        (document.head || document.documentElement).appendChild(style);
+    };
+    if (document.documentElement) {
+        insert();
+    } else {
+        new MutationObserver((_, observer) => {
+            if (document.documentElement) {
+                observer.disconnect();
+                insert();
+            }
+        }).observe(document, {childList: true});
+    }
+    const animate = Element.prototype.animate;
+    Element.prototype.animate = function (...args) {
+        const animation = animate.apply(this, args);
+        try {
+            animation.finish();
+        } catch (error) {
+            // infinite animations can't be finished
+        }
+        return animation;
+    };
+    if (fastTimers > 0) {
+        const setTimeout = window.setTimeout;
+        window.setTimeout = function (handler, delay, ...args) {
+            const fast = delay <= fastTimers ? 0 : delay;
+            return setTimeout.call(window, handler, fast, ...args);
+        };
+    }
+}"""
+
+
+def freeze_motion(driver: WebDriver, fast_timers_ms: int = 0) -> str | None:
+    """freeze the motion of every document the browser loads from now on,
+    including the tabs of new user contexts, and run their timeouts of up
+    to fast_timers_ms immediately if it's set. Sessions with BiDi enabled
+    get a preload script, chromium sessions without BiDi get a CDP script
+    of their tab. Returns the protocol used, None if the driver supports
+    neither"""
+    if driver.caps.get("webSocketUrl"):
+        try:
+            connection = driver.network.conn
+            connection.execute(
+                command_builder(
+                    "script.addPreloadScript",
+                    {
+                        "functionDeclaration": (
+                            f"() => ({_FREEZE_FUNCTION})"
+                            f"({int(fast_timers_ms)})"
+                        )
+                    },
+                )
+            )
+            return "bidi"
+        except WebDriverException:
+            pass
+    if hasattr(driver, "execute_cdp_cmd"):
+        try:
+            driver.execute_cdp_cmd(
+                "Page.addScriptToEvaluateOnNewDocument",
+                {"source": (f"({_FREEZE_FUNCTION})({int(fast_timers_ms)});")},
+            )
+            return "cdp"
+        except WebDriverException:
+            pass
+    return None
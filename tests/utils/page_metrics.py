@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Recording of browser-side performance metrics for every page transition
+of a test run"""
+
+import json
+import time
+from typing import Dict, List
+
+import pytest
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from swag_labs.pages.page import Page
+
+__all__ = ("PageMetricsRecorder",)
+
+
+class PageMetricsRecorder:
+    """A pytest plugin that records `Page.metrics()` of every page a test
+    transitions to, and writes them to a JSON file at the end of the run.
+
+    A page is recorded once it's the page open in the browser and its ready
+    locator is present, pages created before navigating to them (e.g. a
+    `LoginPage` about to be opened) are recorded when they're opened.
+
+    Attributes
+    ----------
+        path (str): path of the JSON file to write the metrics to.
+        timeout (float): maximum wait for a page to be ready.
+        records (dict): recorded transitions of each test, by test id.
+
+    Methods
+    -------
+        record (page: Page, event: str): record the metrics of a page.
+    """
+
+    def __init__(self, path: str, timeout: float = 10):
+        self.path: str = path
+        self.timeout: float = timeout
+        self.records: Dict[str, List[dict]] = {}
+        self._test: str | None = None
+
+    def record(self, page: Page, event: str):
+        """record the metrics of a page, if it's the one in the browser"""
+        if self._test is None:
+            return
+        try:
+            if Page.route(page.driver.current_url) != Page.route(page.url):
+                return
+            if event == "init":
+                page.wait_until_ready(self.timeout, poll_frequency=0.05)
+            metrics = page.metrics()
+        except (TimeoutException, WebDriverException):
+            return
+        self.records.setdefault(self._test, []).append(
+            {
+                "page": page.page_name,
+                "route": Page.route(page.url),
+                "event": event,
+                "time": time.time(),
+                "metrics": metrics,
+            }
+        )
+
+    @pytest.hookimpl(wrapper=True)
+    def pytest_runtest_call(self, item: pytest.Item):
+        self._test = item.nodeid
+        Page.add_listener(self.record)
+        try:
+            return (yield)
+        finally:
+            Page.remove_listener(self.record)
+            self._test = None
+
+    def pytest_sessionfinish(self, session: pytest.Session):
+        if not self.records:
+            return
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump(self.records, file, indent=2)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.records:
+            transitions = sum(map(len, self.records.values()))
+            terminalreporter.write_line(
+                f"page metrics of {transitions} transition(s) written to "
+                f"{self.path}"
+            )
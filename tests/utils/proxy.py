@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Local HTTP proxy that records the responses of the website under test
+to a content-addressed store and replays them without network access"""
+
+import hashlib
+import json
+import os
+import select
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, NamedTuple, Sequence, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+import urllib3
+
+__all__ = (
+    "RecordedResponse",
+    "ContentStore",
+    "CachingProxy",
+)
+
+# headers that only apply to one connection, or that no longer describe a
+# body served decoded with its own length
+_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "proxy-connection",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+    "content-encoding",
+    "content-length",
+    # would make the browser skip the proxy for upgraded hosts
+    "strict-transport-security",
+    "alt-svc",
+}
+
+
+class RecordedResponse(NamedTuple):
+    """a response of the store, `body` is the sha256 of its content"""
+
+    status: int
+    headers: List[Tuple[str, str]]
+    body: str
+
+
+class ContentStore:
+    """A class that stores responses on disk, by request.
+
+    Bodies are stored once under their sha256 (`blobs/ab/abcdef...`), so
+    the assets shared by many pages take the space of one. Each request
+    has its own entry (`requests/<sha256 of method and url>.json`), files
+    are replaced atomically so parallel runs can record to the same store.
+
+    Methods
+    -------
+        key (method: str, url: str): Returns the key of a request.
+        get (key: str): Returns the recorded response and its content.
+        put (key: str, status: int, headers: list, content: bytes): record
+        a response.
+    """
+
+    def __init__(self, root: str):
+        self.root: str = root
+        os.makedirs(os.path.join(root, "blobs"), exist_ok=True)
+        os.makedirs(os.path.join(root, "requests"), exist_ok=True)
+
+    @staticmethod
+    def key(method: str, url: str) -> str:
+        """key of a request in the store"""
+        return hashlib.sha256(f"{method} {url}".encode()).hexdigest()
+
+    def _blob(self, digest: str) -> str:
+        return os.path.join(self.root, "blobs", digest[:2], digest)
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.root, "requests", f"{key}.json")
+
+    @staticmethod
+    def _write(path: str, data: bytes):
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp, "wb") as file:
+            file.write(data)
+        os.replace(temp, path)
+
+    def get(self, key: str) -> Tuple[RecordedResponse, bytes] | None:
+        """get a recorded response and its content, None if not recorded"""
+        try:
+            with open(self._entry(key), encoding="utf-8") as file:
+                entry = json.load(file)
+            response = RecordedResponse(
+                entry["status"],
+                [tuple(header) for header in entry["headers"]],
+                entry["body"],
+            )
+            with open(self._blob(response.body), "rb") as file:
+                return response, file.read()
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None
+
+    def put(
+        self,
+        key: str,
+        status: int,
+        headers: List[Tuple[str, str]],
+        content: bytes,
+    ) -> RecordedResponse:
+        """record a response"""
+        digest = hashlib.sha256(content).hexdigest()
+        blob = self._blob(digest)
+        if not os.path.exists(blob):
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            self._write(blob, content)
+        response = RecordedResponse(status, headers, digest)
+        self._write(
+            self._entry(key), json.dumps(response._asdict()).encode("utf-8")
+        )
+        return response
+
+
+class CachingProxy:
+    """A class that runs a forwarding HTTP proxy in a background thread.
+
+    In `record` mode every request is sent to the origin and its response
+    stored, in `replay` mode responses are only served from the store
+    (requests that weren't recorded get a 504) after an optional injected
+    `latency`, and no request leaves the machine.
+
+    HTTPS requests reach the proxy as opaque CONNECT tunnels, which are
+    passed through in record mode and refused in replay mode, so they can't
+    be recorded. To record an HTTPS origin, browse it over plain HTTP (e.g.
+    `BASE_URL=http://www.saucedemo.com`) and list its host in
+    `upgrade_hosts`: the proxy fetches these hosts over HTTPS and rewrites
+    their redirects back to HTTP.
+
+    Attributes
+    ----------
+        store (ContentStore): recorded responses.
+        mode (str): "record" or "replay".
+        latency (float): seconds added to every replayed response.
+        upgrade_hosts (set): hosts fetched over HTTPS.
+        hits (int): responses served from the store.
+        misses (int): replayed requests that weren't recorded.
+        recorded (int): responses recorded.
+
+    Methods
+    -------
+        start (): Returns the proxy address (host:port) once listening.
+        stop (): stop the proxy.
+        lines (): Returns a human readable summary.
+    """
+
+    MODES = ("record", "replay")
+
+    def __init__(
+        self,
+        store: ContentStore,
+        mode: str = "record",
+        latency: float = 0.0,
+        upgrade_hosts: Sequence[str] = (),
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        if mode not in self.MODES:
+            raise ValueError(f"Proxy mode {mode} is not supported")
+        self.store: ContentStore = store
+        self.mode: str = mode
+        self.latency: float = latency
+        self.upgrade_hosts: set = set(upgrade_hosts)
+        self.hits: int = 0
+        self.misses: int = 0
+        self.recorded: int = 0
+        self._lock = threading.Lock()
+        self._http = urllib3.PoolManager(retries=False)
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def address(self) -> str:
+        """host:port the proxy listens on"""
+        host, port = self._server.server_address[:2]
+        if isinstance(host, bytes):
+            host = host.decode()
+        return f"{host}:{port}"
+
+    def start(self) -> str:
+        """start serving in a background thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._server.serve_forever, daemon=True
+            )
+            self._thread.start()
+        return self.address
+
+    def stop(self):
+        """stop serving and close the upstream connections"""
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+        self._http.clear()
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _upstream_url(self, url: str) -> str:
+        parts = urlsplit(url)
+        if parts.scheme == "http" and parts.hostname in self.upgrade_hosts:
+            return urlunsplit(parts._replace(scheme="https"))
+        return url
+
+    def _downgrade(self, location: str) -> str:
+        parts = urlsplit(location)
+        if parts.scheme == "https" and parts.hostname in self.upgrade_hosts:
+            return urlunsplit(parts._replace(scheme="http"))
+        return location
+
+    def fetch(
+        self, method: str, url: str, headers: dict, body: bytes | None
+    ) -> Tuple[int, List[Tuple[str, str]], bytes]:
+        """send a request to the origin, recording GET responses"""
+        response = self._http.request(
+            method,
+            self._upstream_url(url),
+            headers=headers,
+            body=body,
+            redirect=False,
+            decode_content=True,
+        )
+        response_headers = [
+            (
+                name,
+                (
+                    self._downgrade(value)
+                    if name.lower() == "location"
+                    else value
+                ),
+            )
+            for name, value in response.headers.items()
+            if name.lower() not in _HOP_HEADERS
+        ]
+        if method == "GET" and response.status < 500:
+            self.store.put(
+                ContentStore.key(method, url),
+                response.status,
+                response_headers,
+                response.data,
+            )
+            self._count("recorded")
+        return response.status, response_headers, response.data
+
+    def replay(
+        self, method: str, url: str
+    ) -> Tuple[int, List[Tuple[str, str]], bytes] | None:
+        """get a recorded response, HEAD is answered from GET's"""
+        recorded = self.store.get(ContentStore.key("GET", url))
+        if recorded is None:
+            self._count("misses")
+            return None
+        self._count("hits")
+        if self.latency > 0:
+            time.sleep(self.latency)
+        response, content = recorded
+        return response.status, response.headers, content
+
+    def _handler(self) -> type:
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            # pylint: disable-next=redefined-builtin
+            def log_message(self, format, *args):
+                pass
+
+            def _respond(self, status, headers, content, method):
+                self.send_response(status)
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                if method != "HEAD":
+                    self.wfile.write(content)
+
+            def _forward(self):
+                method = self.command
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length) if length else None
+                if proxy.mode == "replay" and method in ("GET", "HEAD"):
+                    response = proxy.replay(method, self.path)
+                    if response is None:
+                        self.send_error(504, "Not recorded: " + self.path)
+                    else:
+                        self._respond(*response, method)
+                    return
+                if proxy.mode == "replay":
+                    self.send_error(502, "Replay only serves GET requests")
+                    return
+                headers = {
+                    name: value
+                    for name, value in self.headers.items()
+                    if name.lower() not in _HOP_HEADERS
+                }
+                headers["Accept-Encoding"] = "gzip, deflate"
+                try:
+                    response = proxy.fetch(method, self.path, headers, body)
+                except urllib3.exceptions.HTTPError as error:
+                    self.send_error(502, str(error))
+                    return
+                self._respond(*response, method)
+
+            do_GET = do_HEAD = do_POST = do_PUT = _forward
+            do_PATCH = do_DELETE = do_OPTIONS = _forward
+
+            def do_CONNECT(self):
+                if proxy.mode == "replay":
+                    self.send_error(502, "Replay doesn't tunnel HTTPS")
+                    return
+                host, _, port = self.path.rpartition(":")
+                try:
+                    upstream = socket.create_connection((host, int(port)))
+                except OSError as error:
+                    self.send_error(502, str(error))
+                    return
+                self.send_response(200, "Connection Established")
+                self.end_headers()
+                self.close_connection = True
+                with upstream:
+                    sockets = [self.connection, upstream]
+                    while True:
+                        readable, _, broken = select.select(
+                            sockets, [], sockets, 60
+                        )
+                        if broken or not readable:
+                            return
+                        for source in readable:
+                            data = source.recv(65536)
+                            if not data:
+                                return
+                            target = (
+                                upstream
+                                if source is self.connection
+                                else self.connection
+                            )
+                            target.sendall(data)
+
+        return Handler
+
+    def lines(self) -> List[str]:
+        """summary of the served requests"""
+        return [
+            f"proxy {self.mode}: {self.recorded} response(s) recorded, "
+            f"{self.hits} replayed, {self.misses} not recorded"
+        ]
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Remote WebDriver backend, distributes browser sessions over a list of
+Selenium Grid or standalone node URLs"""
+
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.options import ArgOptions
+from selenium.webdriver.remote.client_config import ClientConfig
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+from selenium.webdriver.remote.webdriver import WebDriver
+from urllib3.exceptions import HTTPError
+
+from tests.utils.driver import chrome_options, firefox_options
+
+__all__ = (
+    "NodeConnection",
+    "RemoteNode",
+    "NodeBalancer",
+    "get_remote_driver",
+)
+
+
+class NodeConnection(RemoteConnection):
+    """A keep-alive connection to a node that is shared by all the sessions
+    created on that node, quitting a session keeps the node's connection
+    pool open for the next sessions."""
+
+    def __init__(self, node: "RemoteNode", url: str, pool_size: int):
+        super().__init__(
+            client_config=ClientConfig(
+                remote_server_addr=url,
+                keep_alive=True,
+                init_args_for_pool_manager={
+                    "init_args_for_pool_manager": {"maxsize": pool_size}
+                },
+            )
+        )
+        self.node: RemoteNode = node
+
+    def execute(self, command, params):
+        try:
+            return super().execute(command, params)
+        finally:
+            if command == Command.QUIT:
+                self.node.released()
+
+    def close(self):
+        """the pool is owned by the node, see `RemoteNode.close()`"""
+
+    def shutdown(self):
+        """close the pooled connections to the node"""
+        super().close()
+
+
+class RemoteNode:
+    """A class that represents a Grid or standalone node.
+
+    Attributes
+    ----------
+        url (str): the node's URL.
+        connection (NodeConnection): pooled connection to the node.
+        active (int): sessions created on the node by this process.
+        failures (int): failed session creations on the node.
+
+    Methods
+    -------
+        status (): Returns whether the node is ready to create a session,
+        and the fraction of its slots in use (None if unknown).
+        acquired (): records a session created on the node.
+        released (): records a session quitting on the node.
+        close (): closes the node's pooled connections.
+    """
+
+    def __init__(self, url: str, pool_size: int = 8):
+        self.url: str = url.rstrip("/")
+        self.connection: NodeConnection = NodeConnection(
+            self, self.url, pool_size
+        )
+        self.active: int = 0
+        self.failures: int = 0
+        self._lock = threading.Lock()
+
+    def status(self) -> Tuple[bool, float | None]:
+        """query the node's /status endpoint"""
+        try:
+            # pylint: disable=protected-access
+            response = self.connection._request("GET", f"{self.url}/status")
+        except (HTTPError, OSError):
+            return False, None
+
+        value = response.get("value")
+        if not isinstance(value, dict):
+            return False, None
+
+        slots = [
+            slot
+            for node in value.get("nodes", [])
+            for slot in node.get("slots", [])
+        ]
+        if not slots:
+            return bool(value.get("ready")), None
+        busy = sum(1 for slot in slots if slot.get("session"))
+        return bool(value.get("ready")), busy / len(slots)
+
+    def acquired(self):
+        with self._lock:
+            self.active += 1
+
+    def released(self):
+        with self._lock:
+            self.active = max(0, self.active - 1)
+
+    def close(self):
+        self.connection.shutdown()
+
+    def __str__(self):
+        return self.url
+
+
+class NodeBalancer:
+    """A class that creates remote sessions on the least loaded node, and
+    retries on the next node when session creation fails.
+
+    Node load is the fraction of busy slots reported by the node's /status
+    endpoint, so sessions from other processes and machines are accounted
+    for. Nodes that don't report their slots are compared by the number of
+    sessions this process has on them.
+
+    Attributes
+    ----------
+        nodes (list): the RemoteNode objects to distribute sessions over.
+
+    Methods
+    -------
+        nodes_by_load (): Returns the ready nodes, least loaded first.
+        create (options: ArgOptions): Returns a new remote WebDriver.
+        close (): closes the pooled connections to all nodes.
+    """
+
+    def __init__(self, urls: Sequence[str], pool_size: int = 8):
+        if not urls:
+            raise ValueError("NodeBalancer requires at least one node URL")
+        self.nodes: List[RemoteNode] = [
+            RemoteNode(url, pool_size=pool_size) for url in urls
+        ]
+
+    def nodes_by_load(self) -> List[RemoteNode]:
+        """get the nodes ordered by load, nodes that are not ready last"""
+        ranked = []
+        for index, node in enumerate(self.nodes):
+            ready, load = node.status()
+            ranked.append(
+                (not ready, load or 0.0, node.active, node.failures, index)
+            )
+        ranked.sort()
+        return [self.nodes[rank[-1]] for rank in ranked]
+
+    def create(self, options: ArgOptions) -> WebDriver:
+        """create a session on the least loaded node that accepts it"""
+        error: Exception | None = None
+        for node in self.nodes_by_load():
+            try:
+                driver = webdriver.Remote(
+                    command_executor=node.connection, options=options
+                )
+            except (WebDriverException, HTTPError, OSError) as exc:
+                node.failures += 1
+                error = exc
+                continue
+            node.acquired()
+            return driver
+
+        raise WebDriverException(
+            f"Couldn't create a session on any node: {error}"
+        ) from error
+
+    def close(self):
+        for node in self.nodes:
+            node.close()
+
+
+_balancers: Dict[Tuple[str, ...], NodeBalancer] = {}
+_balancers_lock = threading.Lock()
+
+
+def get_remote_driver(
+    browser: str,
+    nodes: Sequence[str],
+    headless=True,
+    proxy: str | None = None,
+    bidi=False,
+):
+    """get a new remote webdriver instance for the given browser name,
+    created on the least loaded of the given nodes, proxy must be reachable
+    from the nodes"""
+
+    options: ArgOptions
+    if browser == "chrome":
+        options = chrome_options(headless=headless, proxy=proxy, bidi=bidi)
+    elif browser == "firefox":
+        options = firefox_options(headless=headless, proxy=proxy, bidi=bidi)
+    else:
+        raise ValueError(f"Browser {browser} is not supported")
+
+    with _balancers_lock:
+        balancer = _balancers.get(tuple(nodes))
+        if balancer is None:
+            balancer = _balancers[tuple(nodes)] = NodeBalancer(nodes)
+    return balancer.create(options)
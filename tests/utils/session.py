@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Browser session holder that can replace its driver mid test run"""
+
+import threading
+from typing import Sequence
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from tests.utils.contexts import UserContexts
+from tests.utils.driver import StandbyPool, get_driver
+from tests.utils.events import EventStream
+from tests.utils.motion import freeze_motion
+from tests.utils.remote import get_remote_driver
+from tests.utils.transport import (
+    TransportConfig,
+    TransportMetrics,
+    tune_transport,
+)
+
+__all__ = ("BrowserSession",)
+
+
+class BrowserSession:
+    """A class that owns the browser used by a test session, and allows
+    swapping it for a fresh one without the tests noticing.
+
+    When `standby` is greater than 0, replacement browsers are launched in
+    the background by a `StandbyPool`, so a recycle doesn't wait for the
+    browser to start. When `remote_nodes` is given, sessions are created on
+    the least loaded of these nodes instead of a local browser. When
+    `transport` is given, driver commands are sent through a tuned and
+    instrumented HTTP transport. When `proxy` is given, the browser traffic
+    goes through that HTTP proxy. When `events` is given, every driver is
+    started with BiDi enabled and its events are streamed to it. When
+    `user_contexts` is set, every driver is started with BiDi enabled so
+    that `isolate()` can give each test its own user context. When
+    `freeze_motion` is set, every driver's documents end their CSS
+    transitions and animations at once, and run their timeouts of up to
+    `fast_timers_ms` immediately if it's set, over BiDi (enabled for it
+    unless it's a local chrome) or CDP.
+
+    Attributes
+    ----------
+        browser (str): name of the browser (chrome or firefox).
+        headless (bool): run the browser in headless mode.
+        implicit_wait (float): implicit wait applied to every new driver,
+        none by default since the page objects wait explicitly.
+        remote_nodes (list): Grid or standalone node URLs, local browsers
+        are used when empty.
+        transport (TransportConfig): HTTP transport settings, None keeps
+        selenium's default transport.
+        proxy (str): host:port of the HTTP proxy of the browsers, None for
+        direct connections.
+        events (EventStream): stream of the browser events, None if
+        disabled.
+        user_contexts (bool): isolate the tests in user contexts.
+        freeze_motion (bool): turn off the cosmetic motion of the pages.
+        fast_timers_ms (int): longest timeout of the frozen pages that runs
+        immediately, 0 to keep their timeouts.
+        transport_metrics (TransportMetrics): metrics of the tuned
+        transport, None if the default transport is used.
+        recycles (int): number of times the browser has been replaced.
+        pool (StandbyPool): standby browsers, None if standby is disabled.
+
+    Methods
+    -------
+        driver (): Returns the current driver, starting one if needed.
+        recycle (): Quits the current driver and starts a new one.
+        isolate (): Switches the driver to a new user context, returns False
+        if the browser can't isolate tests.
+        release (): Removes the user context opened by isolate().
+        close (): Quits the current driver and all standby drivers.
+    """
+
+    def __init__(
+        self,
+        browser: str,
+        headless: bool = True,
+        implicit_wait: float = 0,
+        standby: int = 0,
+        remote_nodes: Sequence[str] = (),
+        transport: TransportConfig | None = None,
+        proxy: str | None = None,
+        events: EventStream | None = None,
+        user_contexts: bool = False,
+        freeze_motion: bool = False,
+        fast_timers_ms: int = 0,
+    ):
+        self.browser: str = browser
+        self.headless: bool = headless
+        self.implicit_wait: float = implicit_wait
+        self.remote_nodes: Sequence[str] = remote_nodes
+        self.transport: TransportConfig | None = transport
+        self.proxy: str | None = proxy
+        self.events: EventStream | None = events
+        self.user_contexts: bool = user_contexts
+        self.freeze_motion: bool = freeze_motion
+        self.fast_timers_ms: int = fast_timers_ms
+        self.transport_metrics: TransportMetrics | None = None
+        if transport is not None:
+            self.transport_metrics = TransportMetrics()
+        self.recycles: int = 0
+        self._driver: WebDriver | None = None
+        self._contexts: UserContexts | None = None
+        self.pool: StandbyPool | None = None
+        if standby > 0:
+            self.pool = StandbyPool(self._launch, max_size=standby)
+
+    def _launch(self) -> WebDriver:
+        bidi = (
+            self.events is not None
+            or self.user_contexts
+            # a local chrome freezes over CDP
+            or (
+                self.freeze_motion
+                and (bool(self.remote_nodes) or self.browser != "chrome")
+            )
+        )
+        if self.remote_nodes:
+            driver = get_remote_driver(
+                self.browser,
+                self.remote_nodes,
+                headless=self.headless,
+                proxy=self.proxy,
+                bidi=bidi,
+            )
+        else:
+            driver = get_driver(
+                self.browser,
+                headless=self.headless,
+                proxy=self.proxy,
+                bidi=bidi,
+            )
+        if self.events is not None:
+            self.events.attach(driver)
+        if self.freeze_motion:
+            freeze_motion(driver, self.fast_timers_ms)
+        if self.transport is not None and self.transport_metrics is not None:
+            tune_transport(
+                driver.command_executor,
+                self.transport,
+                self.transport_metrics,
+            )
+        driver.maximize_window()
+        driver.implicitly_wait(self.implicit_wait)
+        return driver
+
+    def _quit(self):
+        if self._driver is None:
+            return
+        try:
+            self._driver.quit()
+        finally:
+            self._driver = None
+
+    @property
+    def driver(self) -> WebDriver:
+        """get the current driver, start a new one if there is none"""
+        if self._driver is None:
+            if self.pool is not None:
+                self._driver = self.pool.acquire()
+            else:
+                self._driver = self._launch()
+        return self._driver
+
+    def isolate(self) -> bool:
+        """switch the driver to a fresh user context, False if disabled or
+        not supported by the browser"""
+        if not self.user_contexts:
+            return False
+        driver = self.driver
+        if self._contexts is None or self._contexts.driver is not driver:
+            self._contexts = UserContexts(driver)
+        return self._contexts.open() is not None
+
+    def release(self):
+        """remove the user context opened by isolate()"""
+        if (
+            self._contexts is not None
+            and self._contexts.driver is self._driver
+        ):
+            self._contexts.close()
+
+    def recycle(self) -> WebDriver:
+        """replace the current driver with a fresh one"""
+        if self.pool is not None and self._driver is not None:
+            # the replacement is already up, don't wait for the old one
+            threading.Thread(target=self._driver.quit, daemon=True).start()
+            self._driver = None
+        self._quit()
+        self.recycles += 1
+        return self.driver
+
+    def close(self):
+        """quit the current driver and the standby drivers (if any)"""
+        try:
+            self._quit()
+        finally:
+            if self.pool is not None:
+                self.pool.close()
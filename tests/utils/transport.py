@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tuned HTTP transport for WebDriver commands: connection pool sizing,
+keep-alive, per-command timeouts, Unix domain sockets and metrics"""
+
+import bisect
+import socket
+import threading
+import time
+from typing import Dict, List, NamedTuple
+
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool, PoolManager
+from urllib3.connection import HTTPConnection
+
+__all__ = (
+    "TransportConfig",
+    "TransportMetrics",
+    "UnixHTTPConnection",
+    "InstrumentedPoolManager",
+    "tune_transport",
+    "parse_command_timeouts",
+)
+
+
+class TransportConfig(NamedTuple):
+    """settings of the HTTP transport used to send WebDriver commands.
+
+    `command_timeouts` maps WebDriver command names (e.g. "get",
+    "w3cExecuteScript") to their timeout in seconds, other commands use
+    `timeout`. `unix_socket` sends every command of the connection over the
+    given Unix domain socket, for drivers exposed through a socket bridge.
+    """
+
+    pool_size: int = 4
+    keep_alive: bool = True
+    block: bool = False
+    timeout: float = 120
+    command_timeouts: Dict[str, float] | None = None
+    unix_socket: str | None = None
+
+
+class TransportMetrics:
+    """A class that collects metrics of the WebDriver HTTP transport.
+
+    Attributes
+    ----------
+        BUCKETS (tuple): upper bounds (in ms) of the RTT histogram buckets.
+        connections (int): number of connections opened.
+        commands (int): number of commands sent.
+        rtt (list): count of commands per RTT bucket, the last bucket
+        counts the commands slower than the last bound.
+
+    Methods
+    -------
+        connection_opened (): record a new connection.
+        command_sent (seconds: float): record a command's round trip time.
+        reuse_ratio (): Returns the fraction of commands sent over an
+        already open connection.
+        percentile (p: float): Returns the RTT bucket bound (in ms) the
+        given percentile of the commands falls in.
+        lines (): Returns a human readable summary.
+    """
+
+    BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+    def __init__(self):
+        self.connections: int = 0
+        self.commands: int = 0
+        self.rtt: List[int] = [0] * (len(self.BUCKETS) + 1)
+        self._lock = threading.Lock()
+
+    def connection_opened(self):
+        with self._lock:
+            self.connections += 1
+
+    def command_sent(self, seconds: float):
+        bucket = bisect.bisect_left(self.BUCKETS, seconds * 1000)
+        with self._lock:
+            self.commands += 1
+            self.rtt[bucket] += 1
+
+    def reuse_ratio(self) -> float:
+        """fraction of commands that didn't need a new connection"""
+        if not self.commands:
+            return 0.0
+        return max(0.0, 1 - self.connections / self.commands)
+
+    def percentile(self, p: float) -> float:
+        """upper bound (in ms) of the RTT bucket holding the percentile"""
+        rank = p / 100 * self.commands
+        seen = 0
+        for index, count in enumerate(self.rtt):
+            seen += count
+            if count and seen >= rank:
+                if index < len(self.BUCKETS):
+                    return float(self.BUCKETS[index])
+                return float("inf")
+        return 0.0
+
+    def lines(self) -> List[str]:
+        """summary of the collected metrics"""
+        histogram = ", ".join(
+            f"<={bound}ms: {count}"
+            for bound, count in zip(self.BUCKETS + ("inf",), self.rtt)
+            if count
+        )
+        return [
+            f"{self.commands} commands over {self.connections} connection(s),"
+            f" reuse ratio {self.reuse_ratio():.2%}",
+            f"command RTT p50 <= {self.percentile(50):g}ms, "
+            f"p99 <= {self.percentile(99):g}ms",
+            f"command RTT histogram: {histogram}",
+        ]
+
+
+class UnixHTTPConnection(HTTPConnection):
+    """HTTP connection over a Unix domain socket, the URL's host and port
+    are only used for the Host header"""
+
+    def __init__(self, *args, socket_path: str, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.socket_path: str = socket_path
+
+    def _new_conn(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if isinstance(self.timeout, (int, float)):
+            sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        return sock
+
+
+class _InstrumentedHTTPConnectionPool(HTTPConnectionPool):
+    # set by the pool manager once the pool is created
+    metrics: TransportMetrics | None = None
+
+    def use_socket(self, socket_path: str):
+        """open the pool's connections over a Unix domain socket"""
+        self.ConnectionCls = UnixHTTPConnection
+        self.conn_kw["socket_path"] = socket_path
+
+    def _new_conn(self):
+        if self.metrics is not None:
+            self.metrics.connection_opened()
+        return super()._new_conn()
+
+
+class _InstrumentedHTTPSConnectionPool(HTTPSConnectionPool):
+    # set by the pool manager once the pool is created
+    metrics: TransportMetrics | None = None
+
+    def _new_conn(self):
+        if self.metrics is not None:
+            self.metrics.connection_opened()
+        return super()._new_conn()
+
+
+class InstrumentedPoolManager(PoolManager):
+    """A pool manager that counts the connections it opens, applies the
+    timeout of the command being sent by the current thread and optionally
+    connects over a Unix domain socket."""
+
+    def __init__(
+        self,
+        config: TransportConfig,
+        metrics: TransportMetrics,
+        command: threading.local,
+        **kwargs,
+    ):
+        super().__init__(
+            maxsize=config.pool_size, block=config.block, **kwargs
+        )
+        self.config: TransportConfig = config
+        self.metrics: TransportMetrics = metrics
+        self.command: threading.local = command
+        self.pool_classes_by_scheme = {
+            "http": _InstrumentedHTTPConnectionPool,
+            "https": _InstrumentedHTTPSConnectionPool,
+        }
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        # pools are created with the request context only, they get the
+        # metrics and socket once created, before opening any connection
+        pool = super()._new_pool(scheme, host, port, request_context)
+        if isinstance(
+            pool,
+            (
+                _InstrumentedHTTPConnectionPool,
+                _InstrumentedHTTPSConnectionPool,
+            ),
+        ):
+            pool.metrics = self.metrics
+        if (
+            isinstance(pool, _InstrumentedHTTPConnectionPool)
+            and self.config.unix_socket is not None
+        ):
+            pool.use_socket(self.config.unix_socket)
+        return pool
+
+    def urlopen(self, method, url, redirect=True, **kw):
+        name = getattr(self.command, "name", None)
+        timeouts = self.config.command_timeouts or {}
+        kw["timeout"] = timeouts.get(name, self.config.timeout)
+        return super().urlopen(method, url, redirect=redirect, **kw)
+
+
+def tune_transport(
+    connection: RemoteConnection,
+    config: TransportConfig,
+    metrics: TransportMetrics,
+) -> RemoteConnection:
+    """replace the HTTP transport of a driver's command executor with an
+    instrumented one using the given configuration, a connection that is
+    already tuned is left as is"""
+
+    # pylint: disable=protected-access
+    if getattr(connection, "_transport_metrics", None) is not None:
+        return connection
+
+    command = threading.local()
+    if connection._client_config is not None:
+        connection._client_config.keep_alive = config.keep_alive
+        connection._client_config.timeout = config.timeout
+    # RemoteConnection has no hook for its pool manager or for timing its
+    # commands, so both of its methods are replaced on the instance
+    setattr(
+        connection,
+        "_get_connection_manager",
+        lambda: InstrumentedPoolManager(config, metrics, command),
+    )
+    if hasattr(connection, "_conn"):
+        connection._conn.clear()
+    if config.keep_alive:
+        connection._conn = connection._get_connection_manager()
+
+    execute = connection.execute
+
+    def timed_execute(name, params):
+        command.name = name
+        start = time.perf_counter()
+        try:
+            return execute(name, params)
+        finally:
+            metrics.command_sent(time.perf_counter() - start)
+            command.name = None
+
+    setattr(connection, "execute", timed_execute)
+    setattr(connection, "_transport_metrics", metrics)
+    return connection
+
+
+def parse_command_timeouts(value: str) -> Dict[str, float]:
+    """parse a `name=seconds,name=seconds` list of command timeouts"""
+    timeouts = {}
+    for pair in filter(None, (p.strip() for p in value.split(","))):
+        name, _, seconds = pair.partition("=")
+        timeouts[name.strip()] = float(seconds)
+    return timeouts